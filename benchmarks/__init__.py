@@ -0,0 +1,11 @@
+# region imports
+from benchmarks.lean_placeholder import install
+
+install()
+from AlgorithmImports import *
+# endregion
+"""
+Hot-path benchmarks (asv-style): `bench_*.py` modules register cases, `run.py` times them and
+compares against stored baselines. Outside Lean, `lean_placeholder` stands in for `AlgorithmImports`
+so `main.py`'s components can be driven directly.
+"""
@@ -0,0 +1,99 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""`qc_native_features` (plus panel compaction and labels) at 10k / 100k / 1M rows (rolling-`apply` and lstsq paths are capped lower)."""
+
+from research.scripts import qc_native_features as qnf
+from research.scripts.feature_panel import HALF_RATIO_POLICY, compact_panel
+from research.scripts.labels import triple_barrier
+
+from benchmarks.harness import benchmark
+from benchmarks.synthetic import factor_returns, macro_series, minute_bars
+
+# Python-level loops per row: keep the default sweep to sizes that finish in seconds.
+SLOW_SIZES = (10_000, 100_000)
+
+
+@benchmark("features.bar_returns")
+def bench_bar_returns(n: int):
+    close = minute_bars(n)["close"]
+    return lambda: qnf.bar_returns(close)
+
+
+@benchmark("features.multi_horizon_roc")
+def bench_multi_horizon_roc(n: int):
+    close = minute_bars(n)["close"]
+    return lambda: qnf.multi_horizon_roc(close, (1, 4, 24, 168))
+
+
+@benchmark("features.atr_percent")
+def bench_atr_percent(n: int):
+    bars = minute_bars(n)
+    return lambda: qnf.atr_percent(bars["high"], bars["low"], bars["close"])
+
+
+@benchmark("features.realized_vol")
+def bench_realized_vol(n: int):
+    returns = minute_bars(n)["close"].pct_change()
+    return lambda: qnf.realized_vol(returns, 168, annualize=True)
+
+
+@benchmark("features.normalized_momentum")
+def bench_normalized_momentum(n: int):
+    close = minute_bars(n)["close"]
+    return lambda: qnf.normalized_momentum(close, 24, 168)
+
+
+@benchmark("features.liquidity_metrics", sizes=SLOW_SIZES)
+def bench_liquidity_metrics(n: int):
+    bars = minute_bars(n)
+    return lambda: qnf.liquidity_metrics(bars["close"], bars["volume"])
+
+
+@benchmark("features.relative_volume")
+def bench_relative_volume(n: int):
+    volume = minute_bars(n)["volume"]
+    return lambda: qnf.relative_volume(volume)
+
+
+@benchmark("features.volume_percentile", sizes=SLOW_SIZES)
+def bench_volume_percentile(n: int):
+    volume = minute_bars(n)["volume"]
+    return lambda: qnf.volume_percentile(volume)
+
+
+@benchmark("features.price_volume_ratio")
+def bench_price_volume_ratio(n: int):
+    bars = minute_bars(n)
+    return lambda: qnf.price_volume_ratio(bars["close"], bars["volume"])
+
+
+@benchmark("features.cross_asset_beta", sizes=(10_000,), repeat=1)
+def bench_cross_asset_beta(n: int):
+    returns = minute_bars(n)["close"].pct_change()
+    factors = factor_returns(returns.index)
+    return lambda: qnf.cross_asset_beta(returns, factors)
+
+
+@benchmark("features.regime_flags")
+def bench_regime_flags(n: int):
+    returns = minute_bars(n)["close"].pct_change()
+    macro = macro_series(returns.index)
+    return lambda: qnf.regime_flags(returns, macro)
+
+
+@benchmark("features.compact_panel")
+def bench_compact_panel(n: int):
+    features = {}
+    for seed, symbol in enumerate(("BTCUSD", "ETHUSD", "SOLUSD", "XRPUSD")):
+        bars = minute_bars(n // 4, seed=seed)
+        frame = qnf.multi_horizon_roc(bars["close"], (1, 60, 1440))
+        frame["relative_volume_24_168"] = qnf.relative_volume(bars["volume"])
+        features[symbol] = frame
+    return lambda: compact_panel(features, HALF_RATIO_POLICY)
+
+
+@benchmark("labels.triple_barrier")
+def bench_triple_barrier(n: int):
+    close = minute_bars(n)["close"]
+    return lambda: triple_barrier(close, 1440, take_profit=0.02, stop_loss_pct=0.03)
@@ -0,0 +1,56 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""`data_fetchers` hot paths: frame merging, append-to-cache and execution-log standardization."""
+
+import tempfile
+from pathlib import Path
+
+from research.scripts.data_fetchers import utils
+from research.scripts.data_fetchers.execution import _standardize_frame
+
+from benchmarks.harness import benchmark
+from benchmarks.synthetic import execution_log, overlapping_frames
+
+
+@benchmark("fetchers.merge_frames")
+def bench_merge_frames(n: int):
+    frames = overlapping_frames(n)
+    return lambda: utils.merge_frames(frames)
+
+
+@benchmark("fetchers.append_time_series")
+def bench_append_time_series(n: int):
+    frames = overlapping_frames(n, chunks=2)
+    directory = Path(tempfile.mkdtemp(prefix="bench_append_"))
+    out_file = directory / "series.parquet"
+
+    def run() -> None:
+        # Existing cache of the first half, then append the (overlapping) second half.
+        utils.write_time_series(frames[0], out_file)
+        utils.append_time_series(frames[-1], out_file)
+
+    return run
+
+
+@benchmark("fetchers.standardize_execution_frame")
+def bench_standardize_frame(n: int):
+    log = execution_log(n)
+    return lambda: _standardize_frame(log.copy())
+
+
+@benchmark("fetchers.merge_frames_concat_sort")
+def bench_merge_frames_reference(n: int):
+    """The previous concat + full sort + dedup implementation, kept as the comparison point."""
+
+    frames = overlapping_frames(n)
+    return lambda: utils._legacy_merge(frames)
+
+
+@benchmark("fetchers.outer_join")
+def bench_outer_join(n: int):
+    # Funding prints every 8h next to 5m open-interest history: the `funding.run_pipeline` shape.
+    frames = overlapping_frames(n, chunks=1, overlap=0.0)
+    funding = frames[0][["rate"]].iloc[::96]
+    open_interest = frames[0][["open_interest"]].iloc[::5]
+    return lambda: utils.outer_join([funding, open_interest])
@@ -0,0 +1,85 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Synthetic `OnData` loop: the per-bar path of `SleepySkyBlueAlligator` (universe routing,
+consolidation, trailing stop, features, signal, allocation, risk, planning) driven over minute bars
+without the Lean engine. Rows are minutes; the default case is one year.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+from main import PositionState, RandomLongSignal, SimpleFeatureEngine, TrailingStopGuard, UniverseSubscriptionManager
+from research.scripts.bars import StreamingConsolidator
+from research.scripts.execution import ImmediatePlanner
+from research.scripts.feature_store import bar_views
+from research.scripts.portfolio import FixedFractionAllocator
+
+import numpy as np
+
+from benchmarks.harness import benchmark
+from benchmarks.synthetic import MINUTES_PER_YEAR, minute_bars
+
+
+class _Algorithm:
+    """Just enough of `QCAlgorithm` for `UniverseSubscriptionManager.register`."""
+
+    def AddCrypto(self, ticker, resolution, market):
+        return SimpleNamespace(Symbol=ticker)
+
+
+def make_slices(frames: dict) -> list:
+    """One `Slice`-like object per minute holding every symbol's bar in `data.Bars`."""
+
+    views = {symbol: bar_views(frame) for symbol, frame in frames.items()}
+    return [SimpleNamespace(Bars=dict(zip(views, bars))) for bars in zip(*views.values())]
+
+
+def run_loop(bars, slices: list, symbol: str = "BTCUSD", min_trade_interval: int = 5) -> int:
+    """Replay `slices` through the live components; returns the number of entries (keeps the work observable)."""
+
+    universe = UniverseSubscriptionManager(_Algorithm(), datetime(2024, 1, 1), datetime(2025, 1, 1))
+    universe.register({"kraken": list(slices[0].Bars)})
+    state = PositionState()
+    guard = TrailingStopGuard(state, 0.03)
+    consolidator = StreamingConsolidator([symbol], history=24 * 7 + 1)
+    features = SimpleFeatureEngine(consolidator)
+    signal = RandomLongSignal(probability=0.3, seed=42)
+    allocator = FixedFractionAllocator(fraction=0.95)
+    planner = ImmediatePlanner()
+
+    end_ns = bars.index.asi8 if bars.index.tz is None else bars.index.tz_convert("UTC").tz_localize(None).asi8
+    ohlcv = bars[["open", "high", "low", "close", "volume"]].to_numpy(dtype=np.float64)
+    last_trade = -min_trade_interval
+    entries = 0
+    for i, data in enumerate(slices):
+        universe.route(data, int(end_ns[i]))
+        bar = data.Bars.get(symbol)
+        if bar is None:
+            continue
+        consolidator.update(int(end_ns[i]), ohlcv[i : i + 1])
+        price = bar.Close
+        guard.update_trailing(price)
+        if guard.should_exit(price):
+            guard.reset()
+            continue
+        if state.side is not None or i - last_trade < min_trade_interval:
+            continue
+        score, _ = signal.score(features.compute(bar))
+        if score <= 0:
+            continue
+        context = {"price": price}
+        targets = guard.evaluate(allocator.compute({symbol: score}, context).weights, context)
+        if planner.plan(targets, {"timestamp": str(bar.EndTime)}):
+            guard.register_entry(price)
+            last_trade = i
+            entries += 1
+    return entries
+
+
+@benchmark("ondata.minute_loop", sizes=(MINUTES_PER_YEAR,), repeat=1)
+def bench_minute_loop(n: int):
+    bars = minute_bars(n)
+    slices = make_slices({"BTCUSD": bars, "ETHUSD": minute_bars(n, seed=1)})
+    return lambda: run_loop(bars, slices)
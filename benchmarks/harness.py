@@ -0,0 +1,128 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Minimal asv-style harness.
+
+`@benchmark(name, sizes=...)` registers a setup function returning a zero-argument callable for a
+given row count; `run_benchmarks` builds each case once, times it with `time.perf_counter` (best of
+`repeat` runs, after a warmup call) and `compare` flags cases that got slower than the stored
+baseline by more than `tolerance`.
+"""
+
+import json
+import platform
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+
+import numpy as np
+
+DEFAULT_SIZES: tuple[int, ...] = (10_000, 100_000, 1_000_000)
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    sizes: tuple[int, ...]
+    repeat: int = 3
+
+
+_BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = 3):
+    """
+    Register `setup(n) -> callable`. `sizes` caps slow Python-loop paths (e.g. rolling `apply`) so
+    the default suite finishes in minutes; pass `--sizes` to `run.py` to override.
+    """
+
+    def _register(setup: Callable[[int], Callable[[], object]]) -> Callable[[int], Callable[[], object]]:
+        _BENCHMARKS[name] = Benchmark(name, setup, tuple(sizes), repeat)
+        return setup
+
+    return _register
+
+
+def registered() -> dict[str, Benchmark]:
+    return dict(_BENCHMARKS)
+
+
+def time_case(func: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """Return `(best, median)` seconds over `repeat` calls (plus one warmup call when `repeat > 1`)."""
+
+    if repeat > 1:
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return min(samples), float(np.median(samples))
+
+
+def run_benchmarks(
+    benchmarks: Iterable[Benchmark],
+    sizes: Sequence[int] | None = None,
+    repeat: int | None = None,
+    log: Callable[[str], None] | None = print,
+) -> dict[str, dict[str, float]]:
+    """Time every `(benchmark, size)` case; keys are `"<name>[<rows>]"`."""
+
+    results: dict[str, dict[str, float]] = {}
+    for bench in benchmarks:
+        for n in sizes or bench.sizes:
+            func = bench.setup(n)
+            best, median = time_case(func, repeat or bench.repeat)
+            key = f"{bench.name}[{n}]"
+            results[key] = {"rows": n, "best": best, "median": median, "rows_per_sec": n / best if best else float("inf")}
+            if log is not None:
+                log(f"{key:<48} best {best * 1e3:10.2f} ms   median {median * 1e3:10.2f} ms")
+    return results
+
+
+def machine_info() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "node": platform.node(),
+    }
+
+
+def save_baseline(results: dict[str, dict[str, float]], path: Path = BASELINE_FILE) -> Path:
+    """Merge `results` into the baseline file (existing cases not re-run are kept)."""
+
+    stored = load_baseline(path)
+    stored["machine"] = machine_info()
+    stored.setdefault("results", {}).update(results)
+    Path(path).write_text(json.dumps(stored, indent=2, sort_keys=True), encoding="utf-8")
+    return Path(path)
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> dict:
+    path = Path(path)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict,
+    tolerance: float = 1.25,
+) -> list[tuple[str, float, float, float]]:
+    """Return `(case, baseline_s, current_s, ratio)` for cases slower than `tolerance` x baseline."""
+
+    stored = baseline.get("results", {})
+    regressions = []
+    for key, result in results.items():
+        if key not in stored:
+            continue
+        before, now = stored[key]["best"], result["best"]
+        ratio = now / before if before else float("inf")
+        if ratio > tolerance:
+            regressions.append((key, before, now, ratio))
+    return regressions
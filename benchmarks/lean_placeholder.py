@@ -0,0 +1,39 @@
+"""
+Stand-ins for the Lean names that `main.py` and the research modules touch at import time, so the
+benchmarks and the test suite run outside the Lean runtime.
+
+`install()` registers them as the `AlgorithmImports` module only when the real one is missing. Base
+classes are empty types; Lean enums (`Market`, `Resolution`, ...) are classes whose members are
+their lower-case names, which is what Lean's `Market` constants are.
+"""
+
+import sys
+import types
+
+CLASSES = ("QCAlgorithm", "FeeModel", "OrderFee", "CashAmount", "Symbol", "Slice", "TradeBar")
+ENUMS = {
+    "Market": ("Kraken", "Binance", "USA", "Oanda", "FXCM"),
+    "Resolution": ("Tick", "Second", "Minute", "Hour", "Daily"),
+    "BrokerageName": ("Kraken", "Binance", "InteractiveBrokersBrokerage", "OandaBrokerage", "FxcmBrokerage"),
+    "AccountType": ("Cash", "Margin"),
+}
+
+
+def install() -> types.ModuleType:
+    """Return `AlgorithmImports`, registering the placeholder first when Lean is not installed."""
+
+    try:
+        import AlgorithmImports
+
+        return AlgorithmImports
+    except ModuleNotFoundError:
+        pass
+
+    placeholder = types.ModuleType("AlgorithmImports")
+    for name in CLASSES:
+        setattr(placeholder, name, type(name, (), {}))
+    for name, members in ENUMS.items():
+        setattr(placeholder, name, type(name, (), {member: member.lower() for member in members}))
+    placeholder.__all__ = [*CLASSES, *ENUMS]
+    sys.modules["AlgorithmImports"] = placeholder
+    return placeholder
@@ -0,0 +1,63 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Run the benchmark suite and compare against stored baselines.
+
+    python -m benchmarks.run                       # run everything, report regressions vs baselines.json
+    python -m benchmarks.run -k features --sizes 10000
+    python -m benchmarks.run --save                # record current timings as the baseline
+
+Baselines are machine-specific; record them on the machine that will run the comparison. Outside
+Lean, `benchmarks.lean_placeholder` stands in for `AlgorithmImports`. A benchmark module that fails
+to import (e.g. a missing dependency) is reported and the run exits with status 2, so a partial
+suite is never mistaken for a clean one.
+"""
+
+import argparse
+import importlib
+import sys
+
+from benchmarks.harness import BASELINE_FILE, compare, load_baseline, registered, run_benchmarks, save_baseline
+
+MODULES = ("benchmarks.bench_features", "benchmarks.bench_fetchers", "benchmarks.bench_ondata")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", default="", help="substring filter on benchmark names")
+    parser.add_argument("--sizes", type=int, nargs="*", help="override row counts for every selected case")
+    parser.add_argument("--repeat", type=int, default=None)
+    parser.add_argument("--baseline", default=str(BASELINE_FILE))
+    parser.add_argument("--save", action="store_true", help="write results into the baseline file")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="slowdown ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    failed: dict[str, str] = {}
+    for module in MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as exc:  # noqa: BLE001 - e.g. a missing dependency
+            failed[module] = f"{type(exc).__name__}: {exc}"
+            print(f"FAILED to import {module}: {failed[module]}", file=sys.stderr)
+
+    selected = [bench for name, bench in sorted(registered().items()) if args.filter in name]
+    results = run_benchmarks(selected, sizes=args.sizes, repeat=args.repeat)
+
+    if args.save:
+        print(f"baseline written to {save_baseline(results, args.baseline)}")
+        status = 0
+    else:
+        regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+        for key, before, now, ratio in regressions:
+            print(f"REGRESSION {key}: {before * 1e3:.2f} ms -> {now * 1e3:.2f} ms ({ratio:.2f}x)")
+        status = 1 if regressions else 0
+
+    if failed:
+        print(f"INCOMPLETE: {len(failed)} benchmark module(s) did not run: {', '.join(failed)}", file=sys.stderr)
+        return 2
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
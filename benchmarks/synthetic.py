@@ -0,0 +1,87 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Deterministic synthetic inputs for the benchmarks: GBM minute bars, execution logs and overlapping
+fetcher frames. Every generator takes a `seed` so timings run on identical data across machines.
+"""
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_YEAR = 525_600
+
+
+def price_path(n: int, seed: int = 0, start_price: float = 40_000.0, vol: float = 0.0008) -> np.ndarray:
+    """Geometric random walk with per-step log volatility `vol`."""
+
+    rng = np.random.default_rng(seed)
+    return start_price * np.exp(np.cumsum(rng.normal(0.0, vol, n)))
+
+
+def minute_bars(n: int, seed: int = 0, start: str = "2024-01-01", freq: str = "1min") -> pd.DataFrame:
+    """End-stamped OHLCV frame with `n` rows (UTC index)."""
+
+    rng = np.random.default_rng(seed + 1)
+    close = price_path(n, seed)
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.abs(rng.normal(0.0, 0.0004, n)) * close
+    index = pd.date_range(start, periods=n, freq=freq, tz="UTC", name="time")
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.lognormal(1.0, 0.8, n),
+        },
+        index=index,
+    )
+
+
+def factor_returns(index: pd.DatetimeIndex, names: tuple[str, ...] = ("eth", "sol"), seed: int = 0) -> dict[str, pd.Series]:
+    rng = np.random.default_rng(seed + 2)
+    return {name: pd.Series(rng.normal(0.0, 0.001, len(index)), index=index) for name in names}
+
+
+def macro_series(index: pd.DatetimeIndex, names: tuple[str, ...] = ("dxy", "spx"), seed: int = 0) -> dict[str, pd.Series]:
+    rng = np.random.default_rng(seed + 3)
+    return {name: pd.Series(1.0 + np.cumsum(rng.normal(0.0, 1e-4, len(index))), index=index) for name in names}
+
+
+def overlapping_frames(n: int, chunks: int = 8, overlap: float = 0.1, seed: int = 0) -> list[pd.DataFrame]:
+    """
+    `chunks` time-series frames covering `n` rows in total, each overlapping the next by `overlap`
+    (the shape of paginated API pulls fed to `utils.merge_frames`).
+    """
+
+    rng = np.random.default_rng(seed + 4)
+    index = pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC")
+    size = n // chunks
+    step = max(int(size * (1.0 - overlap)), 1)
+    frames = []
+    for start in range(0, n, step):
+        part = index[start : start + size]
+        if not len(part):
+            break
+        frames.append(pd.DataFrame({"rate": rng.normal(0.0, 1e-4, len(part)), "open_interest": rng.random(len(part))}, index=part))
+    return frames
+
+
+def execution_log(n: int, seed: int = 0) -> pd.DataFrame:
+    """Raw execution log with venue-style column names, as consumed by `execution._standardize_frame`."""
+
+    rng = np.random.default_rng(seed + 5)
+    times = pd.Timestamp("2024-01-01", tz="UTC") + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86_400, n)), unit="s")
+    expected = 40_000.0 * (1.0 + rng.normal(0.0, 0.01, n))
+    return pd.DataFrame(
+        {
+            "fillTime": times.astype(str),
+            "ticker": rng.choice(["BTCUSD", "ETHUSD", "SOLUSD"], n),
+            "fillPrice": expected * (1.0 + rng.normal(0.0, 2e-4, n)),
+            "expectedPrice": expected,
+            "latencyMs": rng.integers(5, 400, n).astype(str),
+            "quantity": rng.random(n) + 0.1,
+            "filled_quantity": rng.random(n) * 0.1 + 0.1,
+        }
+    )
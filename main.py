@@ -1,16 +1,19 @@
 # region imports
 from AlgorithmImports import *
 import random
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+import numpy as np
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
 
 from research.scripts.data_loader import DataLoader, DataRequestSpec
 from research.scripts.feature_store import FeatureRegistry, FeatureSpec
-from research.scripts.signals import SignalModel
+from research.scripts.signals import SignalModel, create_signal, register_signal
 from research.scripts.portfolio import FixedFractionAllocator
 from research.scripts.risk import RiskGuard
 from research.scripts.execution import ImmediatePlanner, ChildOrder
 from research.scripts.costs import TieredCryptoFeeModel
+from research.scripts.bars import BarBuffer, StreamingConsolidator
+from research.scripts.state import ObjectStoreSnapshotStore, SnapshotError, StateSnapshotter
 # endregion
 
 @dataclass
@@ -35,16 +38,20 @@ class SpotMinuteAdapter:
         symbol: str,
         start: datetime,
         end: datetime,
+        loader: DataLoader | None = None,
     ) -> None:
-        if venue not in self.MARKET_MAP:
-            raise ValueError(f"Unsupported venue for adapter: {venue}")
-
         self.algorithm = algorithm
         self.venue = venue
-        self.loader = DataLoader()
-        self.spec = DataRequestSpec(
+        self.loader = loader or DataLoader()
+        self.spec = self.build_spec(venue, symbol, start, end)
+
+    @classmethod
+    def build_spec(cls, venue: str, symbol: str, start: datetime, end: datetime) -> DataRequestSpec:
+        if venue not in cls.MARKET_MAP:
+            raise ValueError(f"Unsupported venue for adapter: {venue}")
+        return DataRequestSpec(
             symbol=symbol,
-            market=self.MARKET_MAP[venue],
+            market=cls.MARKET_MAP[venue],
             security_type="Crypto",
             resolution="Minute",
             start=start.strftime("%Y-%m-%d"),
@@ -64,10 +71,79 @@ class SpotMinuteAdapter:
         ).Symbol
 
 
+class UniverseSubscriptionManager:
+    """
+    Subscribes a multi-venue spot universe in one call and routes each `Slice` into a `BarBuffer`.
+
+    Specs are recorded on a shared `DataLoader` (repeated (venue, ticker) pairs are recorded once)
+    and every Lean `Symbol` gets a fixed buffer column at subscription time (`columns[symbol]`).
+    Pairs the loader already knows, such as the algorithm's traded symbol, still get a column.
+    `route` only walks the bars present in the slice and fills the claimed buffer row in place.
+    """
+
+    def __init__(
+        self,
+        algorithm: QCAlgorithm,
+        start: datetime,
+        end: datetime,
+        loader: DataLoader | None = None,
+        capacity: int = 1440,
+    ) -> None:
+        self.algorithm = algorithm
+        self.start = start
+        self.end = end
+        self.loader = loader or DataLoader()
+        self.buffer = BarBuffer([], capacity=capacity)
+        self.columns: dict[Symbol, int] = {}
+        self.symbols: list[Symbol] = []
+
+    def register(self, universe: dict[str, list[str]]) -> list[Symbol]:
+        """Subscribe `{venue: [ticker, ...]}`; returns the Lean symbols in buffer-column order."""
+
+        added: list[Symbol] = []
+        for venue, tickers in universe.items():
+            for ticker in dict.fromkeys(tickers):
+                spec = SpotMinuteAdapter.build_spec(venue, ticker, self.start, self.end)
+                self.loader.register(spec)
+                # `AddCrypto` returns the existing security for symbols subscribed elsewhere.
+                symbol = self.algorithm.AddCrypto(spec.symbol, Resolution.Minute, spec.market).Symbol
+                if symbol in self.columns:
+                    continue
+                self.columns[symbol] = self.buffer.add_symbol(str(symbol))
+                self.symbols.append(symbol)
+                added.append(symbol)
+        return added
+
+    @staticmethod
+    def parse(universe: str) -> dict[str, list[str]]:
+        """Parse `"kraken:BTCUSD,kraken:ETHUSD,binance:BTCUSDT"` into `{venue: [tickers]}`."""
+
+        parsed: dict[str, list[str]] = {}
+        for item in filter(None, (part.strip() for part in universe.split(","))):
+            venue, _, ticker = item.partition(":")
+            parsed.setdefault(venue.lower(), []).append(ticker.upper())
+        return parsed
+
+    def route(self, data: Slice, end_ns: int) -> np.ndarray:
+        """Write the slice's trade bars into the buffer and return the `(symbols, 5)` row."""
+
+        columns = self.columns
+        row = self.buffer.next_row(end_ns)
+        # Only the slice's own bars are visited; columns without a bar stay NaN.
+        for symbol, bar in data.Bars.items():
+            column = columns.get(symbol)
+            if column is not None:
+                row[column] = (bar.Open, bar.High, bar.Low, bar.Close, bar.Volume)
+        return row
+
+
 class SimpleFeatureEngine:
-    """Placeholder feature engine that surfaces the latest close price."""
+    """
+    Surfaces the latest close price and, given the algorithm's `StreamingConsolidator`, hourly rates
+    of change (`roc_{hours}h`) read from its closed 1h bars instead of resampling minute data.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, consolidator: StreamingConsolidator | None = None, roc_hours: tuple[int, ...] = (24,)) -> None:
         self.registry = FeatureRegistry()
         spec = FeatureSpec(
             name="close_price",
@@ -75,12 +151,22 @@ class SimpleFeatureEngine:
             window=1,
             description="Latest close price from minute bar",
         )
-        self.registry.register(spec, lambda bar: bar.Close)
+        self.registry.register(spec, lambda bar: bar.Close, batch=lambda bars: bars["close"])
+        # Same streaming implementations that `check_parity` validates against the batch definitions.
+        self.streams = {name: self.registry.stream(name) for name in self.registry.names()}
+        self.consolidator = consolidator
+        self.roc_hours = tuple(roc_hours)
 
     def compute(self, bar: TradeBar) -> dict[str, float]:
-        return {"close_price": float(bar.Close)}
+        features = {name: float(stream.update(bar)) for name, stream in self.streams.items()}
+        if self.consolidator is not None and self.roc_hours:
+            closes = self.consolidator.closes("1h", max(self.roc_hours) + 1)[:, 0]
+            for hours in self.roc_hours:
+                features[f"roc_{hours}h"] = float(closes[-1] / closes[-1 - hours] - 1.0) if closes.size > hours else float("nan")
+        return features
 
 
+@register_signal("random_long")
 class RandomLongSignal(SignalModel):
     """Recreates the prior random-entry logic under the SignalModel contract."""
 
@@ -93,6 +179,13 @@ class RandomLongSignal(SignalModel):
         confidence = 0.5 if edge > 0 else 0.0
         return edge, confidence
 
+    def get_state(self) -> dict:
+        return {"probability": self.probability, "random": self.random.getstate()}
+
+    def set_state(self, state: dict) -> None:
+        self.probability = state["probability"]
+        self.random.setstate(state["random"])
+
 
 class TrailingStopGuard(RiskGuard):
     """Tracks trailing stops and exposes helper methods for the algorithm."""
@@ -126,6 +219,14 @@ class TrailingStopGuard(RiskGuard):
             self.update_trailing(price)
         return super().evaluate(targets, context)
 
+    def get_state(self) -> dict:
+        return {"stop_loss_pct": self.stop_loss_pct, "position": asdict(self.state)}
+
+    def set_state(self, state: dict) -> None:
+        # Update the shared PositionState in place; the algorithm holds the same object.
+        for name, value in state["position"].items():
+            setattr(self.state, name, value)
+
 
 class SleepySkyBlueAlligator(QCAlgorithm):
     """Randomised long-only BTC strategy with a trailing stop mechanism."""
@@ -177,6 +278,15 @@ class SleepySkyBlueAlligator(QCAlgorithm):
                 self.EndDate,
             )
             self.asset_symbol = self.market_adapter.subscribe()
+            # Optional research universe, e.g. "kraken:ETHUSD,binance:BTCUSDT"; listing the traded
+            # symbol gives it a buffer column without recording its spec on the shared loader twice.
+            self.universe = UniverseSubscriptionManager(
+                self,
+                self.StartDate,
+                self.EndDate,
+                loader=self.market_adapter.loader,
+            )
+            self.universe.register(UniverseSubscriptionManager.parse(self.GetParameter("universe") or ""))
             self.Securities[self.asset_symbol].SetFeeModel(
                 TieredCryptoFeeModel(
                     venue=self.venue,
@@ -194,8 +304,10 @@ class SleepySkyBlueAlligator(QCAlgorithm):
         else:
             raise ValueError(f"Unsupported asset_class: {self.asset_class}")
 
-        self.feature_engine = SimpleFeatureEngine()
-        self.signal_model = RandomLongSignal(probability=0.3, seed=42)
+        # Hourly/daily views of the minute feed for hour-denominated features (roc_24h, etc.).
+        self.consolidator = StreamingConsolidator([str(self.asset_symbol)], history=24 * 7 + 1)
+        self.feature_engine = SimpleFeatureEngine(self.consolidator)
+        self.signal_model = create_signal("random_long", probability=0.3, seed=42)
         self.allocator = FixedFractionAllocator(fraction=0.95)
         self.risk_guard = TrailingStopGuard(self.position_state, self.stop_loss_pct)
         self.execution_planner = ImmediatePlanner()
@@ -203,15 +315,52 @@ class SleepySkyBlueAlligator(QCAlgorithm):
         self.trade_count = 0
         self.winning_trades = 0
 
+        # Live warm restart: stops, counters, RNG and bar windows come back from the ObjectStore.
+        components = {
+            "algorithm": self,
+            "features": self.feature_engine.registry,
+            "trailing_stop": self.risk_guard,
+            "signal": self.signal_model,
+            "consolidator": self.consolidator,
+        }
+        if getattr(self, "universe", None) is not None:
+            components["universe_bars"] = self.universe.buffer
+        # Bar windows are only valid against the feature spec that sized them.
+        window_components = [name for name in ("consolidator", "universe_bars") if name in components]
+        self.snapshotter = StateSnapshotter(
+            components,
+            required=("algorithm",),
+            depends={name: ("features",) for name in window_components},
+        )
+        self.snapshot_store = ObjectStoreSnapshotStore(
+            self.ObjectStore,
+            f"state/{self.GetParameter('snapshot_key') or 'sleepy_sky_blue_alligator'}.snap",
+        )
+        self._reconcile_pending = False
+        if self.LiveMode:
+            self._restore_snapshot()
+            self.Schedule.On(self.DateRules.EveryDay(), self.TimeRules.Every(timedelta(minutes=15)), self._save_snapshot)
+
+    def OnWarmupFinished(self) -> None:
+        self._reconcile_restored_stop()
+
     def OnData(self, data: Slice) -> None:
         if self.IsWarmingUp:
             return
+        self._reconcile_restored_stop()
+
+        if getattr(self, "universe", None) is not None and self.universe.symbols:
+            self.universe.route(data, int(self.UtcTime.replace(tzinfo=timezone.utc).timestamp()) * 1_000_000_000)
 
         if self.asset_symbol not in data or data[self.asset_symbol] is None:
             return
 
         bar = data[self.asset_symbol]
         price = float(bar.Close)
+        self.consolidator.update(
+            int(self.UtcTime.replace(tzinfo=timezone.utc).timestamp()) * 1_000_000_000,
+            np.array([[bar.Open, bar.High, bar.Low, bar.Close, bar.Volume]], dtype=np.float64),
+        )
 
         self.risk_guard.update_trailing(price)
 
@@ -252,7 +401,49 @@ class SleepySkyBlueAlligator(QCAlgorithm):
 
         self.risk_guard.reset()
 
+    def get_state(self) -> dict:
+        return {
+            "symbol": str(self.asset_symbol),
+            "last_trade_time": self.last_trade_time,
+            "trade_count": self.trade_count,
+            "winning_trades": self.winning_trades,
+        }
+
+    def set_state(self, state: dict) -> None:
+        if state["symbol"] != str(self.asset_symbol):
+            raise SnapshotError(f"snapshot is for {state['symbol']}, not {self.asset_symbol}")
+        self.last_trade_time = state["last_trade_time"]
+        self.trade_count = state["trade_count"]
+        self.winning_trades = state["winning_trades"]
+
+    def _restore_snapshot(self) -> None:
+        data = self.snapshot_store.load()
+        if data is None:
+            return
+        try:
+            restored, skipped = self.snapshotter.restore(data)
+        except SnapshotError as exc:
+            self.Log(f"Ignoring unreadable state snapshot: {exc}")
+            return
+        # Live holdings are not loaded during Initialize; check the restored stop once they are.
+        self._reconcile_pending = "trailing_stop" in restored
+        self.Log(f"Restored state: {', '.join(restored) or 'none'}; cold: {skipped or 'none'}")
+
+    def _reconcile_restored_stop(self) -> None:
+        if not self._reconcile_pending:
+            return
+        self._reconcile_pending = False
+        if self.position_state.side is not None and not self.Portfolio[self.asset_symbol].Invested:
+            # The position was closed while the algorithm was down; drop the stale stop.
+            self.Log("Restored trailing stop has no live position; resetting it")
+            self.risk_guard.reset()
+
+    def _save_snapshot(self) -> None:
+        self.snapshot_store.save(self.snapshotter.capture())
+
     def OnEndOfAlgorithm(self) -> None:
+        if self.LiveMode:
+            self._save_snapshot()
         total_return = (self.Portfolio.TotalPortfolioValue - 100000) / 100000 * 100
         win_rate = (self.winning_trades / self.trade_count) * 100 if self.trade_count > 0 else 0.0
 
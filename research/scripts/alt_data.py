@@ -0,0 +1,215 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Point-in-time alignment of alternative data onto bar timestamps.
+
+Funding (8h), on-chain (24h/1h), sentiment (daily), DeFi TVL and token unlock events arrive at
+different frequencies. `AsOfJoinEngine` reads the `data_fetchers` caches and attaches the latest value
+that was *published* at or before each bar (source timestamp + publication lag), masking values older
+than a staleness limit. Caches such as funding (8h prints outer-joined with 5m open interest) are
+sparse per column, so every column is joined over its own non-NaN timestamps: one
+`np.searchsorted` over int64 nanoseconds plus a gather per column, with no per-row pandas merges.
+Output columns are namespaced by source (`AltDataSource.feature_name`) so two sources sharing a
+column name never overwrite each other.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class AltDataSource:
+    """
+    Describes one `data_fetchers` output family (`<directory>/<symbol><suffix>`).
+
+    Output columns are `<prefix><column>`; `prefix=None` uses `"<name>_"`, skipped for columns that
+    already start with it (`funding_rate` stays `funding_rate`).
+    """
+
+    name: str
+    directory: Path
+    suffix: str
+    lag: timedelta = timedelta(0)
+    max_staleness: timedelta | None = None
+    columns: tuple[str, ...] | None = None
+    prefix: str | None = None
+
+    def feature_name(self, column: str) -> str:
+        if self.prefix is not None:
+            return f"{self.prefix}{column}"
+        namespace = f"{self.name}_"
+        return column if column.startswith(namespace) else f"{namespace}{column}"
+
+
+DATA_ROOT = Path("data")
+
+DEFAULT_SOURCES: tuple[AltDataSource, ...] = (
+    # Funding prints at fundingTime; OI history is stamped at the end of each 5m bucket.
+    AltDataSource("funding", DATA_ROOT / "funding", "_funding.parquet", max_staleness=timedelta(hours=16)),
+    # Glassnode/LunarCrush/DefiLlama stamp daily values at the start of the period they describe.
+    AltDataSource("onchain", DATA_ROOT / "onchain", "_onchain.parquet", lag=timedelta(hours=24), max_staleness=timedelta(days=3)),
+    AltDataSource("sentiment", DATA_ROOT / "sentiment", "_sentiment.parquet", lag=timedelta(hours=24), max_staleness=timedelta(days=3)),
+    AltDataSource("defi", DATA_ROOT / "defi", "_defi.parquet", lag=timedelta(hours=24), max_staleness=timedelta(days=3)),
+    AltDataSource(
+        "tokenomics",
+        DATA_ROOT / "tokenomics",
+        "_events.parquet",
+        max_staleness=timedelta(days=1),
+        columns=("amount", "amount_usd"),
+        prefix="unlock_",
+    ),
+)
+
+
+def to_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """Return UTC int64 nanoseconds for a (tz-aware or naive-UTC) datetime index."""
+
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return np.asarray(index, dtype="datetime64[ns]").view(np.int64)
+
+
+def asof_positions(
+    source_ns: np.ndarray,
+    bar_ns: np.ndarray,
+    lag_ns: int = 0,
+    max_staleness_ns: int | None = None,
+) -> np.ndarray:
+    """
+    Row of `source_ns` visible at each bar, or -1 when nothing has been published yet / it is stale.
+
+    `source_ns` must be sorted ascending; duplicated timestamps resolve to the last row (keep-last).
+    """
+
+    published = source_ns + lag_ns
+    positions = np.searchsorted(published, bar_ns, side="right") - 1
+    if max_staleness_ns is not None and positions.size:
+        age = bar_ns - published[np.maximum(positions, 0)]
+        positions[age > max_staleness_ns] = -1
+    return positions
+
+
+def asof_take(values: np.ndarray, positions: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Gather rows of a 2-D `values` array by `positions`, writing NaN where positions are -1."""
+
+    if out is None:
+        out = np.empty((positions.size, values.shape[1]), dtype=np.float64)
+    if values.shape[0] == 0:
+        out[:] = np.nan
+        return out
+    np.take(values, np.maximum(positions, 0), axis=0, out=out)
+    out[positions < 0] = np.nan
+    return out
+
+
+class AsOfJoinEngine:
+    """Aligns every configured alt-data source onto a common bar index for a set of symbols."""
+
+    def __init__(self, sources: Sequence[AltDataSource] = DEFAULT_SOURCES) -> None:
+        self.sources = tuple(sources)
+        self._cache: dict[tuple[str, str], tuple[np.ndarray, np.ndarray, list[str]]] = {}
+        self._column_cache: dict[tuple[str, str], list[tuple[str, np.ndarray, np.ndarray]]] = {}
+
+    def load(self, source: AltDataSource, symbol: str) -> tuple[np.ndarray, np.ndarray, list[str]]:
+        """Cached `(source_ns, values, columns)` for one source/symbol, sorted by source timestamp."""
+
+        key = (source.name, symbol.lower())
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        path = source.directory / f"{symbol.lower()}{source.suffix}"
+        frame = pd.read_parquet(path) if path.exists() else pd.DataFrame()
+        if source.columns is not None:
+            frame = frame.reindex(columns=list(source.columns))
+        frame = frame.select_dtypes(include="number")
+        if frame.empty:
+            loaded = (np.empty(0, dtype=np.int64), np.empty((0, frame.shape[1])), list(frame.columns))
+        else:
+            times = to_ns(frame.index)
+            order = np.argsort(times, kind="stable")
+            loaded = (times[order], frame.to_numpy(dtype=np.float64)[order], list(frame.columns))
+        self._cache[key] = loaded
+        return loaded
+
+    def load_columns(self, source: AltDataSource, symbol: str) -> list[tuple[str, np.ndarray, np.ndarray]]:
+        """
+        Cached `(column, source_ns, values)` per column, keeping only the rows where that column is
+        present, so a sparse column is joined against its own prints rather than the whole file's rows.
+        """
+
+        key = (source.name, symbol.lower())
+        cached = self._column_cache.get(key)
+        if cached is None:
+            times, values, names = self.load(source, symbol)
+            cached = []
+            for j, name in enumerate(names):
+                present = ~np.isnan(values[:, j])
+                cached.append((name, times[present], values[present, j]))
+            self._column_cache[key] = cached
+        return cached
+
+    def columns(self, symbols: Iterable[str]) -> list[str]:
+        """Union of output feature names across `symbols`, in source order."""
+
+        names: dict[str, tuple[str, str]] = {}
+        for source in self.sources:
+            for symbol in symbols:
+                for column in self.load(source, symbol)[2]:
+                    name = source.feature_name(column)
+                    owner = names.setdefault(name, (source.name, column))
+                    if owner != (source.name, column):
+                        raise ValueError(f"Alt-data column '{name}' is produced by both {owner} and {(source.name, column)}")
+        return list(names)
+
+    def join_array(
+        self,
+        bar_index: pd.DatetimeIndex,
+        symbols: Sequence[str],
+    ) -> tuple[np.ndarray, list[str]]:
+        """
+        Return a `(symbols, bars, features)` float64 array plus feature names.
+        Missing sources/columns for a symbol are left as NaN; lag and staleness apply per column.
+        """
+
+        bar_ns = to_ns(bar_index)
+        columns = self.columns(symbols)
+        col_index = {name: i for i, name in enumerate(columns)}
+        out = np.full((len(symbols), bar_ns.size, len(columns)), np.nan, dtype=np.float64)
+
+        for source in self.sources:
+            lag_ns = pd.Timedelta(source.lag).value
+            staleness_ns = None if source.max_staleness is None else pd.Timedelta(source.max_staleness).value
+            for s, symbol in enumerate(symbols):
+                for name, times, values in self.load_columns(source, symbol):
+                    if times.size == 0:
+                        continue
+                    positions = asof_positions(times, bar_ns, lag_ns, staleness_ns)
+                    column = out[s][:, col_index[source.feature_name(name)]]
+                    np.take(values, np.maximum(positions, 0), out=column)
+                    column[positions < 0] = np.nan
+        return out, columns
+
+    def join(self, bar_index: pd.DatetimeIndex, symbols: Sequence[str]) -> pd.DataFrame:
+        """Model-ready long frame indexed by `(symbol, timestamp)` with one column per feature."""
+
+        values, columns = self.join_array(bar_index, symbols)
+        index = pd.MultiIndex.from_product([list(symbols), pd.DatetimeIndex(bar_index)], names=["symbol", "timestamp"])
+        return pd.DataFrame(values.reshape(-1, len(columns)), index=index, columns=columns)
+
+
+__all__ = [
+    "AltDataSource",
+    "DEFAULT_SOURCES",
+    "AsOfJoinEngine",
+    "asof_positions",
+    "asof_take",
+    "to_ns",
+]
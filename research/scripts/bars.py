@@ -0,0 +1,317 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Multi-resolution bar consolidation (minute -> 5m / 1h / 4h / 1d).
+
+Features such as `roc_{window}h` are defined on hourly bars while the algorithm subscribes to minute
+data. `consolidate` builds every coarser resolution in one cascaded pass (each level is reduced from
+the previous one with `ufunc.reduceat`), `StreamingConsolidator` does the same incrementally inside
+`OnData` for a whole symbol vector, and `BarCache` keeps each resolution on disk so research code
+does not resample minute history repeatedly.
+
+Timestamps follow QC history frames: a bar is stamped with its *end* time, so the 1h bar labelled
+10:00 aggregates minute bars stamped 09:01 .. 10:00.
+"""
+
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.alt_data import to_ns
+from research.scripts.state import SnapshotError, capture_fields, restore_fields
+
+OHLCV = ("open", "high", "low", "close", "volume")
+DEFAULT_RESOLUTIONS: tuple[str, ...] = ("5min", "1h", "4h", "1D")
+
+
+def _period_ns(resolution: str) -> int:
+    return pd.Timedelta(resolution).value
+
+
+def _reduce(
+    end_ns: np.ndarray,
+    values: np.ndarray,
+    period: int,
+    base: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Aggregate `(bars, 5)` OHLCV rows stamped at `end_ns` into `period` buckets (end-stamped)."""
+
+    bucket = (end_ns - base) // period
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], bucket.size] - 1
+    out = np.empty((starts.size, 5))
+    out[:, 0] = values[starts, 0]
+    out[:, 1] = np.fmax.reduceat(values[:, 1], starts)
+    out[:, 2] = np.fmin.reduceat(values[:, 2], starts)
+    out[:, 3] = values[ends, 3]
+    out[:, 4] = np.add.reduceat(np.nan_to_num(values[:, 4]), starts)
+    return (bucket[starts] + 1) * period, out
+
+
+def consolidate(
+    minute: pd.DataFrame,
+    resolutions: Sequence[str] = DEFAULT_RESOLUTIONS,
+    base: str = "1min",
+    include_partial: bool = False,
+) -> dict[str, pd.DataFrame]:
+    """
+    Consolidate an end-stamped OHLCV frame into each of `resolutions` (ascending, each a multiple of
+    the previous). With `include_partial=False` a trailing bucket that has not closed yet is dropped.
+    """
+
+    frame = minute.sort_index()
+    tz = getattr(frame.index, "tz", None)
+    end_ns = to_ns(frame.index)
+    values = frame.reindex(columns=list(OHLCV)).to_numpy(dtype=np.float64)
+    level_base = _period_ns(base)
+    last_end = end_ns[-1] if end_ns.size else 0
+
+    out: dict[str, pd.DataFrame] = {}
+    for resolution in resolutions:
+        period = _period_ns(resolution)
+        if period % level_base:
+            raise ValueError(f"{resolution} is not a multiple of the previous resolution")
+        if end_ns.size:
+            end_ns, values = _reduce(end_ns, values, period, level_base)
+            if not include_partial and end_ns[-1] > last_end:
+                end_ns, values = end_ns[:-1], values[:-1]
+        index = pd.DatetimeIndex(end_ns.astype("datetime64[ns]"), name=frame.index.name)
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+        out[resolution] = pd.DataFrame(values, index=index, columns=list(OHLCV))
+        level_base = period
+    return out
+
+
+class StreamingConsolidator:
+    """
+    Incremental consolidation for a fixed symbol vector.
+
+    `update` takes one minute of OHLCV arrays (NaN where a symbol printed no bar) and returns the
+    resolutions whose bucket closed on this bar. Closed bars are kept in per-resolution ring buffers
+    shaped `(history, symbols, 5)`; read them with `history(resolution)`.
+    """
+
+    _STATE_FIELDS = ("_bucket", "_open", "_working", "_history", "_history_end", "_count")
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        resolutions: Sequence[str] = DEFAULT_RESOLUTIONS,
+        base: str = "1min",
+        history: int = 500,
+    ) -> None:
+        self.symbols = tuple(symbols)
+        self.resolutions = tuple(resolutions)
+        self.base_ns = _period_ns(base)
+        self.periods = np.array([_period_ns(r) for r in self.resolutions], dtype=np.int64)
+        n, r = len(self.symbols), len(self.resolutions)
+        self.capacity = history
+        self._bucket = np.zeros(r, dtype=np.int64)
+        self._open = np.zeros(r, dtype=bool)
+        self._working = np.full((r, n, 5), np.nan)
+        self._history = np.full((r, history, n, 5), np.nan)
+        self._history_end = np.zeros((r, history), dtype=np.int64)
+        self._count = np.zeros(r, dtype=np.int64)
+
+    def _close(self, levels: np.ndarray, closed: list[str]) -> None:
+        for level in levels:
+            slot = self._count[level] % self.capacity
+            self._history[level, slot] = self._working[level]
+            self._history_end[level, slot] = (self._bucket[level] + 1) * self.periods[level]
+            self._count[level] += 1
+            self._working[level] = np.nan
+            self._open[level] = False
+            closed.append(self.resolutions[level])
+
+    def update(self, end_ns: int, bar: np.ndarray) -> list[str]:
+        """
+        Fold one bar per symbol (`bar` is `(symbols, 5)` OHLCV, stamped at `end_ns`) into every
+        resolution; returns the resolutions that closed a bucket on this bar.
+        """
+
+        closed: list[str] = []
+        bucket = (end_ns - self.base_ns) // self.periods
+        # Missing boundary bar (data gap): the previous bucket closes when a later one starts.
+        self._close(np.flatnonzero(self._open & (bucket > self._bucket)), closed)
+        self._bucket[:] = bucket
+
+        working = self._working
+        fresh = np.isnan(working[:, :, 0])
+        working[:, :, 0] = np.where(fresh, bar[None, :, 0], working[:, :, 0])
+        working[:, :, 1] = np.fmax(working[:, :, 1], bar[None, :, 1])
+        working[:, :, 2] = np.fmin(working[:, :, 2], bar[None, :, 2])
+        has_close = ~np.isnan(bar[:, 3])
+        working[:, has_close, 3] = bar[None, has_close, 3]
+        working[:, :, 4] = np.nan_to_num(working[:, :, 4]) + np.nan_to_num(bar[None, :, 4])
+        self._open[:] = True
+
+        # The bar whose end time lands on a bucket boundary completes that bucket.
+        self._close(np.flatnonzero(end_ns % self.periods == 0), closed)
+        return closed
+
+    def history(self, resolution: str, length: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return `(end_ns, bars)` for the last `length` closed bars, oldest first; bars are `(k, symbols, 5)`."""
+
+        level = self.resolutions.index(resolution)
+        count = int(min(self._count[level], self.capacity))
+        length = count if length is None else min(length, count)
+        slots = (np.arange(self._count[level] - length, self._count[level])) % self.capacity
+        return self._history_end[level, slots], self._history[level, slots]
+
+    def closes(self, resolution: str, length: int | None = None) -> np.ndarray:
+        """`(k, symbols)` close matrix for the last `length` closed bars of `resolution`."""
+
+        return self.history(resolution, length)[1][:, :, 3]
+
+    def get_state(self) -> dict:
+        return {"symbols": self.symbols, "resolutions": self.resolutions, **capture_fields(self, self._STATE_FIELDS)}
+
+    def set_state(self, state: dict) -> None:
+        if tuple(state["symbols"]) != self.symbols or tuple(state["resolutions"]) != self.resolutions:
+            raise SnapshotError("consolidator snapshot was taken for different symbols/resolutions")
+        restore_fields(self, state, self._STATE_FIELDS)
+
+
+class BarBuffer:
+    """
+    Preallocated `(capacity, symbols, 5)` OHLCV ring for routing live bars by column index.
+
+    Callers resolve symbols to columns once (at subscription time) and `write` whole slices with
+    array indexing; symbols without a bar in a slice stay NaN for that row. Symbol columns are
+    reserved geometrically, so adding a universe one symbol at a time copies the ring `O(log n)`
+    times instead of once per symbol.
+    """
+
+    def __init__(self, symbols: Sequence[str], capacity: int = 1440) -> None:
+        self.symbols = list(symbols)
+        self.capacity = capacity
+        self._store = np.full((capacity, max(len(self.symbols), 4), 5), np.nan)
+        self._end = np.zeros(capacity, dtype=np.int64)
+        self.count = 0
+
+    @property
+    def _bars(self) -> np.ndarray:
+        """`(capacity, symbols, 5)` view of the used columns."""
+
+        return self._store[:, : len(self.symbols)]
+
+    @_bars.setter
+    def _bars(self, value: np.ndarray) -> None:
+        self._store[:, : len(self.symbols)] = value
+
+    def add_symbol(self, symbol: str) -> int:
+        """Append a column (e.g. a universe addition) and return its index."""
+
+        column = len(self.symbols)
+        if column == self._store.shape[1]:
+            grown = np.full((self.capacity, 2 * column, 5), np.nan)
+            grown[:, :column] = self._store
+            self._store = grown
+        self.symbols.append(symbol)
+        return column
+
+    def next_row(self, end_ns: int) -> np.ndarray:
+        """Claim the next slot for `end_ns` and return its NaN-filled `(symbols, 5)` row to fill in place."""
+
+        slot = self.count % self.capacity
+        row = self._bars[slot]
+        row.fill(np.nan)
+        self._end[slot] = end_ns
+        self.count += 1
+        return row
+
+    def write(self, end_ns: int, columns: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Store one time slice: `values[k]` is the OHLCV row for column `columns[k]`. Returns the row."""
+
+        row = self.next_row(end_ns)
+        if len(columns):
+            row[columns] = values
+        return row
+
+    def latest(self) -> np.ndarray:
+        """Most recent `(symbols, 5)` slice."""
+
+        return self._bars[(self.count - 1) % self.capacity]
+
+    def window(self, length: int) -> tuple[np.ndarray, np.ndarray]:
+        """Last `length` slices, oldest first, as `(end_ns, (k, symbols, 5))`."""
+
+        length = min(length, self.count, self.capacity)
+        slots = np.arange(self.count - length, self.count) % self.capacity
+        return self._end[slots], self._bars[slots]
+
+    def get_state(self) -> dict:
+        return {"symbols": list(self.symbols), **capture_fields(self, ("_bars", "_end", "count"))}
+
+    def set_state(self, state: dict) -> None:
+        if list(state["symbols"]) != self.symbols:
+            raise SnapshotError("bar buffer snapshot was taken for a different symbol list")
+        restore_fields(self, state, ("_bars", "_end", "count"))
+
+
+class BarCache:
+    """
+    On-disk cache of consolidated bars: `<root>/<resolution>/<symbol>.parquet`.
+
+    `build` consolidates a minute frame into every resolution once; later calls to `get` read the
+    cached file. When the minute data extends past the cache, only the minutes after the earliest
+    last-cached bar are consolidated and the closed bars past each resolution's last cached bar are
+    appended (cached bars are never revised; pass `overwrite=True` to rebuild from scratch).
+    """
+
+    def __init__(self, root: Path = Path("data") / "bars", resolutions: Sequence[str] = DEFAULT_RESOLUTIONS) -> None:
+        self.root = Path(root)
+        self.resolutions = tuple(resolutions)
+
+    def path(self, symbol: str, resolution: str) -> Path:
+        return self.root / resolution / f"{symbol.lower()}.parquet"
+
+    def build(self, symbol: str, minute: pd.DataFrame, overwrite: bool = False) -> dict[str, Path]:
+        paths = {resolution: self.path(symbol, resolution) for resolution in self.resolutions}
+        last: dict[str, pd.Timestamp] = {}
+        for resolution, path in paths.items():
+            if not overwrite and path.exists():
+                index = pd.read_parquet(path, columns=["close"]).index
+                if len(index):
+                    last[resolution] = index[-1]
+
+        # Every cached end is a bucket boundary of its own and all finer resolutions, so the minutes
+        # after the earliest one rebuild every bucket that closed after any resolution's cached end.
+        incremental = len(last) == len(self.resolutions)
+        source = minute.sort_index()
+        if incremental:
+            source = source[source.index > min(last.values())]
+        for resolution, frame in consolidate(source, self.resolutions).items():
+            if resolution in last:
+                frame = frame[frame.index > last[resolution]]
+                if frame.empty:
+                    continue
+                frame = pd.concat([pd.read_parquet(paths[resolution]), frame])
+            paths[resolution].parent.mkdir(parents=True, exist_ok=True)
+            frame.to_parquet(paths[resolution])
+        return paths
+
+    def get(self, symbol: str, resolution: str) -> pd.DataFrame:
+        path = self.path(symbol, resolution)
+        if not path.exists():
+            raise FileNotFoundError(f"No cached {resolution} bars for {symbol}; call BarCache.build first.")
+        return pd.read_parquet(path)
+
+    def get_many(self, symbols: Iterable[str], resolution: str, column: str = "close") -> pd.DataFrame:
+        """`bars x symbols` frame of one column, e.g. hourly closes for a universe."""
+
+        return pd.DataFrame({symbol: self.get(symbol, resolution)[column] for symbol in symbols})
+
+
+__all__ = [
+    "OHLCV",
+    "DEFAULT_RESOLUTIONS",
+    "consolidate",
+    "StreamingConsolidator",
+    "BarBuffer",
+    "BarCache",
+]
@@ -0,0 +1,277 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Covariance estimators shared by allocators and risk guards.
+
+Estimators are updated one bar of returns at a time (an `N`-vector aligned to `symbols`) so the per-bar
+cost is O(N^2) instead of re-estimating an `N x N` matrix from a `W`-bar window (O(N^2 * W)).
+Consumers read immutable `CovarianceSnapshot`s; a snapshot is built at most once per bar and shared.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.qc_native_features import bar_returns
+from research.scripts.state import SnapshotError, capture_fields, restore_fields
+
+LEDOIT_WOLF = "ledoit_wolf"
+
+
+def shrink_to_identity(cov: np.ndarray, intensity: float) -> np.ndarray:
+    """Blend `cov` with a scaled identity (average variance on the diagonal)."""
+
+    if intensity <= 0.0:
+        return cov
+    n = cov.shape[0]
+    target = np.trace(cov) / n if n else 0.0
+    shrunk = cov * (1.0 - intensity)
+    shrunk.flat[:: n + 1] += intensity * target
+    return shrunk
+
+
+def ledoit_wolf_intensity(cov: np.ndarray, mean_fourth: float, n_obs: float) -> float:
+    """
+    Optimal Ledoit-Wolf (2004) shrinkage intensity toward `mu * I`.
+
+    `cov` is the biased sample covariance and `mean_fourth` the average of `||x_t - mean||^4`, which
+    is all the estimator needs: `pi = mean_fourth - ||S||_F^2`.
+    """
+
+    n = cov.shape[0]
+    if n == 0 or n_obs < 2:
+        return 1.0
+    mu = np.trace(cov) / n
+    frob = float(np.einsum("ij,ij->", cov, cov))
+    delta = frob - 2.0 * mu * np.trace(cov) + mu * mu * n  # ||S - mu I||_F^2
+    if delta <= 0:
+        return 1.0
+    beta = max(mean_fourth - frob, 0.0) / n_obs
+    return float(min(beta, delta) / delta)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class CovarianceSnapshot:
+    """Read-only view of an estimator at a given update count."""
+
+    symbols: tuple[str, ...]
+    count: int
+    covariance: np.ndarray
+    volatility: np.ndarray
+    correlation: np.ndarray
+    intensity: float
+
+
+class CovarianceEstimator(ABC):
+    """
+    Shared plumbing: price-to-return conversion, shrinkage and cached snapshots. Subclasses implement
+    `update` (fold in one bar of returns) and `_moments`.
+    """
+
+    _STATE_FIELDS: tuple[str, ...] = ("count", "_last_prices")
+
+    def __init__(self, symbols: Sequence[str], min_periods: int) -> None:
+        self.symbols = tuple(symbols)
+        self.min_periods = min_periods
+        self.count = 0
+        self._last_prices: np.ndarray | None = None
+        self._snapshot: CovarianceSnapshot | None = None
+        self._snapshot_key: tuple[int, float | str] | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.min_periods
+
+    @abstractmethod
+    def update(self, returns: np.ndarray) -> None:
+        """Fold one `N`-vector of returns (aligned to `symbols`) into the running estimate."""
+
+    def update_prices(self, prices: np.ndarray) -> None:
+        """Live path: feed the latest close per symbol; returns are taken against the previous call."""
+
+        prices = np.asarray(prices, dtype=np.float64)
+        if self._last_prices is None:
+            self._last_prices = prices.copy()
+            return
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.update(prices / self._last_prices - 1.0)
+        self._last_prices = np.where(np.isnan(prices), self._last_prices, prices)
+
+    def warm_start(self, closes: pd.DataFrame) -> None:
+        """Batch path: replay a `bars x symbols` close frame (columns reordered to `symbols`)."""
+
+        closes = closes.reindex(columns=list(self.symbols))
+        for row in bar_returns(closes).iloc[1:].to_numpy(dtype=np.float64):
+            self.update(row)
+        if len(closes):
+            self._last_prices = closes.iloc[-1].to_numpy(dtype=np.float64)
+
+    def get_state(self) -> dict:
+        """Running sums for a warm restart (see `research.scripts.state`)."""
+
+        return {"symbols": self.symbols, **capture_fields(self, self._STATE_FIELDS)}
+
+    def set_state(self, state: dict) -> None:
+        if tuple(state["symbols"]) != self.symbols:
+            raise SnapshotError("covariance snapshot was taken for a different symbol list")
+        restore_fields(self, state, self._STATE_FIELDS)
+        self._snapshot = None
+        self._snapshot_key = None
+
+    @abstractmethod
+    def _moments(self) -> tuple[np.ndarray, float, float]:
+        """Return (biased covariance, mean fourth moment, effective sample size)."""
+
+    def covariance(self, shrinkage: float | str = 0.0) -> np.ndarray:
+        """Writable copy of the (optionally shrunk) covariance; `shrinkage` may be `"ledoit_wolf"`."""
+
+        return np.array(self.snapshot(shrinkage).covariance)
+
+    def snapshot(self, shrinkage: float | str = LEDOIT_WOLF) -> CovarianceSnapshot:
+        key = (self.count, shrinkage)
+        if self._snapshot is not None and self._snapshot_key == key:
+            return self._snapshot
+
+        cov, fourth, n_obs = self._moments()
+        intensity = ledoit_wolf_intensity(cov, fourth, n_obs) if shrinkage == LEDOIT_WOLF else float(shrinkage)
+        cov = shrink_to_identity(cov, intensity)
+        vol = np.sqrt(np.maximum(np.diag(cov), 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(vol, vol)
+        corr[~np.isfinite(corr)] = 0.0
+        np.fill_diagonal(corr, 1.0)
+
+        self._snapshot = CovarianceSnapshot(
+            symbols=self.symbols,
+            count=self.count,
+            covariance=_read_only(cov),
+            volatility=_read_only(vol),
+            correlation=_read_only(corr),
+            intensity=intensity,
+        )
+        self._snapshot_key = key
+        return self._snapshot
+
+
+class EwmaCovariance(CovarianceEstimator):
+    """Exponentially weighted covariance with O(N^2) per-bar updates."""
+
+    _STATE_FIELDS = CovarianceEstimator._STATE_FIELDS + ("_mean", "_cov", "_fourth")
+
+    def __init__(self, symbols: Sequence[str], halflife: float = 168.0, min_periods: int = 24) -> None:
+        super().__init__(symbols, min_periods)
+        self.alpha = 1.0 - 0.5 ** (1.0 / halflife)
+        n = len(self.symbols)
+        self._mean = np.zeros(n)
+        self._cov = np.zeros((n, n))
+        self._fourth = 0.0
+
+    def update(self, returns: np.ndarray) -> None:
+        """Fold one bar of returns into the estimate; NaNs (no bar for that symbol) count as zero."""
+
+        x = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0)
+        self.count += 1
+        if self.count == 1:
+            self._mean[:] = x
+            return
+        a = self.alpha
+        delta = x - self._mean
+        self._mean += a * delta
+        # West-style EW update: C <- (1 - a) * (C + a * d d^T)
+        self._cov += a * np.outer(delta, delta)
+        self._cov *= 1.0 - a
+        self._fourth += a * (float(delta @ delta) ** 2 - self._fourth)
+
+    def _moments(self) -> tuple[np.ndarray, float, float]:
+        # Effective number of observations of an EW window with decay `a`.
+        n_obs = min(self.count, (2.0 - self.alpha) / self.alpha)
+        return self._cov.copy(), self._fourth, n_obs
+
+
+class RollingCovariance(CovarianceEstimator):
+    """
+    Equal-weighted covariance over the last `window` bars.
+
+    Keeps running sums of `x`, `x x^T`, `||x||^2 x` and `||x||^4` over a ring buffer: adding the new
+    bar and evicting the oldest are rank-one updates. Sums are rebuilt from the buffer every
+    `window` updates to stop floating-point drift.
+    """
+
+    _STATE_FIELDS = CovarianceEstimator._STATE_FIELDS + ("_buffer", "_sum", "_outer", "_sq_x", "_sq_sq", "_sq")
+
+    def __init__(self, symbols: Sequence[str], window: int = 168, min_periods: int | None = None) -> None:
+        super().__init__(symbols, window if min_periods is None else min_periods)
+        n = len(self.symbols)
+        self.window = window
+        self._buffer = np.zeros((window, n))
+        self._sum = np.zeros(n)
+        self._outer = np.zeros((n, n))
+        self._sq_x = np.zeros(n)  # sum of ||x||^2 * x
+        self._sq_sq = 0.0  # sum of ||x||^4
+        self._sq = 0.0  # sum of ||x||^2
+
+    @property
+    def size(self) -> int:
+        return min(self.count, self.window)
+
+    def _accumulate(self, x: np.ndarray, sign: float) -> None:
+        sq = float(x @ x)
+        self._sum += sign * x
+        self._outer += sign * np.outer(x, x)
+        self._sq_x += sign * sq * x
+        self._sq_sq += sign * sq * sq
+        self._sq += sign * sq
+
+    def _rebuild(self) -> None:
+        data = self._buffer[: self.size]
+        sq = np.einsum("ij,ij->i", data, data)
+        self._sum = data.sum(axis=0)
+        self._outer = data.T @ data
+        self._sq_x = sq @ data
+        self._sq_sq = float(sq @ sq)
+        self._sq = float(sq.sum())
+
+    def update(self, returns: np.ndarray) -> None:
+        x = np.nan_to_num(np.asarray(returns, dtype=np.float64), nan=0.0)
+        slot = self.count % self.window
+        if self.count >= self.window:
+            self._accumulate(self._buffer[slot], -1.0)
+        self._buffer[slot] = x
+        self._accumulate(x, 1.0)
+        self.count += 1
+        if self.count % self.window == 0:
+            self._rebuild()
+
+    def _moments(self) -> tuple[np.ndarray, float, float]:
+        t = self.size
+        if t == 0:
+            n = len(self.symbols)
+            return np.zeros((n, n)), 0.0, 0.0
+        mean = self._sum / t
+        cov = self._outer / t - np.outer(mean, mean)
+        # sum_t ||x_t - m||^4 = sum (a_t - 2 b_t + c)^2 with a_t = ||x_t||^2, b_t = x_t.m, c = ||m||^2.
+        c = float(mean @ mean)
+        sum_b2 = float(mean @ self._outer @ mean)
+        sum_ab = float(self._sq_x @ mean)
+        fourth = self._sq_sq + 4.0 * sum_b2 + t * c * c - 4.0 * sum_ab + 2.0 * c * self._sq - 4.0 * c * c * t
+        return cov, fourth / t, float(t)
+
+
+__all__ = [
+    "CovarianceSnapshot",
+    "CovarianceEstimator",
+    "EwmaCovariance",
+    "RollingCovariance",
+    "LEDOIT_WOLF",
+    "ledoit_wolf_intensity",
+    "shrink_to_identity",
+]
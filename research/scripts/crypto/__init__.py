@@ -24,4 +24,16 @@ def annualize_funding(rate: float, periods_per_year: int = 365) -> float:
     return (1 + rate) ** periods_per_year - 1
 
 
-# TODO: add basis spread calculators, ADL risk estimators, custody reconciliation workflows.
+from research.scripts.crypto.carry import (  # noqa: E402
+    CarryEngine,
+    CarryInputs,
+    align_inputs,
+    annualize_rates,
+    basis,
+    compute_carry,
+    load_funding,
+    oi_weighted,
+    rolling_zscore,
+)
+
+# TODO: add ADL risk estimators, custody reconciliation workflows.
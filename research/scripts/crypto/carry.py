@@ -0,0 +1,320 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Vectorized carry analytics for perpetual futures.
+
+Inputs are `funding.run_pipeline` caches (`funding_rate` in percent per funding interval,
+`open_interest_usd`, optional `mark_price`) and spot closes. Everything is aligned once onto a common
+bar index as `(bars, symbols)` arrays (funding as-of its print time, with a staleness limit), then:
+
+- annualized funding: `rate * periods_per_year` (or compounded),
+- perp-spot basis: `perp / spot - 1` on every bar from perp closes, or, from funding-cache mark
+  prices, at each mark's own timestamp against spot as-of that time (then carried forward),
+- rolling carry z-scores from cumulative sums (NaN-aware, no per-window loops),
+- OI-weighted funding across the universe per bar.
+
+`CarryEngine` keeps the same quantities incrementally for live use: one `update` per bar with
+`N`-vectors, O(N) work, and a ring buffer for the z-score window. Its staleness limit is
+`FUNDING_STALENESS` expressed in bars of the feed's `bar_period`.
+"""
+
+from dataclasses import dataclass
+import math
+from datetime import timedelta
+from pathlib import Path
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.alt_data import asof_positions, asof_take, to_ns
+
+FUNDING_PERIODS_PER_YEAR = 3 * 365  # Binance perps fund every 8h
+FUNDING_STALENESS = timedelta(hours=16)
+# Window variance below this fraction of the mean square is running-sum rounding: the window is flat.
+FLAT_VARIANCE = 1e-12
+CARRY_METRICS = ("annualized_funding", "basis", "carry_zscore")
+
+
+def annualize_rates(rates: np.ndarray, periods_per_year: float = FUNDING_PERIODS_PER_YEAR, compound: bool = False) -> np.ndarray:
+    """Annualize per-interval decimal rates (array version of `annualize_funding`)."""
+
+    rates = np.asarray(rates, dtype=np.float64)
+    if compound:
+        return np.expm1(np.log1p(rates) * periods_per_year)
+    return rates * periods_per_year
+
+
+def basis(perp: np.ndarray, spot: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.asarray(perp, dtype=np.float64) / np.asarray(spot, dtype=np.float64) - 1.0
+
+
+def rolling_zscore(values: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """
+    Column-wise rolling z-score of the latest value against the trailing `window` rows (sample std,
+    NaNs ignored), matching `pandas.rolling(window, min_periods).mean()/std()`. Flat windows
+    (stepwise funding between prints) have no defined z-score and return NaN.
+    """
+
+    x = np.asarray(values, dtype=np.float64)
+    x2d = x.reshape(x.shape[0], -1)
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(x2d)
+    filled = np.where(valid, x2d, 0.0)
+
+    def window_sum(a: np.ndarray) -> np.ndarray:
+        c = np.cumsum(a, axis=0)
+        c[window:] = c[window:] - c[:-window].copy()
+        return c
+
+    count = window_sum(valid.astype(np.float64))
+    total = window_sum(filled)
+    total_sq = window_sum(filled * filled)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        var = np.maximum(total_sq - count * mean * mean, 0.0) / (count - 1)
+        z = (x2d - mean) / np.sqrt(var)
+        flat = var <= FLAT_VARIANCE * total_sq / count
+    z[(count < max(min_periods, 2)) | ~valid | flat] = np.nan
+    return z.reshape(x.shape)
+
+
+def oi_weighted(values: np.ndarray, open_interest: np.ndarray) -> np.ndarray:
+    """Per-row OI-weighted average across symbols; symbols missing either input are excluded."""
+
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(open_interest, dtype=np.float64)
+    mask = ~(np.isnan(values) | np.isnan(weights)) & (weights > 0)
+    w = np.where(mask, weights, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (np.where(mask, values, 0.0) * w).sum(axis=-1) / w.sum(axis=-1)
+
+
+@dataclass(frozen=True)
+class CarryInputs:
+    """
+    Funding/OI/perp histories aligned onto `index` as `(bars, symbols)` arrays (decimal rates).
+
+    `basis` is the perp-spot basis known at each bar. With perp closes it is `perp / spot - 1` on the
+    bar; with funding-cache marks it was measured at the mark's timestamp and `perp` is that mark,
+    carried forward.
+    """
+
+    index: pd.DatetimeIndex
+    symbols: tuple[str, ...]
+    funding: np.ndarray
+    open_interest: np.ndarray
+    perp: np.ndarray
+    spot: np.ndarray
+    basis: np.ndarray
+
+
+def align_inputs(
+    funding: Mapping[str, pd.DataFrame],
+    spot: pd.DataFrame,
+    perp: pd.DataFrame | None = None,
+    staleness: timedelta = FUNDING_STALENESS,
+) -> CarryInputs:
+    """
+    Align per-symbol `funding.run_pipeline` frames onto the spot close index (columns = symbols).
+
+    Funding prints are joined as-of their print time and masked after `staleness`; open interest and
+    `mark_price` as-of their own rows. With `perp` closes, basis is computed bar by bar. Otherwise it
+    comes from the funding cache's `mark_price`. Each mark is divided by the spot close as-of the
+    mark's timestamp, and that basis is carried forward, masked after `staleness`. A mark that is
+    hours old is therefore never compared with the current spot close.
+    """
+
+    symbols = tuple(spot.columns)
+    bar_ns = to_ns(spot.index)
+    shape = (bar_ns.size, len(symbols))
+    rates = np.full(shape, np.nan)
+    oi = np.full(shape, np.nan)
+    marks = np.full(shape, np.nan)
+    mark_basis = np.full(shape, np.nan)
+    stale_ns = pd.Timedelta(staleness).value
+    spot_values = spot.to_numpy(dtype=np.float64)
+    for j, symbol in enumerate(symbols):
+        frame = funding.get(symbol)
+        if frame is None or frame.empty:
+            continue
+        frame = frame.sort_index()
+        times = to_ns(frame.index)
+        for column, out, scale, limit in (
+            ("funding_rate", rates, 0.01, stale_ns),  # cached in percent
+            ("open_interest_usd", oi, 1.0, None),
+            ("mark_price", marks, 1.0, stale_ns),
+        ):
+            if column not in frame.columns:
+                continue
+            present = frame[column].notna().to_numpy()
+            values = frame[column].to_numpy(dtype=np.float64)[present, None] * scale
+            positions = asof_positions(times[present], bar_ns, 0, limit)
+            out[:, j] = asof_take(values, positions)[:, 0]
+            if column == "mark_price" and perp is None:
+                # Spot as-of each mark's timestamp (bars are end-stamped), then carry the basis forward.
+                spot_at_mark = asof_take(spot_values[:, j : j + 1], asof_positions(bar_ns, times[present], 0, limit))
+                mark_basis[:, j] = asof_take(basis(values, spot_at_mark), positions)[:, 0]
+
+    if perp is not None:
+        perp_values = perp.reindex(index=spot.index, columns=list(symbols)).to_numpy(dtype=np.float64)
+        spread = basis(perp_values, spot_values)
+    else:
+        perp_values, spread = marks, mark_basis
+    return CarryInputs(pd.DatetimeIndex(spot.index), symbols, rates, oi, perp_values, spot_values, spread)
+
+
+def load_funding(symbols: Sequence[str], directory: Path = Path("data") / "funding") -> dict[str, pd.DataFrame]:
+    """Read `<directory>/<symbol>_funding.parquet` for every symbol that has a cache."""
+
+    frames = {}
+    for symbol in symbols:
+        path = Path(directory) / f"{symbol.lower()}_funding.parquet"
+        if path.exists():
+            frames[symbol] = pd.read_parquet(path)
+    return frames
+
+
+def compute_carry(
+    inputs: CarryInputs,
+    zscore_window: int = 24 * 30,
+    periods_per_year: float = FUNDING_PERIODS_PER_YEAR,
+    compound: bool = False,
+) -> pd.DataFrame:
+    """
+    Whole-history carry table: columns `(metric, symbol)` for `CARRY_METRICS` plus
+    `("oi_weighted_funding", "universe")`. Annualized funding is the carry a short-perp / long-spot
+    position earns; `carry_zscore` standardizes it over `zscore_window` bars.
+    """
+
+    annual = annualize_rates(inputs.funding, periods_per_year, compound)
+    spread = inputs.basis
+    z = rolling_zscore(annual, zscore_window, min_periods=max(zscore_window // 4, 2))
+    blocks = {"annualized_funding": annual, "basis": spread, "carry_zscore": z}
+    columns = pd.MultiIndex.from_product([list(blocks), list(inputs.symbols)], names=["metric", "symbol"])
+    table = pd.DataFrame(np.concatenate(list(blocks.values()), axis=1), index=inputs.index, columns=columns)
+    table[("oi_weighted_funding", "universe")] = oi_weighted(annual, inputs.open_interest)
+    return table
+
+
+class CarryEngine:
+    """
+    Incremental carry for live use: feed one bar of `N`-vectors per `update`.
+
+    Keeps the latest funding / OI per symbol (NaN inputs keep the previous value) and a
+    `(window, N)` ring of annualized funding with running sums for the z-score, rebuilt every
+    `window` updates. Funding expires after `staleness_bars`, which defaults to `FUNDING_STALENESS`
+    divided by `bar_period`: 16 bars on hourly bars, 960 on minute bars.
+
+    `perp` is a fresh perp close or mark per symbol, or NaN when there is none this bar. The basis is
+    measured against the same bar's spot when a perp value arrives and then carried, with the same
+    staleness, as `align_inputs` does for marks.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        zscore_window: int = 24 * 30,
+        min_periods: int | None = None,
+        periods_per_year: float = FUNDING_PERIODS_PER_YEAR,
+        bar_period: timedelta = timedelta(hours=1),
+        staleness_bars: int | None = None,
+    ) -> None:
+        self.symbols = tuple(symbols)
+        n = len(self.symbols)
+        self.window = zscore_window
+        self.min_periods = max(zscore_window // 4, 2) if min_periods is None else min_periods
+        self.periods_per_year = periods_per_year
+        if staleness_bars is None:
+            staleness_bars = math.floor(FUNDING_STALENESS / bar_period)
+        self.staleness_bars = staleness_bars
+        self.count = 0
+        self._funding = np.full(n, np.nan)
+        self._funding_age = np.full(n, np.iinfo(np.int64).max // 2, dtype=np.int64)
+        self._oi = np.full(n, np.nan)
+        self._perp = np.full(n, np.nan)
+        self._basis = np.full(n, np.nan)
+        self._perp_age = np.full(n, np.iinfo(np.int64).max // 2, dtype=np.int64)
+        self._ring = np.full((zscore_window, n), np.nan)
+        self._sum = np.zeros(n)
+        self._sum_sq = np.zeros(n)
+        self._valid = np.zeros(n)
+
+    def _rebuild(self) -> None:
+        valid = ~np.isnan(self._ring)
+        filled = np.where(valid, self._ring, 0.0)
+        self._sum = filled.sum(axis=0)
+        self._sum_sq = (filled * filled).sum(axis=0)
+        self._valid = valid.sum(axis=0).astype(np.float64)
+
+    def update(
+        self,
+        funding_rate: np.ndarray,
+        spot: np.ndarray,
+        open_interest: np.ndarray | None = None,
+        perp: np.ndarray | None = None,
+    ) -> dict[str, np.ndarray | float]:
+        """
+        `funding_rate` is the decimal per-interval rate (NaN when no new print this bar). Returns the
+        current `annualized_funding`, `basis`, `carry_zscore` vectors and `oi_weighted_funding`.
+        """
+
+        rate = np.asarray(funding_rate, dtype=np.float64)
+        fresh = ~np.isnan(rate)
+        self._funding = np.where(fresh, rate, self._funding)
+        self._funding_age = np.where(fresh, 0, self._funding_age + 1)
+        current = np.where(self._funding_age <= self.staleness_bars, self._funding, np.nan)
+        if open_interest is not None:
+            oi = np.asarray(open_interest, dtype=np.float64)
+            self._oi = np.where(np.isnan(oi), self._oi, oi)
+        px = np.full(len(self.symbols), np.nan) if perp is None else np.asarray(perp, dtype=np.float64)
+        fresh_perp = ~np.isnan(px)
+        self._perp = np.where(fresh_perp, px, self._perp)
+        self._basis = np.where(fresh_perp, basis(px, spot), self._basis)
+        self._perp_age = np.where(fresh_perp, 0, self._perp_age + 1)
+
+        annual = annualize_rates(current, self.periods_per_year)
+        slot = self.count % self.window
+        old = self._ring[slot]
+        old_valid = ~np.isnan(old)
+        self._sum -= np.where(old_valid, old, 0.0)
+        self._sum_sq -= np.where(old_valid, old * old, 0.0)
+        self._valid -= old_valid
+        new_valid = ~np.isnan(annual)
+        self._ring[slot] = annual
+        self._sum += np.where(new_valid, annual, 0.0)
+        self._sum_sq += np.where(new_valid, annual * annual, 0.0)
+        self._valid += new_valid
+        self.count += 1
+        if self.count % self.window == 0:
+            self._rebuild()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self._sum / self._valid
+            var = np.maximum(self._sum_sq - self._valid * mean * mean, 0.0) / (self._valid - 1)
+            z = (annual - mean) / np.sqrt(var)
+            flat = var <= FLAT_VARIANCE * self._sum_sq / self._valid
+        z[(self._valid < max(self.min_periods, 2)) | ~new_valid | flat] = np.nan
+        return {
+            "annualized_funding": annual,
+            "basis": np.where(self._perp_age <= self.staleness_bars, self._basis, np.nan),
+            "carry_zscore": z,
+            "oi_weighted_funding": float(oi_weighted(annual, self._oi)),
+        }
+
+
+__all__ = [
+    "FUNDING_PERIODS_PER_YEAR",
+    "CARRY_METRICS",
+    "annualize_rates",
+    "basis",
+    "rolling_zscore",
+    "oi_weighted",
+    "CarryInputs",
+    "align_inputs",
+    "load_funding",
+    "compute_carry",
+    "CarryEngine",
+]
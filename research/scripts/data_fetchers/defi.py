@@ -1,18 +1,24 @@
+from __future__ import annotations
+
 # region imports
 from AlgorithmImports import *
 # endregion
-from __future__ import annotations
 
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Sequence
 
+import numpy as np
 import pandas as pd
 
 from . import utils
 
 DEFILLAMA_PROTOCOL_URL = "https://api.llama.fi/protocol"
 DEFILLAMA_BORROW_URL = "https://yields.llama.fi/pools"
+# Relative to the pipeline's `out_dir`; dot-directories are caches the integrity scan skips.
+POOLS_CACHE_FILE = Path(".cache") / "pools_snapshot.parquet"
+POOLS_TTL = timedelta(hours=6)
 
 
 def _fetch_tvl(protocol: str) -> pd.DataFrame:
@@ -27,39 +33,97 @@ def _fetch_tvl(protocol: str) -> pd.DataFrame:
         df = df.set_index("timestamp")
         df = df.rename(columns={"totalLiquidityUSD": f"tvl_usd_{key.lower()}"})
         frames.append(df[[f"tvl_usd_{key.lower()}"]])
-    return utils.merge_frames(frames)
-
-
-def _fetch_rates(symbol: str) -> pd.DataFrame:
-    data = utils.json_request(DEFILLAMA_BORROW_URL)
-    rows = data.get("data", [])
-    filtered = [
-        row
-        for row in rows
-        if row.get("symbol", "").upper() == symbol.upper() and row.get("apyType") in {"borrow", "supply"}
-    ]
-    if not filtered:
-        return pd.DataFrame()
+    return utils.outer_join(frames)
+
+
+class PoolsTable:
+    """
+    Columnar view of one `yields.llama.fi/pools` snapshot, sorted by (symbol, apy_type).
+
+    `rows(symbol)` is a binary search on the sorted symbol column, so per-symbol queries do not scan
+    the thousands of pools in the payload.
+    """
 
-    records = []
-    for row in filtered:
-        records.append(
+    COLUMNS = ("symbol", "apy_type", "timestamp", "pool", "apy")
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        frame = frame.reindex(columns=list(self.COLUMNS))
+        frame = frame.sort_values(["symbol", "apy_type"], kind="stable").reset_index(drop=True)
+        self.frame = frame
+        self._symbols = frame["symbol"].to_numpy(dtype=str)
+
+    @classmethod
+    def from_payload(cls, rows: list[dict]) -> "PoolsTable":
+        raw = pd.DataFrame.from_records(rows, columns=["symbol", "apyType", "timestamp", "project", "apy"])
+        frame = pd.DataFrame(
             {
-                "timestamp": pd.to_datetime(row["timestamp"], unit="s", utc=True),
-                "pool": row.get("project"),
-                "apy": row.get("apy"),
-                "type": row.get("apyType"),
+                "symbol": raw["symbol"].fillna("").astype(str).str.upper(),
+                "apy_type": raw["apyType"].fillna("").astype(str),
+                "timestamp": pd.to_datetime(raw["timestamp"], unit="s", utc=True, errors="coerce"),
+                "pool": raw["project"],
+                "apy": pd.to_numeric(raw["apy"], errors="coerce"),
             }
         )
+        return cls(frame)
+
+    def __len__(self) -> int:
+        return len(self.frame)
 
-    df = pd.DataFrame(records)
+    def rows(self, symbol: str, apy_types: Sequence[str] = ("borrow", "supply")) -> pd.DataFrame:
+        symbol = symbol.upper()
+        lo = int(np.searchsorted(self._symbols, symbol, side="left"))
+        hi = int(np.searchsorted(self._symbols, symbol, side="right"))
+        block = self.frame.iloc[lo:hi]
+        return block[block["apy_type"].isin(apy_types).to_numpy()]
+
+
+# cache file -> (snapshot mtime, table); the memo ages with the snapshot it was read from.
+_POOLS_MEMO: dict[Path, tuple[float, PoolsTable]] = {}
+
+
+def pools_cache_file(out_dir: Path) -> Path:
+    return Path(out_dir) / POOLS_CACHE_FILE
+
+
+def _load_pools(
+    cache_file: Path,
+    ttl: timedelta = POOLS_TTL,
+    refresh: bool = False,
+) -> PoolsTable:
+    """
+    Pools snapshot shared by every symbol: memoized for the process and cached on disk, both for
+    `ttl` from the snapshot's download time, and downloaded only when the cache is missing or stale
+    (or `refresh=True`).
+    """
+
+    cache_file = Path(cache_file)
+    max_age = ttl.total_seconds()
+    memo = _POOLS_MEMO.get(cache_file)
+    if not refresh and memo is not None and time.time() - memo[0] < max_age:
+        return memo[1]
+
+    fresh = cache_file.exists() and time.time() - cache_file.stat().st_mtime < max_age
+    if fresh and not refresh:
+        table = PoolsTable(pd.read_parquet(cache_file))
+    else:
+        data = utils.json_request(DEFILLAMA_BORROW_URL)
+        table = PoolsTable.from_payload(data.get("data", []))
+        utils.write_time_series(table.frame, cache_file)
+    _POOLS_MEMO[cache_file] = (cache_file.stat().st_mtime, table)
+    return table
+
+
+def _fetch_rates(symbol: str, pools: PoolsTable) -> pd.DataFrame:
+    df = pools.rows(symbol)
     if df.empty:
-        return df
+        return pd.DataFrame()
+
     pivot = (
-        df.pivot_table(index="timestamp", columns="type", values="apy", aggfunc="mean")
+        df.pivot_table(index="timestamp", columns="apy_type", values="apy", aggfunc="mean")
         .rename(columns={"borrow": "borrow_rate", "supply": "supply_rate"})
         .sort_index()
     )
+    pivot.columns.name = "type"
     return pivot
 
 
@@ -80,12 +144,14 @@ def run_pipeline(
     protocol_map : dict
         Mapping of symbol -> DefiLlama protocol slug.
     out_dir : Path
-        Directory for `<symbol>_defi.parquet`.
+        Directory for `<symbol>_defi.parquet`; the shared pools snapshot is cached in
+        `<out_dir>/.cache/pools_snapshot.parquet`.
     """
 
     utils.ensure_directory(out_dir)
     output_files: dict[str, Path] = {}
     cutoff = datetime.now(tz=timezone.utc) - lookback
+    pools: PoolsTable | None = None
 
     for symbol in symbols:
         out_file = out_dir / f"{symbol.lower()}_defi.parquet"
@@ -99,11 +165,14 @@ def run_pipeline(
             tvl = _fetch_tvl(protocol)
             if not tvl.empty:
                 frames.append(tvl)
-        rates = _fetch_rates(symbol)
+        # One pools download per run (and per TTL on disk), shared across symbols.
+        if pools is None:
+            pools = _load_pools(pools_cache_file(out_dir))
+        rates = _fetch_rates(symbol, pools)
         if not rates.empty:
             frames.append(rates / 100.0)  # convert to decimal rates
 
-        combined = utils.merge_frames(frames)
+        combined = utils.outer_join(frames)
         if combined.empty:
             continue
         combined = combined[combined.index >= cutoff]
@@ -1,7 +1,8 @@
+from __future__ import annotations
+
 # region imports
 from AlgorithmImports import *
 # endregion
-from __future__ import annotations
 
 from pathlib import Path
 from typing import Iterable, Mapping
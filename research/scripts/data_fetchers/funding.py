@@ -2,9 +2,11 @@
 from AlgorithmImports import *
 # endregion
 
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Iterable
 
 import pandas as pd
 
@@ -13,6 +15,82 @@ from . import utils
 BINANCE_FUNDING_URL = "https://fapi.binance.com/fapi/v1/fundingRate"
 BINANCE_OI_URL = "https://fapi.binance.com/futures/data/openInterestHist"
 BINANCE_LIMIT = 1000
+# Largest page each endpoint returns; `openInterestHist` caps at 500 whatever `limit` asks for.
+BINANCE_LIMITS = {BINANCE_FUNDING_URL: 1000, BINANCE_OI_URL: 500}
+
+
+# Row spacing per endpoint, used to size windows so one request returns at most `limit` rows.
+FUNDING_INTERVAL = timedelta(hours=8)
+OI_PERIODS = {
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "30m": timedelta(minutes=30),
+    "1h": timedelta(hours=1),
+    "2h": timedelta(hours=2),
+    "4h": timedelta(hours=4),
+    "6h": timedelta(hours=6),
+    "12h": timedelta(hours=12),
+    "1d": timedelta(days=1),
+}
+
+RequestFn = Callable[..., Any]
+
+
+def _parse_page(payload: Any) -> pd.DataFrame:
+    frame = pd.DataFrame(payload)
+    if frame.empty:
+        return frame
+    if "fundingTime" in frame.columns:
+        frame["timestamp"] = pd.to_datetime(frame["fundingTime"], unit="ms", utc=True)
+    elif "timestamp" in frame.columns:
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms", utc=True)
+    else:
+        frame["timestamp"] = pd.to_datetime(frame.iloc[:, 0], unit="ms", utc=True)
+    return frame.set_index("timestamp").sort_index()
+
+
+def split_windows(start_ms: int, end_ms: int, step: timedelta, limit: int) -> list[tuple[int, int]]:
+    """
+    Disjoint `[start, end]` millisecond windows holding at most `limit` rows spaced `step` apart.
+
+    Interior boundaries sit on multiples of the window span (from the epoch), so re-running with a
+    slightly different `start`/`end` reproduces the same interior windows and their checkpoints.
+    """
+
+    span = int(step.total_seconds() * 1000) * limit
+    first = -(-start_ms // span) * span
+    edges = [start_ms, *range(first if first > start_ms else first + span, end_ms, span), end_ms]
+    return [(lo, hi - 1) for lo, hi in zip(edges[:-1], edges[1:]) if hi > lo]
+
+
+def _fetch_window(
+    url: str,
+    params: dict[str, Any],
+    window: tuple[int, int],
+    step: timedelta,
+    limiter: utils.RateLimiter,
+    request: RequestFn,
+) -> pd.DataFrame:
+    """
+    One window, paged forward until the rows reach its end or a page comes back empty. A short page
+    does not end the window: the venue may cap pages below `limit`, so only timestamps decide.
+    """
+
+    lo, hi = window
+    step_ms = int(step.total_seconds() * 1000)
+    pages: list[pd.DataFrame] = []
+    while lo <= hi:
+        limiter.wait()
+        payload = request(url, params={**params, "startTime": lo, "endTime": hi})
+        frame = _parse_page(payload)
+        if frame.empty:
+            break
+        pages.append(frame)
+        last_ms = int(frame.index[-1].timestamp() * 1000)
+        if last_ms + step_ms > hi or last_ms < lo:
+            break
+        lo = last_ms + 1
+    return utils.merge_frames(pages)
 
 
 def _fetch_binance(
@@ -20,42 +98,56 @@ def _fetch_binance(
     symbol: str,
     start: datetime,
     end: datetime,
-    limit: int = BINANCE_LIMIT,
+    limit: int | None = None,
     extra_params: dict[str, str] | None = None,
+    max_workers: int = 4,
+    limiter: utils.RateLimiter | None = None,
+    request: RequestFn | None = None,
+    checkpoint_dir: Path | None = None,
 ) -> pd.DataFrame:
+    """
+    Fetch `[start, end)` by splitting it into disjoint windows and requesting them concurrently.
+
+    All workers share one thread-safe `RateLimiter`, so concurrency only fills the weight budget
+    instead of exceeding it. With `checkpoint_dir`, every finished window is written to
+    `<checkpoint_dir>/<start_ms>_<end_ms>.parquet` and skipped on the next call, so an interrupted
+    pull resumes where it stopped; the directory is removed once the stitched result is returned.
+    `request` defaults to `utils.json_request` and can be replaced by a local mock.
+    """
+
+    limit = limit or BINANCE_LIMITS.get(url, BINANCE_LIMIT)
     params: dict[str, str | int] = {
         "symbol": symbol,
         "limit": limit,
         **(extra_params or {}),
     }
-    limiter = utils.RateLimiter(calls=110, period=60)  # Binance default IP limit
-
-    rows: list[pd.DataFrame] = []
-    start_ms = int(start.timestamp() * 1000)
-    end_ms = int(end.timestamp() * 1000)
-
-    while start_ms < end_ms:
-        limiter.wait()
-        params["startTime"] = start_ms
-        params["endTime"] = min(end_ms, start_ms + limit * 60 * 60 * 1000)
-        payload = utils.json_request(url, params=params)
-        frame = pd.DataFrame(payload)
-        if frame.empty:
-            break
-
-        if "fundingTime" in frame.columns:
-            frame["timestamp"] = pd.to_datetime(frame["fundingTime"], unit="ms", utc=True)
-        elif "timestamp" in frame.columns:
-            frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms", utc=True)
-        else:
-            frame["timestamp"] = pd.to_datetime(frame.iloc[:, 0], unit="ms", utc=True)
-        frame = frame.set_index("timestamp").sort_index()
-        rows.append(frame)
-
-        last_ts = int(frame.index[-1].timestamp() * 1000)
-        start_ms = last_ts + 1
-
-    return utils.merge_frames(rows)
+    limiter = limiter or utils.RateLimiter(calls=110, period=60)  # Binance default IP limit
+    request = request or utils.json_request
+    step = OI_PERIODS.get((extra_params or {}).get("period", ""), FUNDING_INTERVAL)
+    windows = split_windows(int(start.timestamp() * 1000), int(end.timestamp() * 1000), step, limit)
+
+    def window_path(window: tuple[int, int]) -> Path | None:
+        return None if checkpoint_dir is None else checkpoint_dir / f"{window[0]}_{window[1]}.parquet"
+
+    def run(window: tuple[int, int]) -> pd.DataFrame:
+        path = window_path(window)
+        if path is not None and path.exists():
+            return pd.read_parquet(path)
+        frame = _fetch_window(url, params, window, step, limiter, request)
+        if path is not None:
+            utils.write_time_series(frame, path)
+        return frame
+
+    if checkpoint_dir is not None:
+        utils.ensure_directory(checkpoint_dir)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        frames = list(pool.map(run, windows))
+
+    # Windows are disjoint and in time order, so the stitch is a concatenation plus boundary dedup.
+    combined = utils.merge_frames(frames)
+    if checkpoint_dir is not None:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    return combined
 
 
 def run_pipeline(
@@ -64,6 +156,8 @@ def run_pipeline(
     quote: str = "USDT",
     overwrite: bool = False,
     lookback: timedelta = timedelta(days=365),
+    max_workers: int = 4,
+    request: RequestFn | None = None,
 ) -> dict[str, Path]:
     """
     Download funding rate and open-interest history from Binance futures.
@@ -80,12 +174,19 @@ def run_pipeline(
         Re-download even if cache exists.
     lookback : timedelta
         Time span to pull when overwriting/initializing.
+    max_workers : int
+        Concurrent window requests; all share one rate limiter.
+    request : callable or None
+        Replacement for `utils.json_request` (e.g. a local mock of the endpoints).
     """
 
     utils.ensure_directory(out_dir)
     output_files: dict[str, Path] = {}
     end = datetime.now(tz=timezone.utc)
     start = end - lookback
+    limiter = utils.RateLimiter(calls=110, period=60)  # Binance default IP limit, shared by all fetches
+    fetch_options = {"max_workers": max_workers, "limiter": limiter, "request": request}
+    partial_dir = out_dir / ".partial"
 
     for symbol in symbols:
         market = f"{symbol.upper()}{quote.upper()}"
@@ -94,12 +195,23 @@ def run_pipeline(
             output_files[symbol] = out_file
             continue
 
-        funding = _fetch_binance(BINANCE_FUNDING_URL, market, start, end)
+        funding = _fetch_binance(
+            BINANCE_FUNDING_URL,
+            market,
+            start,
+            end,
+            checkpoint_dir=partial_dir / f"{market.lower()}_funding",
+            **fetch_options,
+        )
         if not funding.empty:
             funding = funding.rename(
-                columns={"fundingRate": "funding_rate", "symbol": "market"}
-            )[["funding_rate", "market"]]
+                columns={"fundingRate": "funding_rate", "symbol": "market", "markPrice": "mark_price"}
+            )
+            # Mark price at the funding print feeds the perp-spot basis in `crypto.carry`.
+            funding = funding[[c for c in ("funding_rate", "market", "mark_price") if c in funding.columns]]
             funding["funding_rate"] = funding["funding_rate"].astype(float) * 100
+            if "mark_price" in funding.columns:
+                funding["mark_price"] = pd.to_numeric(funding["mark_price"], errors="coerce")
 
         oi = _fetch_binance(
             BINANCE_OI_URL,
@@ -107,6 +219,8 @@ def run_pipeline(
             start,
             end,
             extra_params={"period": "5m"},
+            checkpoint_dir=partial_dir / f"{market.lower()}_oi",
+            **fetch_options,
         )
         if not oi.empty:
             oi = oi.rename(columns={"sumOpenInterest": "open_interest_usd"})[
@@ -114,7 +228,7 @@ def run_pipeline(
             ]
             oi["open_interest_usd"] = oi["open_interest_usd"].astype(float)
 
-        combined = utils.merge_frames([funding, oi])
+        combined = utils.outer_join([funding, oi])
         if combined.empty:
             continue
 
@@ -2,9 +2,13 @@
 from AlgorithmImports import *
 # endregion
 
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from itertools import chain, zip_longest
 from pathlib import Path
-from typing import Iterable, Literal
+from typing import Any, Callable, Iterable, Literal, Mapping
 
 import pandas as pd
 
@@ -16,6 +20,12 @@ DEFAULT_METRICS: dict[str, str] = {
     "exchange_netflow": "distribution/exchange_net_position_change",
     "whale_tx_usd": "transactions/transfers_volume_exchanges",
 }
+INTERVALS = {"24h": timedelta(days=1), "1h": timedelta(hours=1)}
+# Fetched ranges per (symbol, column), kept next to the parquet caches.
+COVERAGE_FILE = ".onchain_coverage.json"
+
+RequestFn = Callable[..., Any]
+Coverage = dict[str, dict[str, dict[str, str]]]
 
 
 def _fetch_metric(
@@ -26,6 +36,7 @@ def _fetch_metric(
     api_key: str,
     interval: Literal["24h", "1h"] = "24h",
     limiter: utils.RateLimiter | None = None,
+    request: RequestFn | None = None,
 ) -> pd.DataFrame:
     params = {
         "a": symbol.upper(),
@@ -36,7 +47,7 @@ def _fetch_metric(
     }
     if limiter:
         limiter.wait()
-    data = utils.json_request(f"{GLASSNODE_ENDPOINT}/{metric}", params=params)
+    data = (request or utils.json_request)(f"{GLASSNODE_ENDPOINT}/{metric}", params=params)
     frame = pd.DataFrame(data)
     if frame.empty:
         return frame
@@ -49,6 +60,110 @@ def _fetch_metric(
     return frame
 
 
+@dataclass(frozen=True)
+class FetchTask:
+    """One Glassnode request: `endpoint` for `symbol` over `[start, end]`, stored as `column`."""
+
+    symbol: str
+    column: str
+    endpoint: str
+    start: datetime
+    end: datetime
+
+
+def load_coverage(out_dir: Path) -> Coverage:
+    return utils.load_json(Path(out_dir) / COVERAGE_FILE) or {}
+
+
+def save_coverage(out_dir: Path, coverage: Coverage) -> None:
+    path = Path(out_dir) / COVERAGE_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(coverage, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _covered_range(
+    coverage: Coverage,
+    symbol: str,
+    column: str,
+    endpoint: str,
+    interval: str,
+    existing: pd.DataFrame | None,
+) -> tuple[datetime, datetime] | None:
+    """
+    Fetched range for a column: the coverage record, else the column's first/last row in the cache.
+    A record for another endpoint or interval (or a cached column sampled at another interval) is
+    not coverage: the column has to be fetched again in full.
+    """
+
+    record = coverage.get(symbol.lower(), {}).get(column)
+    if record is not None:
+        if record.get("endpoint") != endpoint or record.get("interval") != interval:
+            return None
+        return datetime.fromisoformat(record["start"]), datetime.fromisoformat(record["end"])
+    if existing is None or column not in existing.columns:
+        return None
+    present = existing.index[existing[column].notna().to_numpy()]
+    if present.empty:
+        return None
+    if present.size > 1 and pd.Series(present).diff().median() != INTERVALS[interval]:
+        return None
+    return present[0].to_pydatetime(), present[-1].to_pydatetime()
+
+
+def missing_ranges(
+    start: datetime,
+    end: datetime,
+    covered: tuple[datetime, datetime] | None,
+    step: timedelta,
+) -> list[tuple[datetime, datetime]]:
+    """
+    Parts of `[start, end]` not in `covered`: a head range when the lookback grew and a tail range
+    for new data. The tail starts one `step` before the covered end so the latest (possibly still
+    revising) point is refreshed; gaps shorter than `step` cannot hold a new point and are skipped.
+    """
+
+    if covered is None:
+        return [(start, end)]
+    lo, hi = covered
+    ranges = []
+    if lo - start >= step:
+        ranges.append((start, lo))
+    if end - hi >= step:
+        ranges.append((max(start, hi - step), end))
+    return ranges
+
+
+def plan_fetches(
+    symbols: Iterable[str],
+    metrics: Mapping[str, str],
+    start: datetime,
+    end: datetime,
+    interval: str,
+    coverage: Coverage,
+    existing: Mapping[str, pd.DataFrame | None],
+) -> list[FetchTask]:
+    """
+    Requests needed to bring every (symbol, metric) up to `[start, end]` at `interval`, interleaved
+    round-robin across symbols so a partial run advances all symbols and concurrent workers spread
+    over them.
+    """
+
+    per_symbol = []
+    for symbol in symbols:
+        tasks = []
+        for column, endpoint in metrics.items():
+            covered = _covered_range(coverage, symbol, column, endpoint, interval, existing.get(symbol))
+            for lo, hi in missing_ranges(start, end, covered, INTERVALS[interval]):
+                tasks.append(FetchTask(symbol, column, endpoint, lo, hi))
+        per_symbol.append(tasks)
+    return [task for task in chain.from_iterable(zip_longest(*per_symbol)) if task is not None]
+
+
+def _read_cache(out_file: Path) -> pd.DataFrame | None:
+    return pd.read_parquet(out_file) if out_file.exists() else None
+
+
 def run_pipeline(
     symbols: Iterable[str],
     out_dir: Path,
@@ -56,9 +171,19 @@ def run_pipeline(
     interval: Literal["24h", "1h"] = "24h",
     overwrite: bool = False,
     lookback: timedelta = timedelta(days=365),
+    max_workers: int = 4,
+    request: RequestFn | None = None,
 ) -> dict[str, Path]:
     """
-    Download on-chain metrics from Glassnode (free tier) for each symbol.
+    Download on-chain metrics from Glassnode (free tier) for each symbol, incrementally.
+
+    The fetched range and interval of every (symbol, metric) is tracked in
+    `<out_dir>/.onchain_coverage.json` (falling back to the cached column's first/last row), so
+    reruns at the same interval only request missing head/tail ranges; a column cached at another
+    interval is re-fetched and replaced once the new series arrives. Requests are interleaved
+    across symbols and run on `max_workers` threads sharing one rate limiter. Each symbol's file is
+    written once, when its requests finish: new per-metric columns are laid over the cached file
+    with `utils.outer_join` (new rows win).
 
     Parameters
     ----------
@@ -71,9 +196,13 @@ def run_pipeline(
     interval : {"24h", "1h"}
         Sampling interval supported by Glassnode.
     overwrite : bool
-        If False and a file already exists, skip downloading.
+        If True, ignore cached files and coverage and re-download the full `lookback`.
     lookback : timedelta
-        Time window to request when overwriting or when no cache exists.
+        Time window every metric should cover, ending now.
+    max_workers : int
+        Concurrent requests; all share the 10-calls-per-minute limiter.
+    request : callable or None
+        Replacement for `utils.json_request` (e.g. a local mock of the endpoint).
     """
 
     api_key = utils.env_or_raise("GLASSNODE_API_KEY")
@@ -81,28 +210,67 @@ def run_pipeline(
     limiter = utils.RateLimiter(calls=10, period=60)  # per Glassnode free tier limits
     utils.ensure_directory(out_dir)
 
-    output_files: dict[str, Path] = {}
+    symbols = list(symbols)
     end = datetime.now(tz=timezone.utc)
     start = end - lookback
+    out_files = {symbol: out_dir / f"{symbol.lower()}_onchain.parquet" for symbol in symbols}
+    coverage: Coverage = {} if overwrite else load_coverage(out_dir)
+    existing = {symbol: None if overwrite else _read_cache(path) for symbol, path in out_files.items()}
+    tasks = plan_fetches(symbols, metrics, start, end, interval, coverage, existing)
 
-    for symbol in symbols:
-        out_file = out_dir / f"{symbol.lower()}_onchain.parquet"
-        if out_file.exists() and not overwrite:
-            output_files[symbol] = out_file
-            continue
-
-        frames: list[pd.DataFrame] = []
-        for column, endpoint in metrics.items():
-            frame = _fetch_metric(endpoint, symbol, start, end, api_key, interval, limiter=limiter)
-            if not frame.empty:
-                frame = frame.rename(columns={endpoint: column})
-            frames.append(frame)
+    pending = {symbol: 0 for symbol in symbols}
+    for task in tasks:
+        pending[task.symbol] += 1
+    fetched: dict[str, list[tuple[FetchTask, pd.DataFrame]]] = {symbol: [] for symbol in symbols}
+    failures: list[tuple[FetchTask, Exception]] = []
 
-        combined = utils.merge_frames(frames)
-        if combined.empty:
-            continue
-        utils.write_time_series(combined, out_file)
-        output_files[symbol] = out_file
+    def finish(symbol: str) -> None:
+        # Completion order is arbitrary; lay frames down in metric order, head before tail.
+        order = {column: i for i, column in enumerate(metrics)}
+        results = sorted(fetched[symbol], key=lambda item: (order[item[0].column], item[0].start))
+        frames = [frame.rename(columns={task.endpoint: task.column}) for task, frame in results if not frame.empty]
+        if frames:
+            # A column re-fetched in full (other endpoint or interval) replaces the cached one instead
+            # of being laid over it, so a file never mixes samplings; the cached column is only dropped
+            # once its replacement has arrived, so a failed re-fetch keeps the old data.
+            cached = existing[symbol]
+            if cached is not None:
+                full = [task for task, frame in results if not frame.empty and (task.start, task.end) == (start, end)]
+                replaced = {task.column for task in full}
+                cached = cached.drop(columns=[column for column in cached.columns if column in replaced])
+            combined = utils.outer_join([cached, *frames])
+            utils.write_time_series(combined, out_files[symbol])
+        record = coverage.setdefault(symbol.lower(), {})
+        for task, _ in results:
+            previous = record.get(task.column)
+            lo, hi = task.start, task.end
+            if previous is not None and (previous.get("endpoint"), previous.get("interval")) == (task.endpoint, interval):
+                lo = min(lo, datetime.fromisoformat(previous["start"]))
+                hi = max(hi, datetime.fromisoformat(previous["end"]))
+            record[task.column] = {
+                "endpoint": task.endpoint,
+                "interval": interval,
+                "start": lo.isoformat(),
+                "end": hi.isoformat(),
+            }
+        save_coverage(out_dir, coverage)
 
-    return output_files
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(_fetch_metric, t.endpoint, t.symbol, t.start, t.end, api_key, interval, limiter, request): t
+            for t in tasks
+        }
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                fetched[task.symbol].append((task, future.result()))
+            except Exception as exc:  # noqa: BLE001 - keep the other symbols' progress
+                failures.append((task, exc))
+            pending[task.symbol] -= 1
+            if pending[task.symbol] == 0:
+                finish(task.symbol)
 
+    if failures:
+        details = "; ".join(f"{t.symbol}/{t.column}: {exc}" for t, exc in failures[:5])
+        raise RuntimeError(f"{len(failures)} Glassnode request(s) failed (coverage not advanced): {details}")
+    return {symbol: path for symbol, path in out_files.items() if path.exists()}
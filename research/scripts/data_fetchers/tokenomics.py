@@ -3,10 +3,13 @@ from AlgorithmImports import *
 # endregion
 
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Mapping, Sequence
 
+import numpy as np
 import pandas as pd
 
+from research.scripts.alt_data import to_ns
+
 from . import utils
 
 DEFILLAMA_UNLOCKS_URL = (
@@ -79,3 +82,109 @@ def run_pipeline(
         output_files[symbol] = out_file
 
     return output_files
+
+
+class UnlockIndex:
+    """
+    Unlock events for many symbols in flat sorted arrays with prefix sums.
+
+    Events of symbol `k` occupy `times[offsets[k]:offsets[k + 1]]` (ascending); `prefix[c]` holds the
+    running total of column `c` with a leading zero per symbol block, so the total over any time
+    window is two `searchsorted` calls and a subtraction: O(log n) per query and vectorized over
+    arrays of bar timestamps. Schedules are published ahead of time, so forward windows
+    ("unlock USD in the next 7 days") do not leak future information.
+    """
+
+    COLUMNS = ("amount", "amount_usd")
+
+    def __init__(self, events: Mapping[str, pd.DataFrame]) -> None:
+        self.symbols = [symbol.upper() for symbol in events]
+        self._position = {symbol: k for k, symbol in enumerate(self.symbols)}
+        times, values, offsets = [], {c: [] for c in self.COLUMNS}, [0]
+        for frame in events.values():
+            frame = frame if not len(frame) or isinstance(frame.index, pd.DatetimeIndex) else frame.set_index("event_time")
+            ns = to_ns(frame.index)
+            order = np.argsort(ns, kind="stable")
+            times.append(ns[order])
+            for column in self.COLUMNS:
+                raw = frame[column].to_numpy(dtype=np.float64) if column in frame.columns else np.zeros(ns.size)
+                values[column].append(np.nan_to_num(raw[order]))
+            offsets.append(offsets[-1] + ns.size)
+        self.times = np.concatenate(times) if times else np.empty(0, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        # One extra slot per symbol: block k's prefix lives at prefix[offsets[k] + k : offsets[k + 1] + k + 1].
+        self.prefix = {}
+        for column in self.COLUMNS:
+            blocks = [np.concatenate(([0.0], np.cumsum(block))) for block in values[column]]
+            self.prefix[column] = np.concatenate(blocks) if blocks else np.zeros(0)
+
+    @classmethod
+    def from_directory(cls, directory: Path, symbols: Sequence[str] | None = None) -> "UnlockIndex":
+        """Load `<directory>/<symbol>_events.parquet` files written by `run_pipeline`."""
+
+        directory = Path(directory)
+        if symbols is None:
+            paths = {p.name[: -len("_events.parquet")]: p for p in sorted(directory.glob("*_events.parquet"))}
+        else:
+            paths = {s: directory / f"{s.lower()}_events.parquet" for s in symbols}
+        return cls({symbol: pd.read_parquet(path) for symbol, path in paths.items() if path.exists()})
+
+    def _block(self, symbol: str) -> tuple[np.ndarray, int]:
+        k = self._position.get(symbol.upper())
+        if k is None:
+            return np.empty(0, dtype=np.int64), -1
+        return self.times[self.offsets[k] : self.offsets[k + 1]], int(self.offsets[k] + k)
+
+    def window_sum(
+        self,
+        symbol: str,
+        bar_times: Iterable,
+        horizon: pd.Timedelta | str,
+        column: str = "amount_usd",
+    ) -> np.ndarray:
+        """
+        Total `column` of events in `(t, t + horizon]` for each bar time `t`; a negative horizon
+        sums the trailing window `(t + horizon, t]` instead. Unknown symbols give zeros.
+        """
+
+        bars = to_ns(bar_times)
+        times, base = self._block(symbol)
+        if base < 0 or times.size == 0:
+            return np.zeros(bars.size)
+        shift = pd.Timedelta(horizon).value
+        lo_edge, hi_edge = (bars, bars + shift) if shift >= 0 else (bars + shift, bars)
+        lo = np.searchsorted(times, lo_edge, side="right")
+        hi = np.searchsorted(times, hi_edge, side="right")
+        prefix = self.prefix[column]
+        return prefix[base + hi] - prefix[base + lo]
+
+    def next_event(self, symbol: str, bar_times: Iterable, column: str = "amount_usd") -> tuple[np.ndarray, np.ndarray]:
+        """`(days until the next event after t, its column value)` per bar; NaN when none is scheduled."""
+
+        bars = to_ns(bar_times)
+        times, base = self._block(symbol)
+        days = np.full(bars.size, np.nan)
+        amount = np.full(bars.size, np.nan)
+        if base < 0 or times.size == 0:
+            return days, amount
+        position = np.searchsorted(times, bars, side="right")
+        has_next = position < times.size
+        nxt = position[has_next]
+        days[has_next] = (times[nxt] - bars[has_next]) / pd.Timedelta(days=1).value
+        prefix = self.prefix[column]
+        amount[has_next] = prefix[base + nxt + 1] - prefix[base + nxt]
+        return days, amount
+
+    def overhang(
+        self,
+        bar_times: Iterable,
+        horizon: pd.Timedelta | str = "7D",
+        symbols: Sequence[str] | None = None,
+        column: str = "amount_usd",
+    ) -> pd.DataFrame:
+        """`bars x symbols` frame of forward `window_sum` values, e.g. USD unlocking in the next week."""
+
+        index = pd.DatetimeIndex(bar_times)
+        symbols = list(symbols) if symbols is not None else self.symbols
+        data = np.column_stack([self.window_sum(s, index, horizon, column) for s in symbols]) if symbols else np.empty((len(index), 0))
+        return pd.DataFrame(data, index=index, columns=symbols)
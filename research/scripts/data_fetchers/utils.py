@@ -1,14 +1,17 @@
+from __future__ import annotations
+
 # region imports
 from AlgorithmImports import *
 # endregion
-from __future__ import annotations
 
 import json
 import os
+import threading
 import time
 from pathlib import Path
 from typing import Any, Iterable, Mapping, MutableMapping, Sequence
 
+import numpy as np
 import pandas as pd
 import requests
 
@@ -16,21 +19,27 @@ DEFAULT_HEADERS: Mapping[str, str] = {"User-Agent": "WealthLabs-Research/1.0"}
 
 
 class RateLimiter:
-    """Simple sleep-based rate limiter for politely hitting public APIs."""
+    """Simple sleep-based rate limiter for politely hitting public APIs.
+
+    Safe to share between worker threads: the lock is held while sleeping so concurrent
+    callers queue up behind the budget instead of bursting past it.
+    """
 
     def __init__(self, calls: int, period: float) -> None:
         self.calls = calls
         self.period = period
         self._timestamps: list[float] = []
+        self._lock = threading.Lock()
 
     def wait(self) -> None:
-        now = time.time()
-        self._timestamps = [ts for ts in self._timestamps if now - ts < self.period]
-        if len(self._timestamps) >= self.calls:
-            sleep_for = self.period - (now - self._timestamps[0]) + 0.01
-            if sleep_for > 0:
-                time.sleep(sleep_for)
-        self._timestamps.append(time.time())
+        with self._lock:
+            now = time.time()
+            self._timestamps = [ts for ts in self._timestamps if now - ts < self.period]
+            if len(self._timestamps) >= self.calls:
+                sleep_for = self.period - (now - self._timestamps[0]) + 0.01
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+            self._timestamps.append(time.time())
 
 
 def ensure_directory(path: Path) -> None:
@@ -53,13 +62,124 @@ def json_request(
     return response.json()
 
 
+def _index_keys(index: pd.Index) -> np.ndarray | None:
+    """int64 sort keys for datetime/integer indexes (UTC ns for datetimes); None when unsupported."""
+
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        return np.asarray(index, dtype="datetime64[ns]").view(np.int64)
+    if pd.api.types.is_integer_dtype(index.dtype):
+        return np.asarray(index, dtype=np.int64)
+    return None
+
+
+def merge_order(keys: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Row order that merges `keys` (one int64 array per frame, frames in priority order) and keeps
+    the last occurrence of every key: positions into the concatenation of `keys`, ascending by key.
+
+    Inputs that are already sorted chunks are handled in linear time: back-to-back chunks are just
+    concatenated, and overlapping ones go through NumPy's stable sort, which merges the existing
+    sorted runs rather than re-sorting from scratch. Stability puts equal keys in frame order, so the
+    last element of each run of equal keys is the latest frame's row (keep-last).
+    """
+
+    flat = np.concatenate(keys) if len(keys) > 1 else np.asarray(keys[0])
+    if flat.size < 2 or bool(np.all(flat[1:] >= flat[:-1])):
+        order = np.arange(flat.size)
+    else:
+        order = np.argsort(flat, kind="stable")
+    ordered = flat[order]
+    keep = np.empty(ordered.size, dtype=bool)
+    keep[:-1] = ordered[1:] != ordered[:-1]
+    keep[-1:] = True
+    return order[keep]
+
+
+def _legacy_merge(valid: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    combined = pd.concat(valid, axis=0).sort_index(kind="stable")
+    return combined[~combined.index.duplicated(keep="last")]
+
+
 def merge_frames(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Row-wise union of time-series chunks (e.g. paginated API pulls) sorted by index; on duplicate
+    timestamps the row from the later frame wins. Use `outer_join` for frames that carry different
+    columns for the same timestamps.
+    """
+
     valid = [df for df in frames if df is not None and not df.empty]
     if not valid:
         return pd.DataFrame()
-    combined = pd.concat(valid, axis=0).sort_index()
-    combined = combined[~combined.index.duplicated(keep="last")]
-    return combined
+    keys = [_index_keys(df.index) for df in valid]
+    if any(k is None for k in keys):
+        return _legacy_merge(valid)
+
+    take = merge_order(keys)
+    index = valid[0].index.append([df.index for df in valid[1:]]) if len(valid) > 1 else valid[0].index
+    columns = list(dict.fromkeys(col for df in valid for col in df.columns))
+    if all(list(df.columns) == columns for df in valid) and all(
+        (df.dtypes == valid[0].dtypes).all() for df in valid[1:]
+    ):
+        data = {
+            col: np.concatenate([df[col].to_numpy() for df in valid])[take]
+            if isinstance(valid[0][col].dtype, np.dtype)
+            else pd.concat([df[col] for df in valid], ignore_index=True).iloc[take].to_numpy()
+            for col in columns
+        }
+        return pd.DataFrame(data, index=index[take], columns=columns)
+    # Heterogeneous chunks: let pandas handle dtype promotion, but still skip the full sort.
+    return pd.concat(valid, axis=0).iloc[take]
+
+
+def _missing_column(dtype: np.dtype, size: int) -> np.ndarray:
+    """All-missing column able to hold `dtype` values (ints/bools widen to float so gaps are NaN)."""
+
+    if dtype.kind in "mM":
+        return np.full(size, np.array("NaT", dtype=dtype))
+    if dtype.kind in "iubfc":
+        return np.full(size, np.nan, dtype=np.result_type(dtype, np.float64))
+    return np.full(size, np.nan, dtype=object)
+
+
+def outer_join(frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Column-wise outer join of sources on their (datetime) index, e.g. funding prints + open interest,
+    or one frame per on-chain metric.
+
+    The output index is the sorted union of all indexes; every column is written once into a
+    preallocated array at `searchsorted` positions instead of reindexing frame by frame. A column
+    present in several frames takes the later frame's value wherever that frame has a row.
+    """
+
+    valid = [df for df in frames if df is not None and not df.empty]
+    if not valid:
+        return pd.DataFrame()
+    deduped = [df if df.index.is_monotonic_increasing and df.index.is_unique else merge_frames([df]) for df in valid]
+    keys = [_index_keys(df.index) for df in deduped]
+    if any(k is None for k in keys):
+        combined = deduped[0]
+        for df in deduped[1:]:
+            combined = df.combine_first(combined)
+        return combined
+
+    take = merge_order(keys)
+    union_keys = np.concatenate(keys)[take]
+    index = deduped[0].index.append([df.index for df in deduped[1:]])[take] if len(deduped) > 1 else deduped[0].index
+
+    data: dict[object, np.ndarray] = {}
+    for df, frame_keys in zip(deduped, keys):
+        positions = np.searchsorted(union_keys, frame_keys)
+        for col in df.columns:
+            values = df[col].to_numpy()
+            column = data.get(col)
+            if column is None:
+                column = data[col] = _missing_column(values.dtype, union_keys.size)
+            if not np.can_cast(values.dtype, column.dtype, casting="same_kind"):
+                column = data[col] = column.astype(object)
+            column[positions] = values
+    return pd.DataFrame(data, index=index)
 
 
 def write_time_series(df: pd.DataFrame, out_file: Path) -> None:
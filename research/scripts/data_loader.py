@@ -11,7 +11,10 @@ Responsibilities:
 """
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Sequence
+
+import pandas as pd
 
 
 @dataclass
@@ -29,21 +32,56 @@ class DataRequestSpec:
     extended_hours: bool = False
     additional_params: Optional[Dict[str, Any]] = None
 
+    def key(self) -> tuple:
+        """Identity of the pull; `additional_params` are annotations and do not distinguish specs."""
+
+        return (
+            self.symbol.upper(),
+            str(self.market).lower(),
+            self.security_type,
+            self.resolution,
+            self.start,
+            self.end,
+            self.fill_forward,
+            self.normalization_mode,
+            self.extended_hours,
+        )
+
 
 class DataLoader:
     """Placeholder adapter that will wrap QC History/API calls."""
 
     def __init__(self) -> None:
         self._requests: list[DataRequestSpec] = []
+        self._keys: set[tuple] = set()
 
-    def register(self, spec: DataRequestSpec) -> None:
-        """Store a request spec so we can reproduce dataset pulls later."""
+    def register(self, spec: DataRequestSpec) -> bool:
+        """Store a request spec so we can reproduce dataset pulls later; duplicates are ignored."""
 
+        key = spec.key()
+        if key in self._keys:
+            return False
+        self._keys.add(key)
         self._requests.append(spec)
+        return True
 
     def list_requests(self) -> list[DataRequestSpec]:
         """Return all registered specs (no network calls yet)."""
 
         return list(self._requests)
 
-    # TODO: add fetch/history/export methods once data work begins.
+    def check_integrity(self, roots: Sequence[Path] = (Path("data"),), max_workers: int | None = None) -> pd.DataFrame:
+        """Scan cached datasets under `roots`; see `research.scripts.integrity` for the checks."""
+
+        from research.scripts.integrity import discover, scan_paths
+
+        return scan_paths(discover(roots), max_workers=max_workers)
+
+    def export_replay(self, fetch_bars: Callable[[DataRequestSpec], pd.DataFrame], out_file: Path, **kwargs: Any) -> Path:
+        """Materialize every registered spec into an offline bundle; see `research.scripts.replay`."""
+
+        from research.scripts.replay import export_bundle
+
+        return export_bundle(self, fetch_bars, out_file, **kwargs)
+
+    # TODO: add fetch/history methods once data work begins.
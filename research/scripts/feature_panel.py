@@ -0,0 +1,267 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Compact storage for multi-symbol feature panels.
+
+Feature functions return float64 Series by default; a 50-symbol x 1-year x minute x 30-feature panel
+held that way is ~6 GB. The `qc_native_features` functions take a `dtype`, so passing
+`policy.target(name)` stores each feature at its compact width as it is computed (one float64
+temporary at a time instead of the whole float64 panel). `compact_panel` stacks per-symbol feature
+frames into one long panel under a `DtypePolicy`:
+
+- feature values as float32 (optionally float16 for bounded ratio columns),
+- symbols as small integer codes into `FeaturePanel.symbols`,
+- timestamps as integer codes into one sorted `FeaturePanel.times` array (categorical timestamps).
+
+Every downcast is checked against the input before it is accepted: a column whose error exceeds the
+policy tolerance is widened (float16 -> float32 -> float64) and the measured errors are kept in
+`FeaturePanel.accuracy` (with the `input` dtype they were measured against), so the memory saving
+never silently costs precision.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.alt_data import to_ns
+
+# Columns matching these substrings are bounded ratios / percentiles and may be stored as float16.
+RATIO_PATTERNS: tuple[str, ...] = ("_ratio_", "relative_volume", "volume_percentile", "atr_percent")
+
+_WIDER = {np.dtype(np.float16): np.dtype(np.float32), np.dtype(np.float32): np.dtype(np.float64)}
+
+
+@dataclass(frozen=True)
+class DtypePolicy:
+    """
+    Storage dtypes and acceptance tolerances for a panel.
+
+    `ratios=None` keeps ratio columns at `values`; set it to `"float16"` to halve them again. A
+    downcast column is accepted when `|x_low - x_64| <= atol + rtol * |x_64|` holds for every finite
+    value and NaN / inf positions are unchanged; otherwise it is widened one step and re-checked.
+    """
+
+    values: str = "float32"
+    ratios: str | None = None
+    ratio_patterns: tuple[str, ...] = RATIO_PATTERNS
+    rtol: Mapping[str, float] = field(default_factory=lambda: {"float16": 1e-3, "float32": 1e-6, "float64": 0.0})
+    atol: Mapping[str, float] = field(default_factory=lambda: {"float16": 1e-4, "float32": 1e-9, "float64": 0.0})
+
+    def target(self, column: str) -> np.dtype:
+        if self.ratios is not None and any(pattern in column for pattern in self.ratio_patterns):
+            return np.dtype(self.ratios)
+        return np.dtype(self.values)
+
+
+FLOAT64_POLICY = DtypePolicy(values="float64")
+COMPACT_POLICY = DtypePolicy()
+HALF_RATIO_POLICY = DtypePolicy(ratios="float16")
+
+
+def code_dtype(cardinality: int) -> np.dtype:
+    """Smallest signed integer dtype able to index `cardinality` categories."""
+
+    for dtype in (np.int8, np.int16, np.int32):
+        if cardinality <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def precision_error(reference: np.ndarray, compact: np.ndarray) -> tuple[float, float, bool]:
+    """
+    `(max_abs_error, max_rel_error, specials_match)` of `compact` against float64 `reference`.
+
+    Relative error is measured on finite values with `|reference| > 0`; `specials_match` is False when
+    the downcast moved a NaN / inf or overflowed a finite value to inf.
+    """
+
+    reference = np.asarray(reference, dtype=np.float64)
+    widened = np.asarray(compact).astype(np.float64)
+    finite = np.isfinite(reference)
+    specials_match = bool(
+        np.array_equal(np.isnan(reference), np.isnan(widened))
+        and np.array_equal(reference[~finite & ~np.isnan(reference)], widened[~finite & ~np.isnan(reference)])
+        and np.isfinite(widened[finite]).all()
+    )
+    if not finite.any():
+        return 0.0, 0.0, specials_match
+    diff = np.abs(widened[finite] - reference[finite])
+    scale = np.abs(reference[finite])
+    nonzero = scale > 0
+    rel = float((diff[nonzero] / scale[nonzero]).max()) if nonzero.any() else 0.0
+    return float(diff.max()), rel, specials_match
+
+
+def downcast(values: np.ndarray, dtype: np.dtype, policy: DtypePolicy) -> tuple[np.ndarray, dict[str, object]]:
+    """
+    Cast float64 `values` to `dtype`, widening until the policy tolerance holds. Returns the array
+    and its accuracy record (`requested`, stored `dtype`, `max_abs_error`, `max_rel_error`, `widened`).
+    """
+
+    requested = np.dtype(dtype)
+    dtype = requested
+    reference = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(reference)
+    while True:
+        with np.errstate(over="ignore"):
+            compact = reference.astype(dtype)
+        abs_err, rel_err, specials = precision_error(reference, compact)
+        bound = policy.atol.get(dtype.name, 0.0) + policy.rtol.get(dtype.name, 0.0) * np.abs(reference[finite])
+        within = specials and bool(np.all(np.abs(compact[finite].astype(np.float64) - reference[finite]) <= bound))
+        if within or dtype == np.float64:
+            return compact, {
+                "requested": requested.name,
+                "dtype": dtype.name,
+                "max_abs_error": abs_err,
+                "max_rel_error": rel_err,
+                "widened": dtype != requested,
+            }
+        dtype = _WIDER[dtype]
+
+
+@dataclass
+class FeaturePanel:
+    """
+    Long-format feature panel: row `i` is symbol `symbols[symbol_codes[i]]` at `times[time_codes[i]]`.
+
+    `values` maps a feature name to its column array (dtypes can differ per column); `accuracy` has
+    one row per feature with the stored dtype and the measured error against float64.
+    """
+
+    times: np.ndarray
+    symbols: tuple[str, ...]
+    time_codes: np.ndarray
+    symbol_codes: np.ndarray
+    values: dict[str, np.ndarray]
+    accuracy: pd.DataFrame
+
+    def __len__(self) -> int:
+        return int(self.time_codes.size)
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.times, self.time_codes, self.symbol_codes, *self.values.values()]
+        return int(sum(a.nbytes for a in arrays))
+
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self.times.astype("datetime64[ns]")).tz_localize("UTC")
+
+    def frame(self, symbol: str, dtype: str | None = None) -> pd.DataFrame:
+        """Wide `(time, feature)` frame for one symbol, in stored dtypes unless `dtype` is given."""
+
+        rows = np.flatnonzero(self.symbol_codes == self.symbols.index(symbol))
+        index = self.index()[self.time_codes[rows]]
+        data = {name: column[rows] if dtype is None else column[rows].astype(dtype) for name, column in self.values.items()}
+        return pd.DataFrame(data, index=index)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long frame with categorical `time` / `symbol` columns sharing the panel's code arrays."""
+
+        data = {
+            "time": pd.Categorical.from_codes(self.time_codes, categories=self.index()),
+            "symbol": pd.Categorical.from_codes(self.symbol_codes, categories=list(self.symbols)),
+        }
+        data.update(self.values)
+        return pd.DataFrame(data)
+
+    def save(self, path: Path) -> Path:
+        """Parquet with dictionary-encoded `time` / `symbol` and the compact value dtypes."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.to_frame().to_parquet(path, index=False)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "FeaturePanel":
+        """Read a panel written by `save` (symbols come back sorted; `accuracy` only lists dtypes)."""
+
+        frame = pd.read_parquet(path)
+        times, time_codes = np.unique(to_ns(pd.DatetimeIndex(frame["time"])), return_inverse=True)
+        symbols, symbol_codes = np.unique(frame["symbol"].astype(str).to_numpy(), return_inverse=True)
+        values = {c: frame[c].to_numpy() for c in frame.columns if c not in ("time", "symbol")}
+        accuracy = pd.DataFrame({"dtype": [v.dtype.name for v in values.values()]}, index=pd.Index(list(values), name="feature"))
+        return cls(
+            times,
+            tuple(symbols.tolist()),
+            time_codes.astype(code_dtype(times.size)),
+            symbol_codes.astype(code_dtype(symbols.size)),
+            values,
+            accuracy,
+        )
+
+
+def compact_panel(
+    features: Mapping[str, pd.DataFrame],
+    policy: DtypePolicy = COMPACT_POLICY,
+    columns: Sequence[str] | None = None,
+) -> FeaturePanel:
+    """
+    Stack `{symbol: feature frame}` (DatetimeIndex rows, one column per feature) into a `FeaturePanel`.
+
+    Columns default to the union in first-seen order; a symbol missing a column gets NaN. Each column
+    is assembled once at the widest input dtype across symbols and downcast under `policy` (see
+    `downcast`); features already computed at the policy dtype are checked against themselves.
+    """
+
+    symbols = tuple(features)
+    if columns is None:
+        columns = list(dict.fromkeys(c for frame in features.values() for c in frame.columns))
+    stamps = [to_ns(pd.DatetimeIndex(frame.index)) for frame in features.values()]
+    times = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+    lengths = [s.size for s in stamps]
+    time_codes = np.concatenate([np.searchsorted(times, s) for s in stamps]) if stamps else np.empty(0, dtype=np.int64)
+    symbol_codes = np.repeat(np.arange(len(symbols)), lengths)
+
+    values: dict[str, np.ndarray] = {}
+    records: dict[str, dict[str, object]] = {}
+    for column in columns:
+        present = [frame[column].dtype for frame in features.values() if column in frame.columns]
+        source = np.result_type(np.float16, *present)
+        stacked = np.empty(int(sum(lengths)), dtype=source)
+        start = 0
+        for frame, length in zip(features.values(), lengths):
+            stacked[start : start + length] = frame[column].to_numpy(dtype=source) if column in frame.columns else np.nan
+            start += length
+        values[column], records[column] = downcast(stacked, policy.target(column), policy)
+        records[column]["input"] = source.name
+
+    accuracy = pd.DataFrame.from_dict(records, orient="index")
+    accuracy.index.name = "feature"
+    return FeaturePanel(
+        times,
+        symbols,
+        time_codes.astype(code_dtype(times.size)),
+        symbol_codes.astype(code_dtype(len(symbols))),
+        values,
+        accuracy,
+    )
+
+
+def float64_nbytes(panel: FeaturePanel) -> int:
+    """Footprint of the same panel as float64 values with int64 time / symbol columns."""
+
+    return len(panel) * 8 * (len(panel.values) + 2)
+
+
+__all__ = [
+    "RATIO_PATTERNS",
+    "DtypePolicy",
+    "FLOAT64_POLICY",
+    "COMPACT_POLICY",
+    "HALF_RATIO_POLICY",
+    "code_dtype",
+    "precision_error",
+    "downcast",
+    "FeaturePanel",
+    "compact_panel",
+    "float64_nbytes",
+]
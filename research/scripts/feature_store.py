@@ -8,8 +8,12 @@ Use this module to register feature definitions, track metadata (windows, decay,
 and provide helper functions for parity testing between research and live Lean environments.
 """
 
-from dataclasses import dataclass
-from typing import Callable, Dict, Any
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Any, NamedTuple, Protocol, Sequence
+
+import numpy as np
+import pandas as pd
 
 
 @dataclass(frozen=True)
@@ -24,18 +28,56 @@ class FeatureSpec:
     params: Dict[str, Any] | None = None
 
 
+class FeatureStream(Protocol):
+    """Incremental (live) implementation of a feature: one `update` per bar, returns the current value."""
+
+    def update(self, bar: Any) -> float: ...
+
+
+class BarView(NamedTuple):
+    """TradeBar-shaped row used when replaying a history frame through live builders."""
+
+    EndTime: pd.Timestamp
+    Open: float
+    High: float
+    Low: float
+    Close: float
+    Volume: float
+
+
 class FeatureRegistry:
-    """Lightweight registry storing feature specs and callable builders."""
+    """
+    Lightweight registry storing feature specs and callable builders.
+
+    `builder(bar)` is the live per-bar callable. A feature may also register `batch(frame)`, computing
+    the whole history from an OHLCV frame (research path), and `stream_factory()`, returning a
+    stateful `FeatureStream` for features that need a window. `check_parity` runs both paths.
+    """
 
     def __init__(self) -> None:
         self._specs: Dict[str, FeatureSpec] = {}
         self._builders: Dict[str, Callable[..., Any]] = {}
+        self._batch: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {}
+        self._streams: Dict[str, Callable[[], FeatureStream]] = {}
 
-    def register(self, spec: FeatureSpec, builder: Callable[..., Any]) -> None:
-        """Register a feature spec + builder callable."""
+    def register(
+        self,
+        spec: FeatureSpec,
+        builder: Callable[..., Any],
+        batch: Callable[[pd.DataFrame], pd.Series] | None = None,
+        stream_factory: Callable[[], FeatureStream] | None = None,
+    ) -> None:
+        """Register a feature spec + builder callable (and optional batch / streaming implementations)."""
 
         self._specs[spec.name] = spec
         self._builders[spec.name] = builder
+        if batch is not None:
+            self._batch[spec.name] = batch
+        if stream_factory is not None:
+            self._streams[spec.name] = stream_factory
+
+    def names(self) -> list[str]:
+        return list(self._specs)
 
     def describe(self, name: str) -> FeatureSpec:
         """Return metadata for a feature."""
@@ -47,4 +89,105 @@ class FeatureRegistry:
 
         return self._builders[name]
 
-    # TODO: add parity-testing helpers and serialization for registry snapshots.
+    def batch(self, name: str) -> Callable[[pd.DataFrame], pd.Series] | None:
+        return self._batch.get(name)
+
+    def stream(self, name: str) -> FeatureStream:
+        """Fresh streaming state for `name`; stateless features wrap their per-bar builder."""
+
+        factory = self._streams.get(name)
+        if factory is not None:
+            return factory()
+        return _BuilderStream(self._builders[name])
+
+    def get_state(self) -> dict[str, Any]:
+        """Spec metadata only; builders are code and are re-registered on startup."""
+
+        return {"specs": {name: asdict(spec) for name, spec in self._specs.items()}}
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        """
+        Validate a snapshot against the registered specs. Raises `ValueError` when a feature's
+        definition (window, inputs, version, params) changed, so stale feature windows are not
+        restored on top of a new definition.
+        """
+
+        changed = [
+            name
+            for name, spec in state["specs"].items()
+            if name in self._specs and asdict(self._specs[name]) != spec
+        ]
+        if changed:
+            raise ValueError(f"Feature definitions changed since snapshot: {', '.join(sorted(changed))}")
+
+
+class _BuilderStream:
+    def __init__(self, builder: Callable[..., Any]) -> None:
+        self.builder = builder
+
+    def update(self, bar: Any) -> float:
+        return self.builder(bar)
+
+
+def bar_views(bars: pd.DataFrame) -> list[BarView]:
+    """Rows of an OHLCV frame (lower-case columns, end-stamped index) as TradeBar-like tuples."""
+
+    columns = [bars[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close", "volume")]
+    return [BarView(t, *row) for t, row in zip(bars.index, zip(*(c.tolist() for c in columns)))]
+
+
+def check_parity(
+    registry: FeatureRegistry,
+    bars: pd.DataFrame,
+    names: Sequence[str] | None = None,
+    rtol: float = 1e-9,
+    atol: float = 1e-12,
+    skip_warmup: bool = True,
+) -> pd.DataFrame:
+    """
+    Run every feature in batch mode over `bars` and in streaming mode bar by bar, then diff them.
+
+    Rows inside the feature's `window - 1` warmup are skipped by default; NaN on both sides counts
+    as a match. Returns one row per feature with mismatch counts, the largest absolute difference,
+    the first mismatching timestamp and rows/second for each path. Features without a batch
+    implementation are reported with `status="no_batch"`.
+    """
+
+    views = bar_views(bars)
+    records = []
+    for name in names or registry.names():
+        spec = registry.describe(name)
+        record: dict[str, Any] = {"feature": name, "version": spec.version, "rows": len(bars)}
+        batch = registry.batch(name)
+        if batch is None:
+            records.append(record | {"status": "no_batch"})
+            continue
+
+        start = time.perf_counter()
+        batch_values = pd.Series(batch(bars)).reindex(bars.index).to_numpy(dtype=np.float64)
+        batch_seconds = time.perf_counter() - start
+
+        stream = registry.stream(name)
+        stream_values = np.empty(len(views))
+        start = time.perf_counter()
+        for i, view in enumerate(views):
+            value = stream.update(view)
+            stream_values[i] = np.nan if value is None else value
+        stream_seconds = time.perf_counter() - start
+
+        offset = max(spec.window - 1, 0) if skip_warmup else 0
+        a, b = batch_values[offset:], stream_values[offset:]
+        close = np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+        diff = np.abs(a - b)
+        bad = np.flatnonzero(~close)
+        record.update(
+            compared=int(a.size),
+            mismatches=int(bad.size),
+            max_abs_diff=float(np.nanmax(diff)) if np.isfinite(diff).any() else 0.0,
+            first_mismatch=bars.index[offset + bad[0]] if bad.size else None,
+            batch_rows_per_sec=len(bars) / batch_seconds if batch_seconds else np.inf,
+            stream_rows_per_sec=len(bars) / stream_seconds if stream_seconds else np.inf,
+            status="ok" if bad.size == 0 else "mismatch",
+        )
+        records.append(record)
+    return pd.DataFrame(records).set_index("feature")
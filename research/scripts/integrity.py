@@ -0,0 +1,304 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Integrity scan for cached datasets (bar store and `data_fetchers` outputs).
+
+Each file is read once and checked with whole-array NumPy passes over its int64 timestamps and value
+columns: duplicated and non-monotonic timestamps, gaps against the file's expected spacing, runs of
+unchanged (stale) values, and price spikes measured as robust z-scores of log returns. Files are
+spread over a process pool and the result is one compact row per file:
+
+    python -m research.scripts.integrity data/bars data/funding --out data/integrity_report.csv
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.alt_data import DATA_ROOT, to_ns
+
+PRICE_COLUMNS: tuple[str, ...] = ("open", "high", "low", "close", "price", "mark_price", "index_price")
+
+
+@dataclass(frozen=True)
+class IntegrityConfig:
+    """
+    Thresholds for one dataset family.
+
+    `frequency=None` infers the expected spacing from the median timestamp step; a step larger than
+    `gap_multiple` times that spacing counts as a gap. `stale_run` is the number of consecutive equal
+    values that flags a column as stale (0 disables), and `spike_z` the robust z-score of a log
+    return that counts as a spike.
+    """
+
+    frequency: str | None = None
+    gap_multiple: float = 1.5
+    stale_run: int = 60
+    spike_z: float = 12.0
+    check_gaps: bool = True
+    ignore_columns: tuple[str, ...] = ("volume",)
+
+
+DEFAULT_CONFIG = IntegrityConfig()
+
+# Keyed by the dataset's parent directory name; anything else uses `DEFAULT_CONFIG`.
+SOURCE_CONFIGS: dict[str, IntegrityConfig] = {
+    "funding": IntegrityConfig(stale_run=12),
+    "onchain": IntegrityConfig(stale_run=7),
+    "sentiment": IntegrityConfig(stale_run=7),
+    "defi": IntegrityConfig(stale_run=7),
+    # Unlock events are irregular by construction.
+    "tokenomics": IntegrityConfig(check_gaps=False, stale_run=0),
+    "execution": IntegrityConfig(check_gaps=False, stale_run=0),
+}
+
+REPORT_COLUMNS = [
+    "path",
+    "rows",
+    "start",
+    "end",
+    "frequency",
+    "duplicates",
+    "non_monotonic",
+    "gaps",
+    "missing_rows",
+    "max_gap",
+    "stale_runs",
+    "longest_stale",
+    "spikes",
+    "non_positive",
+    "nan_cells",
+    "error",
+]
+
+
+def _timestamps(frame: pd.DataFrame) -> np.ndarray:
+    if isinstance(frame.index, pd.DatetimeIndex):
+        return to_ns(frame.index)
+    for column in ("timestamp", "time", "date"):
+        if column in frame.columns:
+            return to_ns(pd.to_datetime(frame[column], utc=True))
+    raise ValueError("no DatetimeIndex or timestamp column")
+
+
+def timestamp_checks(ns: np.ndarray, config: IntegrityConfig = DEFAULT_CONFIG) -> dict[str, object]:
+    """Duplicate / ordering / gap counts for raw (unsorted, possibly duplicated) timestamps."""
+
+    steps = np.diff(ns)
+    ordered = np.sort(ns)
+    ordered_steps = np.diff(ordered)
+    unique_steps = ordered_steps[ordered_steps > 0]
+    if config.frequency is not None:
+        expected = pd.Timedelta(config.frequency).value
+    elif unique_steps.size:
+        expected = int(np.median(unique_steps))
+    else:
+        expected = 0
+
+    result: dict[str, object] = {
+        "duplicates": int(np.count_nonzero(ordered_steps == 0)),
+        "non_monotonic": int(np.count_nonzero(steps < 0)),
+        "frequency": pd.Timedelta(expected) if expected else pd.NaT,
+        "gaps": 0,
+        "missing_rows": 0,
+        "max_gap": pd.Timedelta(int(unique_steps.max())) if unique_steps.size else pd.NaT,
+    }
+    if config.check_gaps and expected:
+        large = unique_steps[unique_steps > config.gap_multiple * expected]
+        result["gaps"] = int(large.size)
+        result["missing_rows"] = int(np.sum(large // expected - 1))
+    return result
+
+
+def stale_runs(values: np.ndarray, min_run: int) -> tuple[int, int]:
+    """
+    Count runs of at least `min_run` identical consecutive values per column of `(rows, cols)` and
+    return `(runs, longest)`; NaNs break runs.
+    """
+
+    if min_run <= 0 or values.shape[0] < min_run:
+        return 0, 0
+    same = values[1:] == values[:-1]
+    runs = 0
+    longest = 0
+    for column in same.T:
+        # Run boundaries are the edges of `True` stretches in `same`; a stretch of k Trues is a run of k+1 values.
+        edges = np.flatnonzero(np.diff(np.r_[0, column.view(np.int8), 0]))
+        lengths = edges[1::2] - edges[::2] + 1
+        if lengths.size:
+            runs += int(np.count_nonzero(lengths >= min_run))
+            longest = max(longest, int(lengths.max()))
+    return runs, longest
+
+
+def spike_count(prices: np.ndarray, threshold: float) -> int:
+    """Log returns whose robust z-score (median / MAD) exceeds `threshold`, summed over columns."""
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(np.where(prices > 0, prices, np.nan)), axis=0)
+    centre = np.nanmedian(returns, axis=0)
+    mad = 1.4826 * np.nanmedian(np.abs(returns - centre), axis=0)
+    # A flat series has MAD 0; fall back to the mean absolute deviation so one jump is still visible.
+    mad = np.where(mad > 0, mad, np.nanmean(np.abs(returns - centre), axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.abs(returns - centre) / mad
+    return int(np.count_nonzero(z > threshold))
+
+
+def scan_frame(frame: pd.DataFrame, config: IntegrityConfig = DEFAULT_CONFIG) -> dict[str, object]:
+    """Run every check on one frame (in its stored row order) and return the report fields."""
+
+    ns = _timestamps(frame)
+    record: dict[str, object] = {
+        "rows": len(frame),
+        "start": pd.Timestamp(ns.min(), tz="UTC") if ns.size else pd.NaT,
+        "end": pd.Timestamp(ns.max(), tz="UTC") if ns.size else pd.NaT,
+    }
+    record.update(timestamp_checks(ns, config))
+
+    numeric = frame.select_dtypes(include="number")
+    numeric = numeric.drop(columns=[c for c in config.ignore_columns if c in numeric.columns])
+    values = numeric.to_numpy(dtype=np.float64)
+    record["nan_cells"] = int(np.isnan(values).sum())
+    record["stale_runs"], record["longest_stale"] = stale_runs(values[np.argsort(ns, kind="stable")], config.stale_run)
+
+    price_columns = [c for c in numeric.columns if str(c).lower() in PRICE_COLUMNS]
+    if price_columns:
+        prices = numeric[price_columns].to_numpy(dtype=np.float64)[np.argsort(ns, kind="stable")]
+        record["spikes"] = spike_count(prices, config.spike_z)
+        record["non_positive"] = int(np.count_nonzero(prices <= 0))
+    else:
+        record["spikes"] = 0
+        record["non_positive"] = 0
+    return record
+
+
+def config_for(path: Path, overrides: dict[str, IntegrityConfig] | None = None) -> IntegrityConfig:
+    path = Path(path)
+    # `BarCache` layout: data/bars/<resolution>/<symbol>.parquet has a known spacing.
+    if path.parent.parent.name == "bars":
+        return replace(DEFAULT_CONFIG, frequency=path.parent.name)
+    configs = SOURCE_CONFIGS | (overrides or {})
+    for part in reversed(path.parts[:-1]):
+        if part in configs:
+            return configs[part]
+    return DEFAULT_CONFIG
+
+
+def _read(path: Path) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    if path.suffix == ".csv":
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+    return pd.read_json(path)
+
+
+def scan_file(path: Path, config: IntegrityConfig | None = None) -> dict[str, object]:
+    """Scan one file; read or format errors are reported in the `error` column instead of raised."""
+
+    path = Path(path)
+    config = config or config_for(path)
+    record: dict[str, object] = {"path": str(path), "error": ""}
+    try:
+        record.update(scan_frame(_read(path), config))
+    except Exception as exc:  # noqa: BLE001 - one bad file must not abort the sweep
+        record["error"] = f"{type(exc).__name__}: {exc}"
+    return record
+
+
+def _scan_task(args: tuple[Path, IntegrityConfig]) -> dict[str, object]:
+    return scan_file(*args)
+
+
+def discover(roots: Iterable[Path] = (DATA_ROOT,), patterns: Sequence[str] = ("*.parquet", "*.csv")) -> list[Path]:
+    """
+    All dataset files under `roots` (recursively), sorted for a stable report order. Files inside
+    dot-directories (fetcher caches such as `defi/.cache/`) are not time series and are skipped.
+    """
+
+    found: set[Path] = set()
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            found.add(root)
+            continue
+        for pattern in patterns:
+            for path in root.rglob(pattern):
+                if not any(part.startswith(".") for part in path.relative_to(root).parts[:-1]):
+                    found.add(path)
+    return sorted(found)
+
+
+def scan_paths(
+    paths: Iterable[Path],
+    overrides: dict[str, IntegrityConfig] | None = None,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """Scan every file (one process-pool task per file) and return the report, one row per file."""
+
+    tasks = [(Path(path), config_for(path, overrides)) for path in paths]
+    if max_workers == 1 or len(tasks) <= 1:
+        records = [_scan_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            records = list(pool.map(_scan_task, tasks, chunksize=max(1, len(tasks) // 64)))
+    report = pd.DataFrame(records).reindex(columns=REPORT_COLUMNS)
+    count_columns = ["duplicates", "non_monotonic", "gaps", "missing_rows", "stale_runs", "spikes", "non_positive", "nan_cells"]
+    report[count_columns] = report[count_columns].fillna(0).astype(np.int64)
+    report["error"] = report["error"].fillna("")
+    return report
+
+
+def flagged(report: pd.DataFrame) -> pd.DataFrame:
+    """Rows with any integrity issue or a read error."""
+
+    issues = report[["duplicates", "non_monotonic", "gaps", "stale_runs", "spikes", "non_positive"]].sum(axis=1) > 0
+    return report[issues | (report["error"] != "")]
+
+
+def write_report(report: pd.DataFrame, out_file: Path) -> Path:
+    out_file = Path(out_file)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    if out_file.suffix == ".parquet":
+        report.to_parquet(out_file, index=False)
+    else:
+        report.to_csv(out_file, index=False)
+    return out_file
+
+
+__all__ = [
+    "IntegrityConfig",
+    "DEFAULT_CONFIG",
+    "SOURCE_CONFIGS",
+    "timestamp_checks",
+    "stale_runs",
+    "spike_count",
+    "scan_frame",
+    "scan_file",
+    "discover",
+    "scan_paths",
+    "flagged",
+    "write_report",
+]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scan cached datasets for integrity issues.")
+    parser.add_argument("roots", nargs="*", type=Path, default=[DATA_ROOT])
+    parser.add_argument("--out", type=Path, default=DATA_ROOT / "integrity_report.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    result = scan_paths(discover(args.roots), max_workers=args.workers)
+    write_report(result, args.out)
+    issues = flagged(result)
+    print(f"scanned {len(result)} files, {len(issues)} flagged -> {args.out}")
+    if len(issues):
+        print(issues[["path", "duplicates", "non_monotonic", "gaps", "stale_runs", "spikes", "error"]].to_string(index=False))
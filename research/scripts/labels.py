@@ -0,0 +1,238 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Vectorized labels and targets for ML signals.
+
+- `forward_returns`: `close[t + h] / close[t] - 1` for several horizons.
+- `vol_scaled_targets`: forward returns divided by trailing volatility scaled to the horizon.
+- `triple_barrier`: take-profit / trailing-stop / time barriers per event. The stop follows
+  `TrailingStopGuard` exactly: entered at `p_i`, the stop after bar `j` is
+  `(1 - stop_loss_pct) * max(p_i..p_j)` and the position exits on the first `j` with
+  `p_j <= stop`.
+
+First passages are found for all events at once by binary lifting over power-of-two block tables
+(block max, block min and "a trailing stop is hit inside this block"), so each event costs
+`O(log horizon)` array steps instead of a Python loop over its bars. Prices are processed in chunks
+so the tables stay a bounded size for multi-million-bar histories.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+BARRIER_NAMES = ("vertical", "take_profit", "stop")
+VERTICAL, TAKE_PROFIT, STOP = 0, 1, 2
+
+
+def forward_return(close: np.ndarray, horizon: int) -> np.ndarray:
+    """`close[t + horizon] / close[t] - 1`, NaN for the last `horizon` rows."""
+
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(close.size, np.nan)
+    if 0 < horizon < close.size:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[:-horizon] = close[horizon:] / close[:-horizon] - 1.0
+    return out
+
+
+def forward_returns(close: pd.Series, horizons: Sequence[int]) -> pd.DataFrame:
+    values = close.to_numpy(dtype=np.float64)
+    out = np.empty((values.size, len(horizons)))
+    for j, horizon in enumerate(horizons):
+        out[:, j] = forward_return(values, horizon)
+    return pd.DataFrame(out, index=close.index, columns=[f"fwd_{h}" for h in horizons])
+
+
+def trailing_vol(close: np.ndarray, window: int) -> np.ndarray:
+    """Sample std of the last `window` one-bar returns (`Series.pct_change().rolling(window).std()`)."""
+
+    close = np.asarray(close, dtype=np.float64)
+    returns = np.full(close.size, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = close[1:] / close[:-1] - 1.0
+    valid = np.isfinite(returns)
+    filled = np.where(valid, returns, 0.0)
+    # Centre on the global mean so the running sums do not cancel catastrophically.
+    filled = np.where(valid, filled - (filled[valid].mean() if valid.any() else 0.0), 0.0)
+    out = np.full(close.size, np.nan)
+    if window < 2 or window >= close.size:
+        return out
+    s1 = np.concatenate(([0.0], np.cumsum(filled)))
+    s2 = np.concatenate(([0.0], np.cumsum(filled * filled)))
+    count = np.concatenate(([0], np.cumsum(valid)))
+    total = s1[window:] - s1[:-window]
+    total_sq = s2[window:] - s2[:-window]
+    complete = (count[window:] - count[:-window]) == window
+    var = np.maximum(total_sq - total * total / window, 0.0) / (window - 1)
+    out[window - 1 :] = np.where(complete, np.sqrt(var), np.nan)
+    return out
+
+
+def vol_scaled_targets(close: pd.Series, horizons: Sequence[int], vol_window: int = 1440) -> pd.DataFrame:
+    """Forward returns over each horizon divided by `trailing_vol * sqrt(horizon)` known at `t`."""
+
+    values = close.to_numpy(dtype=np.float64)
+    vol = trailing_vol(values, vol_window)
+    out = np.empty((values.size, len(horizons)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j, horizon in enumerate(horizons):
+            out[:, j] = forward_return(values, horizon) / (vol * np.sqrt(horizon))
+    out[~np.isfinite(out)] = np.nan
+    return pd.DataFrame(out, index=close.index, columns=[f"fwd_{h}_vol" for h in horizons])
+
+
+def _block_tables(prices: np.ndarray, levels: int, keep: float | None) -> tuple[list[np.ndarray], list[np.ndarray], list[np.ndarray]]:
+    """
+    Level `k` covers blocks `[t, t + 2**k)`: max, min and whether some `j` in the block satisfies
+    `p_j <= keep * max(p_t..p_j)` (a trailing stop started at the block's first bar is hit inside it).
+    """
+
+    maxima, minima, hits = [prices], [prices], [np.zeros(prices.size, dtype=bool)]
+    for k in range(1, levels + 1):
+        half = 1 << (k - 1)
+        size = prices.size - (1 << k) + 1
+        if size <= 0:
+            break
+        lo_max, hi_max = maxima[-1][:size], maxima[-1][half : half + size]
+        lo_min, hi_min = minima[-1][:size], minima[-1][half : half + size]
+        maxima.append(np.maximum(lo_max, hi_max))
+        minima.append(np.minimum(lo_min, hi_min))
+        if keep is not None:
+            hits.append(hits[-1][:size] | hits[-1][half : half + size] | (hi_min <= keep * lo_max))
+    return maxima, minima, hits
+
+
+def _first_passages(
+    prices: np.ndarray,
+    events: np.ndarray,
+    limits: np.ndarray,
+    upper: np.ndarray | None,
+    keep: float | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    For events at `events` (entry bar) with last bar `limits`, return the first bar `> event` where
+    `p >= upper` and the first where the trailing stop is hit; `-1` when not reached by `limit`.
+    """
+
+    span = int((limits - events).max()) if events.size else 0
+    levels = max(span.bit_length() - 1, 0)
+    maxima, minima, hits = _block_tables(prices, levels, keep)
+    levels = len(maxima) - 1
+
+    up = np.full(events.size, -1, dtype=np.int64)
+    if upper is not None:
+        pos = events + 1
+        for k in range(levels, -1, -1):
+            width = 1 << k
+            fits = pos + width - 1 <= limits
+            idx = np.where(fits, pos, 0)
+            jump = fits & (maxima[k][idx] < upper)
+            pos = np.where(jump, pos + width, pos)
+        reached = pos <= limits
+        up[reached] = pos[reached]
+
+    down = np.full(events.size, -1, dtype=np.int64)
+    if keep is not None:
+        pos = events + 1
+        peak = prices[events].copy()
+        for k in range(levels, -1, -1):
+            width = 1 << k
+            fits = pos + width - 1 <= limits
+            idx = np.where(fits, pos, 0)
+            jump = fits & ~hits[k][idx] & (minima[k][idx] > keep * peak)
+            peak = np.where(jump, np.maximum(peak, maxima[k][idx]), peak)
+            pos = np.where(jump, pos + width, pos)
+        reached = pos <= limits
+        down[reached] = pos[reached]
+    return up, down
+
+
+def triple_barrier(
+    close: pd.Series,
+    horizon: int,
+    take_profit: float | np.ndarray | None = None,
+    stop_loss_pct: float | None = 0.03,
+    events: np.ndarray | None = None,
+    vertical_sign: bool = False,
+    chunk: int = 1 << 18,
+) -> pd.DataFrame:
+    """
+    Triple-barrier labels for entries at `close[events]` (default: every bar).
+
+    `take_profit` is a return (`0.02` = +2%), scalar or one width per event (e.g.
+    `k * trailing_vol * sqrt(horizon)` for volatility-scaled barriers); `None` disables it.
+    `stop_loss_pct` is the `TrailingStopGuard` trailing stop; `None` disables it. The time barrier is
+    `horizon` bars after entry.
+
+    Columns: `label` (+1 take-profit, -1 stop, 0 time barrier or its return sign when
+    `vertical_sign`), `barrier` (`BARRIER_NAMES` code), `exit_offset` in bars and `exit_return`.
+    Events whose time barrier falls past the end of the data and that hit neither barrier are NaN.
+    """
+
+    prices = close.to_numpy(dtype=np.float64)
+    if not np.isfinite(prices).all() or (prices <= 0).any():
+        raise ValueError("triple_barrier needs finite, positive prices; drop or fill NaNs first")
+    n = prices.size
+    events = np.arange(n, dtype=np.int64) if events is None else np.asarray(events, dtype=np.int64)
+    order = np.argsort(events, kind="stable")
+    sorted_events = events[order]
+    upper_rel = None if take_profit is None else np.broadcast_to(np.asarray(take_profit, dtype=np.float64), events.shape)[order]
+    keep = None if stop_loss_pct is None else 1.0 - stop_loss_pct
+
+    exit_at = np.empty(events.size, dtype=np.int64)
+    barrier = np.empty(events.size, dtype=np.int8)
+    complete = np.empty(events.size, dtype=bool)
+    starts = np.searchsorted(sorted_events, np.arange(0, n, chunk))
+    ends = np.append(starts[1:], sorted_events.size)
+    for base, lo, hi in zip(range(0, n, chunk), starts, ends):
+        if lo == hi:
+            continue
+        window = prices[base : min(n, base + chunk + horizon)]
+        local = sorted_events[lo:hi] - base
+        limits = np.minimum(local + horizon, window.size - 1)
+        upper = None if upper_rel is None else window[local] * (1.0 + upper_rel[lo:hi])
+        up, down = _first_passages(window, local, limits, upper, keep)
+
+        first = limits.copy()
+        kind = np.full(local.size, VERTICAL, dtype=np.int8)
+        hit_up = (up >= 0) & ((down < 0) | (up < down))
+        hit_down = (down >= 0) & ~hit_up
+        first[hit_up], kind[hit_up] = up[hit_up], TAKE_PROFIT
+        first[hit_down], kind[hit_down] = down[hit_down], STOP
+        exit_at[lo:hi] = first + base
+        barrier[lo:hi] = kind
+        complete[lo:hi] = (kind != VERTICAL) | (local + horizon <= window.size - 1)
+
+    exit_return = prices[exit_at] / prices[sorted_events] - 1.0
+    label = np.where(barrier == TAKE_PROFIT, 1.0, np.where(barrier == STOP, -1.0, 0.0))
+    if vertical_sign:
+        label = np.where(barrier == VERTICAL, np.sign(exit_return), label)
+    label[~complete] = np.nan
+    exit_return[~complete] = np.nan
+
+    frame = pd.DataFrame(
+        {
+            "label": label,
+            "barrier": barrier,
+            "exit_offset": (exit_at - sorted_events).astype(np.float64),
+            "exit_return": exit_return,
+        },
+        index=close.index[sorted_events],
+    )
+    frame.loc[~complete, "exit_offset"] = np.nan
+    return frame.iloc[np.argsort(order, kind="stable")]
+
+
+__all__ = [
+    "BARRIER_NAMES",
+    "VERTICAL",
+    "TAKE_PROFIT",
+    "STOP",
+    "forward_return",
+    "forward_returns",
+    "trailing_vol",
+    "vol_scaled_targets",
+    "triple_barrier",
+]
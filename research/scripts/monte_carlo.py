@@ -0,0 +1,161 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Monte Carlo null distribution for the random-entry baseline in `main.py`.
+
+Each seed gets its own `np.random.Generator(PCG64(seed))` stream with one uniform per bar, so a seed's
+entry decisions do not depend on which other seeds share the batch and the same draws are reused
+across the `trade_probability` grid (common random numbers). The backtest walks bars once and updates
+every seed's position state as arrays, mirroring `SleepySkyBlueAlligator.OnData`: trailing stop
+first, then the trade-interval throttle, then a random long entry.
+
+Note: the live `RandomLongSignal` only consumes a draw when it is asked to score (flat and allowed
+to trade), so a seed here is distributionally equivalent to, not path-identical with, a Lean run.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.costs import KRAKEN_SPOT_SCHEDULE
+
+DEFAULT_FEE_RATE = KRAKEN_SPOT_SCHEDULE[0].taker_bps / 10_000
+
+
+def seed_streams(seeds: Sequence[int]) -> list[np.random.Generator]:
+    return [np.random.Generator(np.random.PCG64(int(seed))) for seed in seeds]
+
+
+def entry_draws(streams: Sequence[np.random.Generator], n_bars: int) -> np.ndarray:
+    """Next `n_bars` uniforms from every stream as a `(seeds, n_bars)` array (float64 keeps chunking exact)."""
+
+    out = np.empty((len(streams), n_bars))
+    for row, stream in enumerate(streams):
+        stream.random(out=out[row])
+    return out
+
+
+def simulate_random_long(
+    closes: np.ndarray,
+    seeds: Sequence[int],
+    trade_probability: float = 0.3,
+    stop_loss_pct: float = 0.03,
+    min_trade_interval: int = 5,
+    position_size: float = 0.95,
+    fee_rate: float = DEFAULT_FEE_RATE,
+    chunk: int = 4096,
+) -> pd.DataFrame:
+    """
+    Vectorized random-long backtest over `closes` for every seed at once.
+
+    Returns one row per seed with `total_return`, `trades` and `win_rate`; open positions are marked
+    to the last close.
+    """
+
+    closes = np.asarray(closes, dtype=np.float64)
+    n = len(seeds)
+    streams = seed_streams(seeds)
+    equity = np.ones(n)
+    in_pos = np.zeros(n, dtype=bool)
+    entry = np.zeros(n)
+    stop = np.zeros(n)
+    # The algorithm starts with last_trade_time = StartDate, so the first entry waits one interval.
+    last_trade = np.zeros(n, dtype=np.int64)
+    trades = np.zeros(n, dtype=np.int64)
+    wins = np.zeros(n, dtype=np.int64)
+    keep = 1.0 - stop_loss_pct
+
+    for start in range(0, closes.size, chunk):
+        block = closes[start : start + chunk]
+        draws = entry_draws(streams, block.size)
+        for offset, price in enumerate(block):
+            if not np.isfinite(price):
+                continue
+            t = start + offset
+            np.maximum(stop, price * keep, out=stop, where=in_pos)
+            exits = in_pos & (price <= stop)
+            if exits.any():
+                pnl = price / entry[exits] - 1.0
+                equity[exits] *= (1.0 + position_size * pnl) * (1.0 - position_size * fee_rate)
+                wins[exits] += pnl > 0
+                in_pos &= ~exits
+            enter = ~in_pos & ~exits & (t - last_trade >= min_trade_interval) & (draws[:, offset] < trade_probability)
+            if enter.any():
+                in_pos |= enter
+                entry[enter] = price
+                stop[enter] = price * keep
+                last_trade[enter] = t
+                trades[enter] += 1
+                equity[enter] *= 1.0 - position_size * fee_rate
+
+    last = closes[np.isfinite(closes)][-1] if np.isfinite(closes).any() else np.nan
+    marked = np.where(in_pos, equity * (1.0 + position_size * (last / np.where(in_pos, entry, 1.0) - 1.0)), equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        win_rate = np.where(trades > 0, wins / trades, 0.0)
+    return pd.DataFrame(
+        {"seed": np.asarray(seeds), "total_return": marked - 1.0, "trades": trades, "win_rate": win_rate}
+    )
+
+
+def _simulate_cell(args: tuple) -> pd.DataFrame:
+    closes, seeds, probability, stop_pct, kwargs = args
+    frame = simulate_random_long(closes, seeds, trade_probability=probability, stop_loss_pct=stop_pct, **kwargs)
+    frame.insert(0, "stop_loss_pct", stop_pct)
+    frame.insert(0, "trade_probability", probability)
+    return frame
+
+
+def null_distribution(
+    closes: np.ndarray | pd.Series,
+    seeds: Sequence[int],
+    trade_probabilities: Sequence[float] = (0.3,),
+    stop_loss_pcts: Sequence[float] = (0.03,),
+    seeds_per_task: int = 256,
+    max_workers: int | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Random-baseline returns for every (trade_probability, stop_loss_pct, seed) combination.
+
+    Grid cells and seed chunks are spread over a process pool; results are identical to a serial
+    run because every seed owns its stream.
+    """
+
+    prices = np.asarray(closes, dtype=np.float64)
+    seeds = list(seeds)
+    chunks = [seeds[i : i + seeds_per_task] for i in range(0, len(seeds), seeds_per_task)]
+    tasks = [
+        (prices, chunk, probability, stop_pct, kwargs)
+        for probability, stop_pct in product(trade_probabilities, stop_loss_pcts)
+        for chunk in chunks
+    ]
+    if max_workers == 1 or len(tasks) == 1:
+        frames = [_simulate_cell(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(_simulate_cell, tasks))
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize_null(results: pd.DataFrame, quantiles: Sequence[float] = (0.05, 0.5, 0.95)) -> pd.DataFrame:
+    """Quantiles of `total_return` per parameter cell, for comparing a strategy against luck."""
+
+    grouped = results.groupby(["trade_probability", "stop_loss_pct"])["total_return"]
+    summary = grouped.quantile(list(quantiles)).unstack()
+    summary.columns = [f"q{int(q * 100):02d}" for q in quantiles]
+    summary["mean"] = grouped.mean()
+    summary["runs"] = grouped.size()
+    return summary
+
+
+__all__ = [
+    "seed_streams",
+    "entry_draws",
+    "simulate_random_long",
+    "null_distribution",
+    "summarize_null",
+]
@@ -5,6 +5,7 @@ from typing import Mapping, Sequence
 
 import numpy as np
 import pandas as pd
+from numpy.typing import DTypeLike
 
 
 @dataclass
@@ -14,14 +15,68 @@ class PriceWindow:
     volumes: pd.Series | None = None
 
 
-def multi_horizon_roc(price: pd.Series, windows: Sequence[int]) -> pd.DataFrame:
-    frame = {}
-    for window in windows:
-        frame[f"roc_{window}h"] = price.pct_change(window)
-    return pd.DataFrame(frame)
-
-
-def atr_percent(high: pd.Series, low: pd.Series, close: pd.Series, window: int = 24) -> pd.Series:
+def bar_returns(closes: pd.Series | pd.DataFrame) -> pd.Series | pd.DataFrame:
+    """Simple one-bar returns; shared by features and the covariance estimators."""
+
+    return closes.pct_change()
+
+
+def rolling_mean_windows(
+    values: np.ndarray,
+    windows: Sequence[int],
+    dtype: DTypeLike = np.float64,
+) -> np.ndarray:
+    """
+    Trailing means of a 1-D array for every window from one cumulative-sum pass.
+
+    Returns a C-contiguous `(len(values), len(windows))` array. Like `Series.rolling(w).mean()`, a row
+    is NaN until `w` values are available and whenever the window contains a NaN. Sums are
+    accumulated in float64 and each window is written straight into the `dtype` output, so no
+    float64 copy of the full matrix is held.
+    """
+
+    x = np.asarray(values, dtype=np.float64)
+    n = x.size
+    missing = np.isnan(x)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, x))))
+    cnan = np.concatenate(([0], np.cumsum(missing)))
+    out = np.full((n, len(windows)), np.nan, dtype=dtype)
+    with np.errstate(over="ignore"):
+        for j, window in enumerate(windows):
+            if window <= 0 or window > n:
+                continue
+            total = csum[window:] - csum[:-window]
+            gaps = cnan[window:] - cnan[:-window]
+            out[window - 1 :, j] = np.where(gaps == 0, total / window, np.nan)
+    return out
+
+
+def multi_horizon_roc(price: pd.Series, windows: Sequence[int], dtype: DTypeLike = np.float64) -> pd.DataFrame:
+    """`price.pct_change(w)` for every window, written into one preallocated `dtype` matrix."""
+
+    values = price.to_numpy(dtype=np.float64)
+    out = np.full((values.size, len(windows)), np.nan, dtype=dtype)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for j, window in enumerate(windows):
+            if 0 < window < values.size:
+                out[window:, j] = values[window:] / values[:-window] - 1.0
+    return pd.DataFrame(out, index=price.index, columns=[f"roc_{w}h" for w in windows])
+
+
+def _stored(series: pd.Series, dtype: DTypeLike) -> pd.Series:
+    """Cast a float64 result to the storage dtype (`DtypePolicy.target`) once, at the end."""
+
+    with np.errstate(over="ignore"):
+        return series.astype(dtype)
+
+
+def atr_percent(
+    high: pd.Series,
+    low: pd.Series,
+    close: pd.Series,
+    window: int = 24,
+    dtype: DTypeLike = np.float64,
+) -> pd.Series:
     true_range = pd.concat(
         [
             high - low,
@@ -31,39 +86,54 @@ def atr_percent(high: pd.Series, low: pd.Series, close: pd.Series, window: int =
         axis=1,
     ).max(axis=1)
     atr = true_range.rolling(window).mean()
-    return (atr / close).rename("atr_percent")
+    return _stored((atr / close).rename("atr_percent"), dtype)
 
 
-def realized_vol(returns: pd.Series, window: int, annualize: bool = False) -> pd.Series:
+def realized_vol(
+    returns: pd.Series,
+    window: int,
+    annualize: bool = False,
+    dtype: DTypeLike = np.float64,
+) -> pd.Series:
     vol = returns.rolling(window).std()
     if annualize:
         vol = vol * np.sqrt(window)
-    return vol.rename(f"realized_vol_{window}")
+    return _stored(vol.rename(f"realized_vol_{window}"), dtype)
 
 
-def normalized_momentum(price: pd.Series, window: int, vol_window: int) -> pd.Series:
+def normalized_momentum(price: pd.Series, window: int, vol_window: int, dtype: DTypeLike = np.float64) -> pd.Series:
     momentum = price.pct_change(window)
     vol = realized_vol(momentum, vol_window)
     factor = momentum / vol.replace(0, np.nan)
-    return factor.rename(f"normalized_mom_{window}_{vol_window}")
+    return _stored(factor.rename(f"normalized_mom_{window}_{vol_window}"), dtype)
 
 
-def liquidity_metrics(price: pd.Series, volume: pd.Series, lookback: int = 10) -> pd.Series:
+def liquidity_metrics(
+    price: pd.Series,
+    volume: pd.Series,
+    lookback: int = 10,
+    dtype: DTypeLike = np.float64,
+) -> pd.Series:
     dollar_vol = price * volume
     med_dv = dollar_vol.rolling(lookback).median()
     price_range = price.rolling(lookback).apply(lambda s: (s.max() - s.min()) / s.mean() if s.mean() else np.nan)
     score = med_dv / price_range.replace(0, np.nan)
-    return score.rename(f"liquidity_score_{lookback}")
+    return _stored(score.rename(f"liquidity_score_{lookback}"), dtype)
 
 
-def relative_volume(volume: pd.Series, short_window: int = 24, long_window: int = 168) -> pd.Series:
+def relative_volume(
+    volume: pd.Series,
+    short_window: int = 24,
+    long_window: int = 168,
+    dtype: DTypeLike = np.float64,
+) -> pd.Series:
     short_avg = volume.rolling(short_window).mean()
     long_avg = volume.rolling(long_window).mean()
     ratio = short_avg / long_avg.replace(0, np.nan)
-    return ratio.rename(f"relative_volume_{short_window}_{long_window}")
+    return _stored(ratio.rename(f"relative_volume_{short_window}_{long_window}"), dtype)
 
 
-def volume_percentile(volume: pd.Series, window: int = 168) -> pd.Series:
+def volume_percentile(volume: pd.Series, window: int = 168, dtype: DTypeLike = np.float64) -> pd.Series:
     def percentile(arr: np.ndarray) -> float:
         arr = arr[~np.isnan(arr)]
         if arr.size == 0:
@@ -72,14 +142,19 @@ def volume_percentile(volume: pd.Series, window: int = 168) -> pd.Series:
         return np.sum(arr <= last) / arr.size
 
     scores = volume.rolling(window).apply(lambda x: percentile(np.array(x)), raw=True)
-    return scores.rename(f"volume_percentile_{window}")
+    return _stored(scores.rename(f"volume_percentile_{window}"), dtype)
 
 
-def price_volume_ratio(price: pd.Series, volume: pd.Series, window: int = 24) -> pd.Series:
+def price_volume_ratio(
+    price: pd.Series,
+    volume: pd.Series,
+    window: int = 24,
+    dtype: DTypeLike = np.float64,
+) -> pd.Series:
     price_change = price.pct_change(window)
     volume_change = volume.pct_change(window)
     ratio = price_change / volume_change.replace(0, np.nan)
-    return ratio.rename(f"price_volume_ratio_{window}")
+    return _stored(ratio.rename(f"price_volume_ratio_{window}"), dtype)
 
 
 def cross_asset_beta(
@@ -98,7 +173,7 @@ def cross_asset_beta(
         y = sub.iloc[:, 0]
         coef, *_ = np.linalg.lstsq(X.values, y.values, rcond=None)
         betas.append(pd.Series(coef, index=X.columns, name=sub.index[-1]))
-        residuals.append((y - X.dot(coef))[-1])
+        residuals.append((y - X.dot(coef)).iloc[-1])
 
     betas_df = pd.DataFrame(betas)
     residual_series = pd.Series(residuals, index=betas_df.index, name="beta_residual")
@@ -109,18 +184,36 @@ def regime_flags(
     btc_returns: pd.Series,
     macro_series: Mapping[str, pd.Series],
     windows: Sequence[int] = (24, 168),
+    dtype: DTypeLike = np.float64,
 ) -> pd.DataFrame:
-    features = {}
-    for name, series in macro_series.items():
-        aligned = pd.concat([btc_returns, series], axis=1, join="inner").dropna()
-        ratio = aligned.iloc[:, 0] / aligned.iloc[:, 1].replace(0, np.nan)
-        for window in windows:
-            features[f"{name}_ratio_{window}h"] = ratio.rolling(window).mean()
-    return pd.DataFrame(features)
+    """
+    Rolling means of `btc_returns / macro` per macro series and window.
+
+    Each series' window runs over the rows where both it and BTC are present (the inner join of the
+    original definition), so gaps in one macro series do not shift another's windows. All series are
+    aligned to the BTC index once, every window comes from one cumulative-sum pass per series, and
+    the result is a single contiguous `dtype` matrix indexed by the BTC rows where any series has data.
+    """
+
+    btc = btc_returns.to_numpy(dtype=np.float64)
+    names = list(macro_series)
+    columns = [f"{name}_ratio_{window}h" for name in names for window in windows]
+    out = np.full((btc.size, len(columns)), np.nan, dtype=dtype)
+    covered = np.zeros(btc.size, dtype=bool)
+    for k, name in enumerate(names):
+        macro = macro_series[name].reindex(btc_returns.index).to_numpy(dtype=np.float64)
+        rows = np.flatnonzero(~np.isnan(btc) & ~np.isnan(macro))
+        covered[rows] = True
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = btc[rows] / np.where(macro[rows] == 0, np.nan, macro[rows])
+        out[rows, k * len(windows) : (k + 1) * len(windows)] = rolling_mean_windows(ratio, windows, dtype)
+    return pd.DataFrame(out[covered], index=btc_returns.index[covered], columns=columns)
 
 
 __all__ = [
     "PriceWindow",
+    "bar_returns",
+    "rolling_mean_windows",
     "multi_horizon_roc",
     "atr_percent",
     "realized_vol",
@@ -0,0 +1,216 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Offline replay bundles for the specs registered on a `DataLoader`.
+
+`export_bundle` resolves every registered `DataRequestSpec` into bars (via a fetcher, e.g. a QuantBook
+history call) plus the matching `alt_data` sources, and writes them into one compressed `.npz` file:
+per stream an int64 nanosecond time column and a float64 value matrix, and a JSON manifest describing
+the specs, columns and row counts. Alt-data rows are stamped at *publication* time (source timestamp
++ lag), so replaying them never leaks values early.
+
+`ReplayReader` loads each stream once (sequential reads from the archive) and yields events in global
+timestamp order through a k-way `heapq.merge`. At equal timestamps alt-data events come before bars,
+matching the `side="right"` as-of rule in `alt_data`.
+"""
+
+import heapq
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.alt_data import DEFAULT_SOURCES, AltDataSource, AsOfJoinEngine, to_ns
+from research.scripts.bars import OHLCV
+from research.scripts.data_loader import DataLoader, DataRequestSpec
+
+BUNDLE_VERSION = 1
+
+BarFetcher = Callable[[DataRequestSpec], pd.DataFrame]
+
+
+def quantbook_fetcher(qb: "QuantBook") -> BarFetcher:
+    """Fetcher backed by QuantConnect Research: one `History` call per spec, OHLCV columns."""
+
+    def fetch(spec: DataRequestSpec) -> pd.DataFrame:
+        resolution = getattr(Resolution, spec.resolution)
+        symbol = qb.AddCrypto(spec.symbol, resolution, spec.market).Symbol
+        history = qb.History(symbol, pd.Timestamp(spec.start), pd.Timestamp(spec.end), resolution)
+        if isinstance(history.index, pd.MultiIndex):
+            history = history.droplevel(0)
+        return history
+
+    return fetch
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    """Manifest entry for one stream in a bundle."""
+
+    name: str
+    kind: str
+    symbol: str
+    columns: tuple[str, ...]
+    rows: int
+    start: str | None
+    end: str | None
+
+
+@dataclass(frozen=True)
+class ReplayEvent:
+    time_ns: int
+    stream: str
+    values: np.ndarray
+
+
+def _stream_arrays(frame: pd.DataFrame, columns: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    if frame is None or frame.empty:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(columns)))
+    times = to_ns(frame.index)
+    values = frame.reindex(columns=list(columns)).to_numpy(dtype=np.float64)
+    order = np.argsort(times, kind="stable")
+    return times[order], values[order]
+
+
+def _iso(ns: np.ndarray, position: int) -> str | None:
+    return pd.Timestamp(int(ns[position]), tz="UTC").isoformat() if ns.size else None
+
+
+def export_bundle(
+    loader: DataLoader,
+    fetch_bars: BarFetcher,
+    out_file: Path,
+    sources: Sequence[AltDataSource] = DEFAULT_SOURCES,
+    alt_symbols: Mapping[str, Sequence[str]] | None = None,
+) -> Path:
+    """
+    Write every spec registered on `loader` (and its alt data) into `out_file` (`.npz`).
+
+    `alt_symbols` maps a spec symbol to the `data_fetchers` symbols to attach (e.g. `"BTCUSD"` ->
+    `["btcusdt"]`); by default the spec symbol itself is used. Each alt file is exported once even if
+    several specs reference it. Bar streams are named `bars:<market>:<symbol>:<resolution>`; specs
+    that differ only in date range or options would share a stream and raise `ValueError`.
+    """
+
+    arrays: dict[str, np.ndarray] = {}
+    streams: list[StreamInfo] = []
+    engine = AsOfJoinEngine(sources)
+
+    def add(name: str, kind: str, symbol: str, columns: Sequence[str], times: np.ndarray, values: np.ndarray) -> None:
+        key = f"s{len(streams)}"
+        arrays[f"{key}_time"] = times
+        arrays[f"{key}_values"] = values
+        streams.append(StreamInfo(name, kind, symbol, tuple(columns), int(times.size), _iso(times, 0), _iso(times, -1)))
+
+    exported_alt: set[tuple[str, str]] = set()
+    specs = loader.list_requests()
+    for spec in specs:
+        targets = (alt_symbols or {}).get(spec.symbol, [spec.symbol])
+        for source in sources:
+            lag_ns = pd.Timedelta(source.lag).value
+            for alt_symbol in targets:
+                if (source.name, alt_symbol.lower()) in exported_alt:
+                    continue
+                exported_alt.add((source.name, alt_symbol.lower()))
+                times, values, columns = engine.load(source, alt_symbol)
+                if times.size:
+                    columns = [source.feature_name(column) for column in columns]
+                    add(f"{source.name}:{alt_symbol.lower()}", "alt", alt_symbol, columns, times + lag_ns, values)
+
+    names = [f"bars:{spec.market}:{spec.symbol}:{spec.resolution}" for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Several registered specs map to the same replay stream: {', '.join(duplicates)}")
+    for spec, name in zip(specs, names):
+        times, values = _stream_arrays(fetch_bars(spec), OHLCV)
+        add(name, "bars", spec.symbol, OHLCV, times, values)
+
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "specs": [asdict(spec) for spec in specs],
+        "sources": [{"name": s.name, "lag": str(s.lag), "suffix": s.suffix} for s in sources],
+        "streams": [asdict(stream) for stream in streams],
+    }
+    arrays["manifest"] = np.frombuffer(json.dumps(manifest, default=str).encode("utf-8"), dtype=np.uint8)
+
+    out_file = Path(out_file)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    with out_file.open("wb") as handle:
+        np.savez_compressed(handle, **arrays)
+    return out_file
+
+
+class ReplayReader:
+    """Streams a bundle written by `export_bundle` back in timestamp order."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with np.load(self.path, allow_pickle=False) as archive:
+            self.manifest = json.loads(archive["manifest"].tobytes().decode("utf-8"))
+        if self.manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"Unsupported replay bundle version {self.manifest.get('version')} in {self.path}")
+        self.streams = [StreamInfo(**{**s, "columns": tuple(s["columns"])}) for s in self.manifest["streams"]]
+        self._arrays: dict[str, tuple[np.ndarray, np.ndarray]] | None = None
+
+    @property
+    def specs(self) -> list[DataRequestSpec]:
+        return [DataRequestSpec(**spec) for spec in self.manifest["specs"]]
+
+    def arrays(self) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """`{stream name: (time_ns, values)}`, loaded once in archive order."""
+
+        if self._arrays is None:
+            loaded: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+            with np.load(self.path, allow_pickle=False) as archive:
+                for i, stream in enumerate(self.streams):
+                    loaded[stream.name] = (archive[f"s{i}_time"], archive[f"s{i}_values"])
+            self._arrays = loaded
+        return self._arrays
+
+    def frame(self, stream: str) -> pd.DataFrame:
+        info = next(s for s in self.streams if s.name == stream)
+        times, values = self.arrays()[stream]
+        index = pd.DatetimeIndex(times.astype("datetime64[ns]")).tz_localize("UTC")
+        return pd.DataFrame(values, index=index, columns=list(info.columns))
+
+    def events(self, start: datetime | None = None, end: datetime | None = None) -> Iterator[ReplayEvent]:
+        """
+        Yield `ReplayEvent`s across all streams in timestamp order (k-way heap merge). `start`/`end`
+        bound the window inclusively; each stream is sliced with `searchsorted` before merging.
+        """
+
+        start_ns = None if start is None else int(to_ns(pd.DatetimeIndex([start]))[0])
+        end_ns = None if end is None else int(to_ns(pd.DatetimeIndex([end]))[0])
+        arrays = self.arrays()
+        # Alt streams first so that, on equal timestamps, published values precede the bar.
+        ordered = sorted(self.streams, key=lambda s: s.kind != "alt")
+
+        def stream_events(info: StreamInfo) -> Iterator[tuple[int, str, np.ndarray]]:
+            times, values = arrays[info.name]
+            lo = 0 if start_ns is None else int(np.searchsorted(times, start_ns, side="left"))
+            hi = times.size if end_ns is None else int(np.searchsorted(times, end_ns, side="right"))
+            name = info.name
+            for t, row in zip(times[lo:hi].tolist(), values[lo:hi]):
+                yield t, name, row
+
+        for t, name, row in heapq.merge(*(stream_events(s) for s in ordered), key=lambda item: item[0]):
+            yield ReplayEvent(t, name, row)
+
+    def __iter__(self) -> Iterator[ReplayEvent]:
+        return self.events()
+
+
+__all__ = [
+    "BUNDLE_VERSION",
+    "StreamInfo",
+    "ReplayEvent",
+    "quantbook_fetcher",
+    "export_bundle",
+    "ReplayReader",
+]
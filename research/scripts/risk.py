@@ -9,7 +9,12 @@ Lean-compatible `RiskManagementModel` helpers.
 """
 
 from dataclasses import dataclass
-from typing import Dict
+from statistics import NormalDist
+from typing import Dict, Sequence
+
+import numpy as np
+
+from research.scripts.covariance import CovarianceEstimator
 
 
 @dataclass
@@ -19,6 +24,14 @@ class RiskState:
     pnl: float = 0.0
     exposure: Dict[str, float] | None = None
     breakers_triggered: bool = False
+    equity: float = 0.0
+    peak_equity: float = 0.0
+    drawdown: float = 0.0
+    gross: float = 0.0
+    net: float = 0.0
+    var: float = 0.0
+    expected_shortfall: float = 0.0
+    breaker_reason: str = ""
 
 
 class RiskGuard:
@@ -33,12 +46,296 @@ class RiskGuard:
         return targets
 
 
-class TrailingStopGuard(RiskGuard):
-    """Example stub showing how guards might be structured."""
+class ArrayRiskGuard(RiskGuard):
+    """
+    Guard that evaluates the whole target dictionary as one weight vector.
+
+    `symbols` fixes the array layout; targets for unknown symbols pass through untouched unless a
+    breaker on the shared `RiskState` has tripped, in which case every target, in the layout or not,
+    is zeroed. Subclasses implement `evaluate_array` and record their metrics on the shared state.
+    """
+
+    def __init__(self, symbols: Sequence[str], state: RiskState | None = None) -> None:
+        self.symbols = tuple(symbols)
+        self.state = state if state is not None else RiskState()
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    def to_array(self, targets: Dict[str, float]) -> np.ndarray:
+        weights = np.zeros(len(self.symbols))
+        for symbol, weight in targets.items():
+            i = self._index.get(symbol)
+            if i is not None:
+                weights[i] = weight
+        return weights
+
+    def from_array(self, weights: np.ndarray, targets: Dict[str, float]) -> Dict[str, float]:
+        out = {symbol: weight for symbol, weight in targets.items() if symbol not in self._index}
+        for i in np.flatnonzero(weights):
+            out[self.symbols[i]] = float(weights[i])
+        # Keep explicit zero targets (exit instructions) for symbols the caller asked about.
+        for symbol in targets:
+            out.setdefault(symbol, 0.0)
+        return out
+
+    def evaluate_array(self, weights: np.ndarray, context: Dict[str, float]) -> np.ndarray:
+        return weights
+
+    def evaluate(self, targets: Dict[str, float], context: Dict[str, float]) -> Dict[str, float]:
+        weights = self.evaluate_array(self.to_array(targets), context)
+        if self.state.breakers_triggered:
+            return {symbol: 0.0 for symbol in targets}
+        return self.from_array(weights, targets)
+
+
+class ExposureCapGuard(ArrayRiskGuard):
+    """Per-name, gross and net exposure caps (weights as fraction of equity)."""
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        max_weight: float = 0.25,
+        max_gross: float = 1.0,
+        max_net: float = 1.0,
+        state: RiskState | None = None,
+    ) -> None:
+        super().__init__(symbols, state)
+        self.max_weight = max_weight
+        self.max_gross = max_gross
+        self.max_net = max_net
+
+    def evaluate_array(self, weights: np.ndarray, context: Dict[str, float]) -> np.ndarray:
+        weights = np.clip(weights, -self.max_weight, self.max_weight)
+        longs = weights[weights > 0].sum()
+        shorts = weights[weights < 0].sum()
+        net = longs + shorts
+        # Shrink only the dominant side so the net cap does not also cut the hedge.
+        if net > self.max_net and longs > 0:
+            weights[weights > 0] *= max(self.max_net - shorts, 0.0) / longs
+        elif net < -self.max_net and shorts < 0:
+            weights[weights < 0] *= max(self.max_net + longs, 0.0) / -shorts
+        gross = np.abs(weights).sum()
+        if gross > self.max_gross > 0:
+            weights *= self.max_gross / gross
+        self.state.gross = float(np.abs(weights).sum())
+        self.state.net = float(weights.sum())
+        return weights
+
+
+class HistoricalVaRGuard(ArrayRiskGuard):
+    """
+    Historical-simulation VaR/ES budget.
+
+    Scenario returns are held as a precomputed `(scenarios, symbols)` matrix, so a check is one
+    mat-vec plus an O(S) partition. Portfolio VaR/ES are positively homogeneous in the weights, so a
+    breach is fixed by scaling the book by `limit / measured`.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        scenarios: np.ndarray | None = None,
+        confidence: float = 0.99,
+        max_var: float | None = 0.02,
+        max_es: float | None = None,
+        state: RiskState | None = None,
+    ) -> None:
+        super().__init__(symbols, state)
+        self.confidence = confidence
+        self.max_var = max_var
+        self.max_es = max_es
+        self.scenarios = np.zeros((0, len(self.symbols)))
+        self._cursor = 0
+        if scenarios is not None:
+            self.set_scenarios(scenarios)
+
+    def set_scenarios(self, scenarios: np.ndarray) -> None:
+        """Replace the scenario matrix (e.g. horizon returns over the look-back window)."""
+
+        scenarios = np.nan_to_num(np.asarray(scenarios, dtype=np.float64), nan=0.0)
+        if scenarios.ndim != 2 or scenarios.shape[1] != len(self.symbols):
+            raise ValueError(f"Scenario matrix must be (n, {len(self.symbols)}), got {scenarios.shape}")
+        self.scenarios = np.ascontiguousarray(scenarios)
+        self._cursor = 0
+
+    def push_scenario(self, returns: np.ndarray) -> None:
+        """Overwrite the oldest scenario row in place (rolling window, O(N))."""
+
+        if not len(self.scenarios):
+            raise ValueError("Call set_scenarios() before pushing rolling scenarios.")
+        self.scenarios[self._cursor] = np.nan_to_num(returns, nan=0.0)
+        self._cursor = (self._cursor + 1) % len(self.scenarios)
+
+    def measure(self, weights: np.ndarray) -> tuple[float, float]:
+        """Return (VaR, ES) as positive loss fractions of equity."""
+
+        if not len(self.scenarios):
+            return 0.0, 0.0
+        pnl = self.scenarios @ weights
+        tail = max(int(np.ceil(len(pnl) * (1.0 - self.confidence))), 1)
+        worst = np.partition(pnl, tail - 1)[:tail]
+        var = max(-float(worst.max()), 0.0)
+        es = max(-float(worst.mean()), 0.0)
+        return var, es
+
+    def evaluate_array(self, weights: np.ndarray, context: Dict[str, float]) -> np.ndarray:
+        var, es = self.measure(weights)
+        scale = 1.0
+        if self.max_var is not None and var > self.max_var:
+            scale = min(scale, self.max_var / var)
+        if self.max_es is not None and es > self.max_es:
+            scale = min(scale, self.max_es / es)
+        self.state.var = var * scale
+        self.state.expected_shortfall = es * scale
+        return weights * scale if scale < 1.0 else weights
 
-    def __init__(self, stop_pct: float = 0.03) -> None:
+
+class ParametricVaRGuard(ArrayRiskGuard):
+    """Gaussian VaR/ES from a live covariance estimator; `horizon` is in bars."""
+
+    def __init__(
+        self,
+        estimator: CovarianceEstimator,
+        confidence: float = 0.99,
+        horizon: int = 1,
+        max_var: float | None = 0.02,
+        max_es: float | None = None,
+        shrinkage: float | str = 0.0,
+        state: RiskState | None = None,
+    ) -> None:
+        super().__init__(estimator.symbols, state)
+        self.estimator = estimator
+        self.max_var = max_var
+        self.max_es = max_es
+        self.shrinkage = shrinkage
+        z = NormalDist().inv_cdf(confidence)
+        self._var_mult = z * np.sqrt(horizon)
+        self._es_mult = NormalDist().pdf(z) / (1.0 - confidence) * np.sqrt(horizon)
+
+    def measure(self, weights: np.ndarray) -> tuple[float, float]:
+        cov = self.estimator.snapshot(self.shrinkage).covariance
+        sigma = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+        return self._var_mult * sigma, self._es_mult * sigma
+
+    def evaluate_array(self, weights: np.ndarray, context: Dict[str, float]) -> np.ndarray:
+        if not self.estimator.ready:
+            return weights
+        var, es = self.measure(weights)
+        scale = 1.0
+        if self.max_var is not None and var > self.max_var:
+            scale = min(scale, self.max_var / var)
+        if self.max_es is not None and es > self.max_es:
+            scale = min(scale, self.max_es / es)
+        self.state.var = var * scale
+        self.state.expected_shortfall = es * scale
+        return weights * scale if scale < 1.0 else weights
+
+
+class DrawdownBreaker(ArrayRiskGuard):
+    """
+    Flattens all targets (including symbols outside `symbols`) once equity falls `max_drawdown`
+    below its running peak.
+
+    Reads `context["equity"]` each bar; the breaker stays latched until `reset()` (manual/runbook
+    action, see docs/runbooks/risk/kill_switch.md).
+    """
+
+    def __init__(self, symbols: Sequence[str], max_drawdown: float = 0.10, state: RiskState | None = None) -> None:
+        super().__init__(symbols, state)
+        self.max_drawdown = max_drawdown
+
+    def update_equity(self, equity: float) -> None:
+        state = self.state
+        if state.peak_equity <= 0:
+            state.peak_equity = equity
+        state.pnl += (equity - state.equity) if state.equity else 0.0
+        state.equity = equity
+        state.peak_equity = max(state.peak_equity, equity)
+        state.drawdown = 1.0 - equity / state.peak_equity if state.peak_equity > 0 else 0.0
+        if state.drawdown >= self.max_drawdown and not state.breakers_triggered:
+            state.breakers_triggered = True
+            state.breaker_reason = f"drawdown {state.drawdown:.2%} >= {self.max_drawdown:.2%}"
+
+    def reset(self) -> None:
+        self.state.breakers_triggered = False
+        self.state.breaker_reason = ""
+        self.state.peak_equity = self.state.equity
+
+    def evaluate_array(self, weights: np.ndarray, context: Dict[str, float]) -> np.ndarray:
+        equity = context.get("equity")
+        if equity is not None:
+            self.update_equity(float(equity))
+        if self.state.breakers_triggered:
+            return np.zeros_like(weights)
+        return weights
+
+
+class TrailingStopGuard(ArrayRiskGuard):
+    """
+    Per-symbol trailing stops over the target vector.
+
+    Reads the last price of every symbol from `context[symbol]`; missing, NaN or non-positive prices
+    (Lean reports 0.0 before the first bar) leave that symbol's stop unchanged. While a target keeps
+    its side, the stop trails the best price seen `stop_pct` away (below for longs, above for
+    shorts); once crossed, the symbol's target is zeroed until the requested side changes, so
+    re-entry needs a fresh (flat or flipped) signal.
+    """
+
+    def __init__(self, symbols: Sequence[str], stop_pct: float = 0.03, state: RiskState | None = None) -> None:
+        super().__init__(symbols, state)
         self.stop_pct = stop_pct
+        self.reset()
+
+    def reset(self) -> None:
+        n = len(self.symbols)
+        self.side = np.zeros(n)
+        self.best = np.full(n, np.nan)
+        self.stopped = np.zeros(n, dtype=bool)
+
+    @property
+    def stop_prices(self) -> np.ndarray:
+        return np.where(self.side >= 0, self.best * (1.0 - self.stop_pct), self.best * (1.0 + self.stop_pct))
+
+    def update_prices(self, prices: np.ndarray, weights: np.ndarray) -> None:
+        side = np.sign(weights)
+        entered = side != self.side
+        self.side = side
+        self.best[entered] = np.nan
+        self.stopped &= ~entered
+        # fmax/fmin skip NaN on either side: a missing price keeps the best, a fresh entry adopts the price.
+        best = np.where(side > 0, np.fmax(self.best, prices), np.fmin(self.best, prices))
+        self.best = np.where(side != 0, best, np.nan)
+        with np.errstate(invalid="ignore"):
+            crossed = np.where(side > 0, prices <= self.stop_prices, prices >= self.stop_prices)
+        self.stopped |= crossed & (side != 0)
+
+    def evaluate_array(self, weights: np.ndarray, context: Dict[str, float]) -> np.ndarray:
+        prices = np.array([context.get(symbol, np.nan) for symbol in self.symbols], dtype=np.float64)
+        prices[~(prices > 0)] = np.nan
+        self.update_prices(prices, weights)
+        return np.where(self.stopped, 0.0, weights)
+
+
+class RiskGuardChain(ArrayRiskGuard):
+    """Runs array guards in order on one weight vector and records the final exposure."""
+
+    def __init__(self, guards: Sequence[ArrayRiskGuard], state: RiskState | None = None) -> None:
+        if not guards:
+            raise ValueError("RiskGuardChain needs at least one guard.")
+        super().__init__(guards[0].symbols, state if state is not None else guards[0].state)
+        for guard in guards:
+            if guard.symbols != self.symbols:
+                raise ValueError("All chained guards must share the same symbol layout.")
+            guard.state = self.state
+        self.guards = tuple(guards)
+
+    def evaluate_array(self, weights: np.ndarray, context: Dict[str, float]) -> np.ndarray:
+        for guard in self.guards:
+            weights = guard.evaluate_array(weights, context)
+        self.state.gross = float(np.abs(weights).sum())
+        self.state.net = float(weights.sum())
+        return weights
 
     def evaluate(self, targets: Dict[str, float], context: Dict[str, float]) -> Dict[str, float]:
-        # TODO: incorporate price history and realized P&L.
-        return super().evaluate(targets, context)
+        safe = super().evaluate(targets, context)
+        self.state.exposure = {symbol: weight for symbol, weight in safe.items() if weight}
+        return safe
@@ -8,7 +8,9 @@ Drop deterministic rules, ML inference wrappers, and ensemble utilities here.
 Expose a registry or factory functions so Lean algorithms can import signals by name.
 """
 
-from typing import Protocol, Any
+from typing import Protocol, Any, Callable, Sequence
+
+import numpy as np
 
 
 class SignalModel(Protocol):
@@ -20,4 +22,91 @@ class SignalModel(Protocol):
         Replace with richer contracts as research matures.
         """
 
+    def score_batch(self, features: np.ndarray, feature_names: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score a `(symbols, features)` matrix in one call and return `(edge, confidence)` arrays.
+
+        Columns of `features` follow `feature_names`. The default falls back to one `score` call per
+        row; vectorized models should override it.
+        """
+
+        return _score_rows(self, features, feature_names)
+
     # TODO: add state reset hooks, serialization helpers, etc.
+
+
+def _score_rows(model: Any, features: np.ndarray, feature_names: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    names = list(feature_names)
+    rows = np.atleast_2d(features)
+    edge = np.empty(rows.shape[0])
+    confidence = np.empty(rows.shape[0])
+    for i, row in enumerate(rows.tolist()):
+        edge[i], confidence[i] = model.score(dict(zip(names, row)))
+    return edge, confidence
+
+
+class ScalarBatchAdapter:
+    """Gives any object with a scalar `score(features)` the batch contract."""
+
+    def __init__(self, model: Any) -> None:
+        self.model = model
+
+    def score(self, features: dict[str, Any]) -> tuple[float, float]:
+        return self.model.score(features)
+
+    def score_batch(self, features: np.ndarray, feature_names: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        batch = getattr(self.model, "score_batch", None)
+        if batch is not None:
+            return batch(features, feature_names)
+        return _score_rows(self.model, features, feature_names)
+
+
+_REGISTRY: dict[str, Callable[..., SignalModel]] = {}
+
+
+def register_signal(name: str, factory: Callable[..., SignalModel] | None = None):
+    """
+    Register a signal factory under `name`. Works as a call or as a class decorator:
+
+        @register_signal("momentum")
+        class MomentumSignal: ...
+
+    Registering the same factory again is a no-op; a different factory under a taken name raises
+    `ValueError` instead of silently replacing the signal Lean algorithms create by name.
+    """
+
+    def _register(target: Callable[..., SignalModel]) -> Callable[..., SignalModel]:
+        existing = _REGISTRY.get(name)
+        if existing is not None and existing is not target:
+            owner = getattr(existing, "__qualname__", repr(existing))
+            raise ValueError(f"Signal '{name}' is already registered to {owner}")
+        _REGISTRY[name] = target
+        return target
+
+    if factory is not None:
+        return _register(factory)
+    return _register
+
+
+def create_signal(name: str, **params: Any) -> SignalModel:
+    """Instantiate a registered signal; models without `score_batch` are wrapped in `ScalarBatchAdapter`."""
+
+    if name not in _REGISTRY:
+        raise KeyError(f"Unknown signal '{name}'. Registered: {', '.join(sorted(_REGISTRY)) or 'none'}")
+    model = _REGISTRY[name](**params)
+    if not hasattr(model, "score_batch"):
+        model = ScalarBatchAdapter(model)
+    return model
+
+
+def available_signals() -> list[str]:
+    return sorted(_REGISTRY)
+
+
+__all__ = [
+    "SignalModel",
+    "ScalarBatchAdapter",
+    "register_signal",
+    "create_signal",
+    "available_signals",
+]
@@ -0,0 +1,73 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Throughput check for the batch scoring contract.
+
+`benchmark_score_batch` times a model's `score_batch` against the per-symbol scalar path on the same
+synthetic `(symbols, features)` matrices, e.g. 500 symbols per bar:
+
+    python -m research.scripts.signals.benchmark
+"""
+
+import time
+from typing import Any, Sequence
+
+import numpy as np
+
+from research.scripts.signals import ScalarBatchAdapter, _score_rows
+
+
+class LinearDemoSignal:
+    """Toy linear score used to exercise both code paths; not a trading signal."""
+
+    def __init__(self, n_features: int, seed: int = 0) -> None:
+        self.weights = np.random.default_rng(seed).normal(size=n_features)
+
+    def score(self, features: dict[str, Any]) -> tuple[float, float]:
+        raw = sum(w * x for w, x in zip(self.weights, features.values()))
+        return float(np.tanh(raw)), float(min(abs(raw), 1.0))
+
+    def score_batch(self, features: np.ndarray, feature_names: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        raw = features @ self.weights
+        return np.tanh(raw), np.minimum(np.abs(raw), 1.0)
+
+
+def benchmark_score_batch(
+    model: Any,
+    n_symbols: int = 500,
+    n_features: int = 16,
+    n_bars: int = 200,
+    seed: int = 0,
+) -> dict[str, float]:
+    """Return per-bar latency (microseconds) and symbols/second for the batch and scalar paths."""
+
+    rng = np.random.default_rng(seed)
+    bars = rng.normal(size=(n_bars, n_symbols, n_features))
+    names = [f"f{i}" for i in range(n_features)]
+    batch_model = ScalarBatchAdapter(model)
+
+    start = time.perf_counter()
+    for matrix in bars:
+        batch_model.score_batch(matrix, names)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for matrix in bars:
+        _score_rows(model, matrix, names)
+    scalar_seconds = time.perf_counter() - start
+
+    scored = n_bars * n_symbols
+    return {
+        "n_symbols": float(n_symbols),
+        "batch_us_per_bar": batch_seconds / n_bars * 1e6,
+        "scalar_us_per_bar": scalar_seconds / n_bars * 1e6,
+        "batch_symbols_per_sec": scored / batch_seconds,
+        "scalar_symbols_per_sec": scored / scalar_seconds,
+        "speedup": scalar_seconds / batch_seconds,
+    }
+
+
+if __name__ == "__main__":
+    for key, value in benchmark_score_batch(LinearDemoSignal(16)).items():
+        print(f"{key:>24}: {value:,.1f}")
@@ -0,0 +1,406 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Pure-NumPy inference for models trained in research and exported as `.npz` weight files.
+
+Supported exports: linear/logistic models, decision-tree ensembles (flattened node arrays) and small
+MLPs. Nothing here imports sklearn/torch; `export_sklearn` only duck-types fitted estimators on the
+research side. Loaded models are cached by the SHA-256 of the weight file, which doubles as the
+version ID logged with every prediction.
+"""
+
+import hashlib
+import io
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+from research.scripts.signals import register_signal
+
+_MODEL_CACHE: dict[str, "ExportedModel"] = {}
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+# sklearn estimator families `export_sklearn` flattens into a `TreeEnsembleModel` (plain averages of
+# trees); boosting is excluded because its stages are scaled by `learning_rate` on top of `init_`.
+_TREE_FAMILIES = ("DecisionTree", "ExtraTree", "RandomForest")
+
+_ACTIVATIONS = {
+    "identity": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "tanh": np.tanh,
+    "logistic": _sigmoid,
+}
+
+
+class ExportedModel:
+    """
+    Common pre-processing (column standardization) and output link for exported models.
+
+    `link` is `"identity"` (raw output), `"logistic"` (raw output is a log-odds, `predict` applies the
+    sigmoid) or `"probability"` (raw output already is a class-1 probability, e.g. averaged tree
+    leaves). Both probability links are mapped to a symmetric edge by `InferenceSignal`.
+    """
+
+    kind = "base"
+
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        link: str = "identity",
+        mean: np.ndarray | None = None,
+        scale: np.ndarray | None = None,
+        version: str = "",
+    ) -> None:
+        if link not in {"identity", "logistic", "probability"}:
+            raise ValueError(f"Unsupported output link: {link}")
+        self.feature_names = tuple(feature_names)
+        self.link = link
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float64)
+        self.scale = None if scale is None else np.asarray(scale, dtype=np.float64)
+        self.version = version
+
+    def _prepare(self, features: np.ndarray) -> np.ndarray:
+        x = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        if self.mean is not None:
+            x = x - self.mean
+        if self.scale is not None:
+            x = x / self.scale
+        return x
+
+    def _raw(self, x: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Return one output per row (class-1 probability for the `logistic` / `probability` links)."""
+
+        raw = self._raw(self._prepare(features))
+        return _sigmoid(raw) if self.link == "logistic" else raw
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    def save(self, path: Path) -> Path:
+        payload = {
+            "kind": np.array(self.kind),
+            "link": np.array(self.link),
+            "feature_names": np.array(self.feature_names, dtype=str),
+            **self.arrays(),
+        }
+        if self.mean is not None:
+            payload["mean"] = self.mean
+        if self.scale is not None:
+            payload["scale"] = self.scale
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as handle:
+            np.savez(handle, **payload)
+        return path
+
+
+class LinearModel(ExportedModel):
+    kind = "linear"
+
+    def __init__(self, weights: np.ndarray, bias: float = 0.0, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.weights = np.asarray(weights, dtype=np.float64).ravel()
+        self.bias = float(bias)
+
+    def _raw(self, x: np.ndarray) -> np.ndarray:
+        return x @ self.weights + self.bias
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {"weights": self.weights, "bias": np.array(self.bias)}
+
+
+class TreeEnsembleModel(ExportedModel):
+    """
+    Sum/average of binary trees stored as flat node arrays (`left`/`right` are -1 at leaves).
+
+    Inference walks every (row, tree) pair one level per iteration, so the cost is
+    `max_depth` vectorized gathers over a `(rows, trees)` node matrix.
+    """
+
+    kind = "trees"
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        max_depth: int,
+        base_score: float = 0.0,
+        tree_weight: float = 1.0,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.max_depth = int(max_depth)
+        self.base_score = float(base_score)
+        self.tree_weight = float(tree_weight)
+        # Leaves point at themselves so finished walks are stable under further iterations.
+        leaf = self.left < 0
+        nodes = np.arange(self.left.size)
+        self._left = np.where(leaf, nodes, self.left)
+        self._right = np.where(leaf, nodes, self.right)
+        self._feature = np.where(leaf, 0, self.feature)
+
+    def _raw(self, x: np.ndarray) -> np.ndarray:
+        rows = np.arange(x.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (x.shape[0], self.roots.size)).copy()
+        for _ in range(self.max_depth):
+            go_left = x[rows, self._feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self._left[node], self._right[node])
+        return self.base_score + self.tree_weight * self.value[node].sum(axis=1)
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "roots": self.roots,
+            "max_depth": np.array(self.max_depth),
+            "base_score": np.array(self.base_score),
+            "tree_weight": np.array(self.tree_weight),
+        }
+
+
+class MLPModel(ExportedModel):
+    kind = "mlp"
+
+    def __init__(
+        self,
+        weights: Sequence[np.ndarray],
+        biases: Sequence[np.ndarray],
+        activation: str = "relu",
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        if activation not in _ACTIVATIONS:
+            raise ValueError(f"Unsupported activation: {activation}")
+        self.weights = [np.ascontiguousarray(w, dtype=np.float64) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float64) for b in biases]
+        self.activation = activation
+
+    def _raw(self, x: np.ndarray) -> np.ndarray:
+        act = _ACTIVATIONS[self.activation]
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            x = act(x @ w + b)
+        return (x @ self.weights[-1] + self.biases[-1]).reshape(x.shape[0], -1)[:, 0]
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        out: dict[str, np.ndarray] = {"activation": np.array(self.activation), "n_layers": np.array(len(self.weights))}
+        for i, (w, b) in enumerate(zip(self.weights, self.biases)):
+            out[f"w{i}"] = w
+            out[f"b{i}"] = b
+        return out
+
+
+def _scalar(data: Any, key: str, default: Any = None) -> Any:
+    return data[key].item() if key in data else default
+
+
+def load_model(path: Path) -> ExportedModel:
+    """Load an exported `.npz` model, reusing the cached instance when the file content is unchanged."""
+
+    raw = Path(path).read_bytes()
+    version = hashlib.sha256(raw).hexdigest()[:16]
+    cached = _MODEL_CACHE.get(version)
+    if cached is not None:
+        return cached
+
+    with np.load(io.BytesIO(raw), allow_pickle=False) as data:
+        common = {
+            "feature_names": [str(name) for name in data["feature_names"]],
+            "link": str(_scalar(data, "link", "identity")),
+            "mean": data["mean"] if "mean" in data else None,
+            "scale": data["scale"] if "scale" in data else None,
+            "version": version,
+        }
+        kind = str(_scalar(data, "kind"))
+        if kind == LinearModel.kind:
+            model: ExportedModel = LinearModel(data["weights"], float(_scalar(data, "bias", 0.0)), **common)
+        elif kind == TreeEnsembleModel.kind:
+            model = TreeEnsembleModel(
+                data["feature"],
+                data["threshold"],
+                data["left"],
+                data["right"],
+                data["value"],
+                data["roots"],
+                int(_scalar(data, "max_depth")),
+                base_score=float(_scalar(data, "base_score", 0.0)),
+                tree_weight=float(_scalar(data, "tree_weight", 1.0)),
+                **common,
+            )
+        elif kind == MLPModel.kind:
+            n_layers = int(_scalar(data, "n_layers"))
+            model = MLPModel(
+                [data[f"w{i}"] for i in range(n_layers)],
+                [data[f"b{i}"] for i in range(n_layers)],
+                activation=str(_scalar(data, "activation", "relu")),
+                **common,
+            )
+        else:
+            raise ValueError(f"Unknown exported model kind '{kind}' in {path}")
+
+    _MODEL_CACHE[version] = model
+    return model
+
+
+def export_sklearn(estimator: Any, feature_names: Sequence[str], path: Path, **kwargs: Any) -> Path:
+    """
+    Research-side helper: flatten a fitted sklearn linear model, decision tree / random forest or MLP
+    into the `.npz` format above. Binary classifiers are exported with a logistic link; trees and
+    forests export the class-1 probability with the `probability` link. Other tree ensembles
+    (gradient boosting, ...) raise `TypeError`.
+    """
+
+    is_classifier = hasattr(estimator, "classes_")
+    if is_classifier and len(estimator.classes_) != 2:
+        raise TypeError(f"Only binary classifiers can be exported, got {len(estimator.classes_)} classes")
+    if hasattr(estimator, "coefs_"):
+        model: ExportedModel = MLPModel(
+            estimator.coefs_,
+            estimator.intercepts_,
+            activation=estimator.activation,
+            feature_names=feature_names,
+            link="logistic" if is_classifier else "identity",
+            **kwargs,
+        )
+    elif hasattr(estimator, "coef_"):
+        model = LinearModel(
+            np.ravel(estimator.coef_),
+            float(np.ravel(estimator.intercept_)[0]),
+            feature_names=feature_names,
+            link="logistic" if is_classifier else "identity",
+            **kwargs,
+        )
+    elif type(estimator).__name__.startswith(_TREE_FAMILIES):
+        trees = [estimator] if hasattr(estimator, "tree_") else list(estimator.estimators_)
+        parts: dict[str, list[np.ndarray]] = {k: [] for k in ("feature", "threshold", "left", "right", "value")}
+        roots, offset, depth = [], 0, 0
+        for tree in trees:
+            t = tree.tree_
+            values = t.value[:, 0, :]
+            leaf_value = values[:, 1] / values.sum(axis=1) if is_classifier else values[:, 0]
+            left = np.where(t.children_left >= 0, t.children_left + offset, -1)
+            right = np.where(t.children_right >= 0, t.children_right + offset, -1)
+            for key, array in zip(parts, (t.feature, t.threshold, left, right, leaf_value)):
+                parts[key].append(np.asarray(array))
+            roots.append(offset)
+            offset += t.node_count
+            depth = max(depth, t.max_depth)
+        model = TreeEnsembleModel(
+            *(np.concatenate(parts[k]) for k in parts),
+            roots=np.array(roots),
+            max_depth=depth,
+            tree_weight=1.0 / len(trees),
+            feature_names=feature_names,
+            link="probability" if is_classifier else "identity",
+            **kwargs,
+        )
+    else:
+        raise TypeError(f"Cannot export estimator of type {type(estimator).__name__}")
+    return model.save(path)
+
+
+@register_signal("exported_model")
+class InferenceSignal:
+    """
+    `SignalModel` over an exported model with a per-call latency budget.
+
+    `edge` is the model output (mapped to [-1, 1] for probability outputs) and `confidence` its magnitude
+    squashed into [0, 1]. Latency of every call is tracked so `OnData` can log or fall back when
+    `over_budget` is set.
+    """
+
+    def __init__(self, path: Path | None = None, model: ExportedModel | None = None, budget_us: float = 500.0) -> None:
+        if model is None:
+            if path is None:
+                raise ValueError("InferenceSignal needs an export path or a loaded model.")
+            model = load_model(path)
+        self.model = model
+        self.budget_us = budget_us
+        self.calls = 0
+        self.last_us = 0.0
+        self.max_us = 0.0
+        self.total_us = 0.0
+        self._column_cache: dict[tuple[str, ...], np.ndarray | None] = {}
+
+    @property
+    def version(self) -> str:
+        return self.model.version
+
+    @property
+    def over_budget(self) -> bool:
+        return self.last_us > self.budget_us
+
+    def latency_stats(self) -> dict[str, float]:
+        mean = self.total_us / self.calls if self.calls else 0.0
+        return {"calls": float(self.calls), "last_us": self.last_us, "mean_us": mean, "max_us": self.max_us}
+
+    def _columns(self, feature_names: Sequence[str]) -> np.ndarray | None:
+        key = tuple(feature_names)
+        if key not in self._column_cache:
+            if key == self.model.feature_names:
+                self._column_cache[key] = None
+            else:
+                lookup = {name: i for i, name in enumerate(key)}
+                missing = [name for name in self.model.feature_names if name not in lookup]
+                if missing:
+                    raise KeyError(f"Features missing for model {self.version}: {', '.join(missing)}")
+                self._column_cache[key] = np.array([lookup[name] for name in self.model.feature_names])
+        return self._column_cache[key]
+
+    def _to_signal(self, output: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        probability = self.model.link in ("logistic", "probability")
+        edge = 2.0 * output - 1.0 if probability else output
+        confidence = np.abs(edge) if probability else np.abs(np.tanh(edge))
+        return edge, confidence
+
+    def score_batch(self, features: np.ndarray, feature_names: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        start = time.perf_counter()
+        columns = self._columns(feature_names)
+        matrix = np.atleast_2d(features)
+        if columns is not None:
+            matrix = matrix[:, columns]
+        edge, confidence = self._to_signal(self.model.predict(matrix))
+        elapsed = (time.perf_counter() - start) * 1e6
+        self.calls += 1
+        self.last_us = elapsed
+        self.total_us += elapsed
+        self.max_us = max(self.max_us, elapsed)
+        return edge, confidence
+
+    def score(self, features: dict[str, Any]) -> tuple[float, float]:
+        row = np.array([[features[name] for name in self.model.feature_names]], dtype=np.float64)
+        edge, confidence = self.score_batch(row, self.model.feature_names)
+        return float(edge[0]), float(confidence[0])
+
+
+__all__ = [
+    "ExportedModel",
+    "LinearModel",
+    "TreeEnsembleModel",
+    "MLPModel",
+    "InferenceSignal",
+    "load_model",
+    "export_sklearn",
+]
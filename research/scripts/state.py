@@ -0,0 +1,196 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Versioned, checksummed snapshots of live strategy state for warm restarts.
+
+A snapshot is a fixed header followed by a zlib-compressed pickle of `{component name: state}`:
+
+    magic (6 bytes) | format version (uint16) | crc32 of payload (uint32) | payload length (uint64)
+
+Components expose `get_state() -> dict` and `set_state(state)`; array-backed components use
+`capture_fields` / `restore_fields`, which copy NumPy buffers and refuse to load arrays whose shape
+does not match the freshly constructed object (e.g. a different symbol list or window). In Lean the
+bytes go to the `ObjectStore`, so a redeploy restores trailing stops, counters and feature windows in
+`Initialize` instead of replaying a warmup period.
+"""
+
+import pickle
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Mapping, Protocol, Sequence
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b"WLSNAP"
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct("<6sHIQ")
+
+
+class SnapshotError(ValueError):
+    """Raised when snapshot bytes are corrupt, truncated or from an incompatible version."""
+
+
+class Stateful(Protocol):
+    def get_state(self) -> dict[str, Any]: ...
+
+    def set_state(self, state: Mapping[str, Any]) -> None: ...
+
+
+def encode_snapshot(states: Mapping[str, Any], level: int = 6) -> bytes:
+    payload = zlib.compress(pickle.dumps(dict(states), protocol=pickle.HIGHEST_PROTOCOL), level)
+    return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, zlib.crc32(payload), len(payload)) + payload
+
+
+def decode_snapshot(data: bytes) -> dict[str, Any]:
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise SnapshotError("snapshot is shorter than its header")
+    magic, version, crc, length = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("not a strategy snapshot (bad magic)")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"unsupported snapshot version {version} (expected {SNAPSHOT_VERSION})")
+    payload = data[_HEADER.size : _HEADER.size + length]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise SnapshotError("snapshot checksum mismatch")
+    return pickle.loads(zlib.decompress(payload))
+
+
+def capture_fields(obj: Any, fields: Sequence[str]) -> dict[str, Any]:
+    """Copy the named attributes (arrays are copied so later updates do not mutate the snapshot)."""
+
+    state = {}
+    for name in fields:
+        value = getattr(obj, name)
+        state[name] = value.copy() if isinstance(value, np.ndarray) else value
+    return state
+
+
+def restore_fields(obj: Any, state: Mapping[str, Any], fields: Sequence[str]) -> None:
+    """Load attributes captured by `capture_fields`; array shapes must match the current object."""
+
+    for name in fields:
+        current = getattr(obj, name)
+        value = state[name]
+        if isinstance(current, np.ndarray) and np.shape(value) != current.shape:
+            raise SnapshotError(f"{type(obj).__name__}.{name}: shape {np.shape(value)} != {current.shape}")
+    for name in fields:
+        value = state[name]
+        setattr(obj, name, value.copy() if isinstance(value, np.ndarray) else value)
+
+
+class StateSnapshotter:
+    """
+    Captures and restores a named set of `Stateful` components as one snapshot.
+
+    `required` components are restored first; if one of them is missing or rejects its state the
+    whole restore is abandoned (nothing else is touched) and `SnapshotError` is raised.
+
+    `depends` maps a component to the components its state is only valid against (e.g. bar windows
+    against the feature registry that sized them). A component is restored only after all of its
+    dependencies restored; otherwise it is left cold even if its own state would load.
+    """
+
+    def __init__(
+        self,
+        components: Mapping[str, Stateful],
+        required: Sequence[str] = (),
+        depends: Mapping[str, Sequence[str]] | None = None,
+    ) -> None:
+        self.components = dict(components)
+        self.required = tuple(required)
+        self.depends = {name: tuple(deps) for name, deps in (depends or {}).items()}
+        order = list(self.required) + [name for name in self.components if name not in self.required]
+        for name, deps in self.depends.items():
+            for dep in deps:
+                if dep not in self.components or name not in self.components:
+                    raise ValueError(f"dependency '{name}' -> '{dep}' names an unknown component")
+                if order.index(dep) >= order.index(name):
+                    raise ValueError(f"'{dep}' must be restored before '{name}' that depends on it")
+
+    def capture(self) -> bytes:
+        return encode_snapshot({name: component.get_state() for name, component in self.components.items()})
+
+    def restore(self, data: bytes) -> tuple[list[str], dict[str, str]]:
+        """
+        Restore every component present in the snapshot. Returns `(restored, skipped)` where
+        `skipped` maps a component name to the reason it was left cold (missing, incompatible or
+        a dependency that was left cold).
+        """
+
+        states = decode_snapshot(data)
+        restored: list[str] = []
+        skipped: dict[str, str] = {}
+        for name in self.required:
+            if name not in states:
+                raise SnapshotError(f"required component '{name}' is not in the snapshot")
+            try:
+                self.components[name].set_state(states[name])
+            except (KeyError, ValueError) as exc:
+                raise SnapshotError(f"required component '{name}' rejected the snapshot: {exc}") from exc
+            restored.append(name)
+        for name, component in self.components.items():
+            if name in self.required:
+                continue
+            if name not in states:
+                skipped[name] = "not in snapshot"
+                continue
+            cold = [dep for dep in self.depends.get(name, ()) if dep not in restored]
+            if cold:
+                skipped[name] = f"depends on {', '.join(cold)}, which was not restored"
+                continue
+            try:
+                component.set_state(states[name])
+            except (KeyError, ValueError) as exc:
+                skipped[name] = str(exc)
+                continue
+            restored.append(name)
+        return restored, skipped
+
+
+class FileSnapshotStore:
+    """Snapshot persistence on the local filesystem (research / local Lean runs)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def save(self, data: bytes) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(self.path)
+
+    def load(self) -> bytes | None:
+        return self.path.read_bytes() if self.path.exists() else None
+
+
+class ObjectStoreSnapshotStore:
+    """Snapshot persistence in the Lean `ObjectStore` (survives live redeploys)."""
+
+    def __init__(self, object_store: Any, key: str) -> None:
+        self.object_store = object_store
+        self.key = key
+
+    def save(self, data: bytes) -> None:
+        self.object_store.SaveBytes(self.key, bytearray(data))
+
+    def load(self) -> bytes | None:
+        if not self.object_store.ContainsKey(self.key):
+            return None
+        return bytes(self.object_store.ReadBytes(self.key))
+
+
+__all__ = [
+    "SNAPSHOT_VERSION",
+    "SnapshotError",
+    "Stateful",
+    "encode_snapshot",
+    "decode_snapshot",
+    "capture_fields",
+    "restore_fields",
+    "StateSnapshotter",
+    "FileSnapshotStore",
+    "ObjectStoreSnapshotStore",
+]
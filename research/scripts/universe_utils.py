@@ -1,65 +1,249 @@
 from __future__ import annotations
 
-from typing import List
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Sequence
 
+import numpy as np
+import pandas as pd
 import requests
 
+from .data_fetchers.utils import RateLimiter, ensure_directory
+
 
 COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+COINGECKO_PAGE_SIZE = 250
+SNAPSHOT_TIME_FORMAT = "%Y%m%dT%H%M%SZ"
+SNAPSHOT_COLUMNS = ("pair", "symbol", "market_cap", "total_volume")
+# One budget for every CoinGecko caller in the process (public tier), cached or not.
+COINGECKO_LIMITER = RateLimiter(calls=30, period=60)
+
+
+def _to_utc(when: datetime | pd.Timestamp) -> pd.Timestamp:
+    ts = pd.Timestamp(when)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _fetch_page(page: int, per_page: int, vs_currency: str, limiter: RateLimiter | None = None) -> list[dict]:
+    if limiter:
+        limiter.wait()
+    params = {
+        "vs_currency": vs_currency,
+        "order": "market_cap_desc",
+        "per_page": per_page,
+        "page": page,
+        "price_change_percentage": "24h",
+    }
+    response = requests.get(COINGECKO_MARKETS_URL, params=params, timeout=30)
+    response.raise_for_status()
+    return response.json() or []
+
+
+def _fetch_markets(
+    limit: int,
+    vs_currency: str = "usd",
+    max_workers: int = 4,
+    limiter: RateLimiter | None = None,
+) -> pd.DataFrame:
+    """Fetch all pages needed for `limit` assets concurrently and return a ranked, deduplicated table."""
+
+    limit = max(limit, 0)
+    if limit == 0:
+        return pd.DataFrame(columns=list(SNAPSHOT_COLUMNS))
+
+    per_page = min(COINGECKO_PAGE_SIZE, limit)
+    pages = range(1, -(-limit // per_page) + 1)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pages)))) as pool:
+        # `map` keeps page order, so concatenating preserves the market-cap ranking.
+        payloads = list(pool.map(lambda page: _fetch_page(page, per_page, vs_currency, limiter), pages))
+
+    entries = [entry for payload in payloads for entry in payload if entry.get("symbol")]
+    symbols = [entry["symbol"].upper() for entry in entries]
+    table = pd.DataFrame(
+        {
+            "pair": [f"{symbol}USD" for symbol in symbols],
+            "symbol": symbols,
+            "market_cap": np.array([entry.get("market_cap") or np.nan for entry in entries], dtype=np.float64),
+            "total_volume": np.array([entry.get("total_volume") or np.nan for entry in entries], dtype=np.float64),
+        }
+    )
+    # Preserve ordering, remove duplicates (several tokens share tickers on CoinGecko).
+    table = table.drop_duplicates(subset="pair", keep="first").head(limit).reset_index(drop=True)
+    table.index = pd.RangeIndex(1, len(table) + 1, name="rank")
+    return table
+
+
+@dataclass(frozen=True)
+class UniverseSnapshot:
+    """
+    Ranked universe table captured at `as_of` (UTC).
+
+    `limit` is the number of assets that were requested; the table can be shorter once duplicate
+    tickers are dropped, so cache hits compare against `limit`, not `len(table)`.
+    """
+
+    as_of: pd.Timestamp
+    vs_currency: str
+    table: pd.DataFrame
+    limit: int
+
+    def pairs(self, limit: int | None = None) -> list[str]:
+        pairs = self.table["pair"].tolist()
+        return pairs if limit is None else pairs[:limit]
+
+
+class UniverseService:
+    """
+    Cached top-market-cap universe backed by timestamped snapshots on disk.
+
+    Snapshots are written as `universe_<vs>_<YYYYmmddTHHMMSSZ>.parquet` under `cache_dir`. Live callers
+    get the latest snapshot while it is younger than `ttl`; backtests call `members_asof` /
+    `membership` to reconstruct point-in-time membership from the cache without network access.
+    """
 
+    def __init__(
+        self,
+        cache_dir: Path,
+        vs_currency: str = "usd",
+        ttl: timedelta = timedelta(hours=6),
+        max_workers: int = 4,
+        limiter: RateLimiter | None = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.vs_currency = vs_currency.lower()
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.limiter = limiter or COINGECKO_LIMITER
+        self._loaded: dict[Path, UniverseSnapshot] = {}
 
-def fetch_top_marketcap_pairs(limit: int = 50, vs_currency: str = "usd") -> List[str]:
+    def _snapshot_path(self, as_of: pd.Timestamp) -> Path:
+        return self.cache_dir / f"universe_{self.vs_currency}_{as_of.strftime(SNAPSHOT_TIME_FORMAT)}.parquet"
+
+    def list_snapshots(self) -> list[tuple[pd.Timestamp, Path]]:
+        """Return `(as_of, path)` pairs for cached snapshots, oldest first."""
+
+        if not self.cache_dir.exists():
+            return []
+        prefix = f"universe_{self.vs_currency}_"
+        entries = []
+        for path in self.cache_dir.glob(f"{prefix}*.parquet"):
+            try:
+                as_of = pd.Timestamp(datetime.strptime(path.stem[len(prefix):], SNAPSHOT_TIME_FORMAT), tz="UTC")
+            except ValueError:
+                continue
+            entries.append((as_of, path))
+        return sorted(entries)
+
+    def _load(self, as_of: pd.Timestamp, path: Path) -> UniverseSnapshot:
+        snapshot = self._loaded.get(path)
+        if snapshot is None:
+            table = pd.read_parquet(path)
+            # Snapshots written before `limit` was stored: the table length is all that is known.
+            limit = int(table.attrs.get("limit", len(table)))
+            snapshot = UniverseSnapshot(as_of=as_of, vs_currency=self.vs_currency, table=table, limit=limit)
+            self._loaded[path] = snapshot
+        return snapshot
+
+    def refresh(self, limit: int = COINGECKO_PAGE_SIZE) -> UniverseSnapshot:
+        """
+        Download a new snapshot and persist it, regardless of cache age.
+
+        The new snapshot covers at least as many assets as the latest cached one, so a small
+        `limit` never shrinks the universe seen by later `members_asof` / `membership` calls.
+        """
+
+        snapshots = self.list_snapshots()
+        if snapshots:
+            limit = max(limit, self._load(*snapshots[-1]).limit)
+        table = _fetch_markets(limit, self.vs_currency, max_workers=self.max_workers, limiter=self.limiter)
+        table.attrs["limit"] = limit
+        as_of = pd.Timestamp.now(tz="UTC").floor("s")
+        path = self._snapshot_path(as_of)
+        ensure_directory(path.parent)
+        table.to_parquet(path)
+        snapshot = UniverseSnapshot(as_of=as_of, vs_currency=self.vs_currency, table=table, limit=limit)
+        self._loaded[path] = snapshot
+        return snapshot
+
+    def snapshot(self, limit: int = COINGECKO_PAGE_SIZE, refresh: bool = False) -> UniverseSnapshot:
+        """Return the latest snapshot covering `limit` assets, downloading only when the cache is stale."""
+
+        snapshots = self.list_snapshots()
+        if snapshots and not refresh:
+            as_of, path = snapshots[-1]
+            cached = self._load(as_of, path)
+            if pd.Timestamp.now(tz="UTC") - as_of < self.ttl and cached.limit >= limit:
+                return cached
+        return self.refresh(limit)
+
+    def pairs(self, limit: int = 50, refresh: bool = False) -> list[str]:
+        return self.snapshot(limit, refresh=refresh).pairs(limit)
+
+    def snapshot_asof(self, when: datetime | pd.Timestamp) -> UniverseSnapshot | None:
+        """Latest cached snapshot taken at or before `when` (never triggers a download)."""
+
+        snapshots = self.list_snapshots()
+        times = [as_of for as_of, _ in snapshots]
+        idx = bisect.bisect_right(times, _to_utc(when)) - 1
+        if idx < 0:
+            return None
+        return self._load(*snapshots[idx])
+
+    def members_asof(self, when: datetime | pd.Timestamp, limit: int = 50) -> list[str]:
+        snapshot = self.snapshot_asof(when)
+        return [] if snapshot is None else snapshot.pairs(limit)
+
+    def membership(self, timestamps: Sequence[datetime] | pd.DatetimeIndex, limit: int = 50) -> pd.DataFrame:
+        """
+        Boolean `timestamps x pairs` frame: True when the pair was in the top `limit` of the
+        latest snapshot available at that timestamp. Rows before the first snapshot are all False.
+        """
+
+        index = pd.DatetimeIndex(timestamps)
+        index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+        snapshots = self.list_snapshots()
+        if not snapshots:
+            return pd.DataFrame(index=index, dtype=bool)
+
+        members = [self._load(as_of, path).pairs(limit) for as_of, path in snapshots]
+        columns = pd.Index(list(dict.fromkeys(pair for pairs in members for pair in pairs)))
+        # One row per snapshot plus a leading all-False row for "no snapshot yet".
+        grid = np.zeros((len(members) + 1, len(columns)), dtype=bool)
+        for row, pairs in enumerate(members, start=1):
+            grid[row, columns.get_indexer(pairs)] = True
+
+        snapshot_times = pd.DatetimeIndex([as_of for as_of, _ in snapshots])
+        rows = snapshot_times.searchsorted(index, side="right")
+        return pd.DataFrame(grid[rows], index=index, columns=columns)
+
+
+def fetch_top_marketcap_pairs(
+    limit: int = 50,
+    vs_currency: str = "usd",
+    cache_dir: Path | None = None,
+    ttl: timedelta = timedelta(hours=6),
+) -> List[str]:
     """
     Retrieve the top crypto symbols by market cap from CoinGecko and convert them to QC USD pairs.
 
     Parameters
     ----------
     limit : int
-        Number of assets to request (max 250 per API call).
+        Number of assets to request (pages of 250 are fetched concurrently).
     vs_currency : str
         Fiat currency for market cap ranking (default 'usd').
+    cache_dir : Path or None
+        When provided, serve from a `UniverseService` snapshot cache instead of hitting the API.
+    ttl : timedelta
+        Maximum snapshot age before the cache is refreshed (only used with `cache_dir`).
     """
 
-    per_page = 250
-    remaining = max(limit, 0)
-    page = 1
-    tickers: list[str] = []
-
-    while remaining > 0:
-        page_size = min(per_page, remaining)
-        params = {
-            "vs_currency": vs_currency,
-            "order": "market_cap_desc",
-            "per_page": page_size,
-            "page": page,
-            "price_change_percentage": "24h",
-        }
-        response = requests.get(COINGECKO_MARKETS_URL, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        if not data:
-            break
-
-        for entry in data:
-            symbol = entry.get("symbol", "")
-            if not symbol:
-                continue
-            pair = f"{symbol.upper()}USD"
-            tickers.append(pair)
-
-        if len(data) < page_size:
-            break
-        remaining -= len(data)
-        page += 1
-
-    # Preserve ordering, remove duplicates
-    seen = set()
-    unique_pairs: list[str] = []
-    for pair in tickers:
-        if pair not in seen:
-            seen.add(pair)
-            unique_pairs.append(pair)
-    return unique_pairs[:limit]
+    if cache_dir is not None:
+        return UniverseService(cache_dir, vs_currency=vs_currency, ttl=ttl).pairs(limit)
+    return _fetch_markets(limit, vs_currency, limiter=COINGECKO_LIMITER)["pair"].tolist()
 
 
-__all__ = ["fetch_top_marketcap_pairs"]
+__all__ = ["UniverseSnapshot", "UniverseService", "fetch_top_marketcap_pairs"]
@@ -0,0 +1,336 @@
+# region imports
+from AlgorithmImports import *
+# endregion
+"""
+Walk-forward evaluation over cached feature matrices.
+
+Features are computed once for the whole history (`build_cache`, via the `FeatureRegistry` batch
+implementations or a precomputed frame) into one contiguous `(bars, features)` array together with
+the forward-return target. `make_folds` defines rolling or expanding train/test windows as `slice`s,
+so every fold reads NumPy *views* of the cache instead of recomputing or copying features.
+
+`run_walk_forward` fits one model per fold (any `trainer(X, y, names) -> SignalModel`), scores the
+test window with `score_batch` and backtests the resulting positions bar by bar with fees. Folds run
+in a process pool whose workers receive the cache once (pool initializer); tasks only carry the
+fold slices. The result has one row of out-of-sample stats per fold plus the stitched OOS edge.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.feature_store import FeatureRegistry
+from research.scripts.labels import forward_return
+from research.scripts.monte_carlo import DEFAULT_FEE_RATE
+from research.scripts.signals import SignalModel
+from research.scripts.signals.ml import InferenceSignal, LinearModel
+
+MINUTES_PER_YEAR = 525_600
+
+Trainer = Callable[[np.ndarray, np.ndarray, Sequence[str]], SignalModel]
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Row ranges of one split; `train` ends `purge` bars before `test` starts."""
+
+    number: int
+    train: slice
+    test: slice
+
+
+def make_folds(
+    n_bars: int,
+    train_bars: int,
+    test_bars: int,
+    step: int | None = None,
+    expanding: bool = False,
+    purge: int = 0,
+    start: int = 0,
+) -> list[Fold]:
+    """
+    Consecutive walk-forward folds over `n_bars` rows.
+
+    Test windows of `test_bars` advance by `step` (default `test_bars`, i.e. non-overlapping). The
+    training window is the `train_bars` rows before each test window (`expanding=True` anchors it at
+    `start` instead) minus the last `purge` rows, whose forward-looking targets overlap the test window.
+    `purge` must be at least the target horizon for `run_walk_forward`; `FeatureCache.folds` sets it.
+    """
+
+    step = step or test_bars
+    folds = []
+    test_start = start + train_bars
+    while test_start + test_bars <= n_bars:
+        train_start = start if expanding else test_start - train_bars
+        train_end = test_start - purge
+        if train_end > train_start:
+            folds.append(Fold(len(folds), slice(train_start, train_end), slice(test_start, test_start + test_bars)))
+        test_start += step
+    return folds
+
+
+@dataclass(frozen=True)
+class FeatureCache:
+    """
+    Whole-history inputs shared by every fold.
+
+    `features[t]` is known at the close of bar `t`; `target[t]` is the forward return over `horizon`
+    bars and `returns[t]` the next bar's return (what a position held from `t` earns).
+    """
+
+    index: pd.DatetimeIndex
+    names: tuple[str, ...]
+    features: np.ndarray
+    target: np.ndarray
+    returns: np.ndarray
+    horizon: int
+
+    def __len__(self) -> int:
+        return int(self.features.shape[0])
+
+    def train(self, fold: Fold) -> tuple[np.ndarray, np.ndarray]:
+        return self.features[fold.train], self.target[fold.train]
+
+    def test(self, fold: Fold) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.features[fold.test], self.target[fold.test], self.returns[fold.test]
+
+    def folds(self, train_bars: int, test_bars: int, step: int | None = None, expanding: bool = False, start: int = 0) -> list[Fold]:
+        """`make_folds` over this cache with `purge=horizon`, so no training target reads test prices."""
+
+        return make_folds(len(self), train_bars, test_bars, step, expanding, purge=self.horizon, start=start)
+
+    def check_purge(self, folds: Sequence[Fold]) -> None:
+        """Raise `ValueError` if a fold's training targets (`horizon` bars ahead) reach into its test window."""
+
+        leaking = [fold.number for fold in folds if fold.test.start - fold.train.stop < self.horizon]
+        if leaking:
+            raise ValueError(
+                f"Folds {leaking} train within {self.horizon} bars of their test window; "
+                f"build them with purge >= horizon (FeatureCache.folds does this)."
+            )
+
+
+def feature_matrix(
+    registry: FeatureRegistry,
+    bars: pd.DataFrame,
+    names: Sequence[str] | None = None,
+    dtype: type = np.float64,
+) -> tuple[np.ndarray, tuple[str, ...]]:
+    """Run each feature's batch implementation once into a preallocated `(bars, features)` matrix."""
+
+    names = tuple(name for name in (names or registry.names()) if registry.batch(name) is not None)
+    matrix = np.empty((len(bars), len(names)), dtype=dtype)
+    for j, name in enumerate(names):
+        matrix[:, j] = pd.Series(registry.batch(name)(bars)).reindex(bars.index).to_numpy(dtype=np.float64)
+    return matrix, names
+
+
+def build_cache(
+    bars: pd.DataFrame,
+    features: FeatureRegistry | pd.DataFrame,
+    horizon: int = 60,
+    names: Sequence[str] | None = None,
+    dtype: type = np.float64,
+) -> FeatureCache:
+    """
+    Compute features, target and next-bar returns for `bars` (OHLCV, end-stamped) exactly once.
+
+    `features` is either a `FeatureRegistry` (batch implementations) or a frame of precomputed
+    features aligned to `bars.index`.
+    """
+
+    if isinstance(features, FeatureRegistry):
+        matrix, names = feature_matrix(features, bars, names, dtype)
+    else:
+        frame = features.reindex(index=bars.index, columns=list(names or features.columns))
+        matrix, names = np.ascontiguousarray(frame.to_numpy(dtype=dtype)), tuple(frame.columns)
+    close = bars["close"].to_numpy(dtype=np.float64)
+    return FeatureCache(pd.DatetimeIndex(bars.index), names, matrix, forward_return(close, horizon), forward_return(close, 1), horizon)
+
+
+def ridge_trainer(alpha: float = 1.0) -> Trainer:
+    """Closed-form ridge regression on standardized features, wrapped as an `InferenceSignal`."""
+
+    return _RidgeTrainer(alpha)
+
+
+class _RidgeTrainer:
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+
+    def __call__(self, features: np.ndarray, target: np.ndarray, names: Sequence[str]) -> SignalModel:
+        x = np.asarray(features, dtype=np.float64)
+        mean = x.mean(axis=0)
+        scale = x.std(axis=0)
+        scale[scale == 0] = 1.0
+        z = (x - mean) / scale
+        y = target - target.mean()
+        weights = np.linalg.solve(z.T @ z + self.alpha * np.eye(z.shape[1]), z.T @ y)
+        model = LinearModel(weights, float(target.mean()), feature_names=names, mean=mean, scale=scale, version="ridge")
+        return InferenceSignal(model=model)
+
+
+def backtest_positions(positions: np.ndarray, returns: np.ndarray, fee_rate: float = DEFAULT_FEE_RATE) -> np.ndarray:
+    """Per-bar net returns of holding `positions[t]` over `returns[t]`, paying `fee_rate` on turnover."""
+
+    held = np.nan_to_num(np.asarray(positions, dtype=np.float64))
+    turnover = np.abs(np.diff(held, prepend=0.0))
+    return held * np.nan_to_num(returns) - fee_rate * turnover
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    ranks = np.empty(values.size)
+    ranks[np.argsort(values, kind="stable")] = np.arange(values.size)
+    return ranks
+
+
+def fold_stats(
+    edge: np.ndarray,
+    target: np.ndarray,
+    net: np.ndarray,
+    positions: np.ndarray,
+    periods_per_year: float = MINUTES_PER_YEAR,
+) -> dict[str, float]:
+    """Out-of-sample IC / rank IC / hit rate of `edge` against `target` and P&L stats of `net`."""
+
+    valid = np.isfinite(edge) & np.isfinite(target)
+    e, y = edge[valid], target[valid]
+    spread = e.std() > 0 and y.std() > 0
+    equity = np.cumprod(1.0 + net)
+    std = net.std()
+    return {
+        "scored": int(valid.sum()),
+        "ic": float(np.corrcoef(e, y)[0, 1]) if spread else np.nan,
+        "rank_ic": float(np.corrcoef(_rank(e), _rank(y))[0, 1]) if spread else np.nan,
+        "hit_rate": float(np.mean(np.sign(e) == np.sign(y))) if e.size else np.nan,
+        "total_return": float(equity[-1] - 1.0) if equity.size else 0.0,
+        "sharpe": float(net.mean() / std * np.sqrt(periods_per_year)) if std > 0 else np.nan,
+        "max_drawdown": float((equity / np.maximum.accumulate(equity) - 1.0).min()) if equity.size else 0.0,
+        "exposure": float(np.mean(positions != 0)) if positions.size else 0.0,
+        "turnover": float(np.abs(np.diff(positions, prepend=0.0)).sum()),
+    }
+
+
+@dataclass(frozen=True)
+class EvalConfig:
+    fee_rate: float = DEFAULT_FEE_RATE
+    threshold: float = 0.0
+    long_only: bool = True
+    periods_per_year: float = MINUTES_PER_YEAR
+
+
+_WORKER_CACHE: FeatureCache | None = None
+
+
+def _init_worker(cache: FeatureCache) -> None:
+    global _WORKER_CACHE
+    _WORKER_CACHE = cache
+
+
+def evaluate_fold(cache: FeatureCache, fold: Fold, trainer: Trainer, config: EvalConfig = EvalConfig()) -> tuple[dict[str, Any], np.ndarray]:
+    """Fit on the fold's training view (rows with any NaN dropped), score the test view and backtest it."""
+
+    x_train, y_train = cache.train(fold)
+    usable = np.isfinite(x_train).all(axis=1) & np.isfinite(y_train)
+    start = time.perf_counter()
+    model = trainer(x_train[usable], y_train[usable], cache.names)
+    fit_seconds = time.perf_counter() - start
+
+    x_test, y_test, returns = cache.test(fold)
+    start = time.perf_counter()
+    scorable = np.isfinite(x_test).all(axis=1)
+    edge = np.full(x_test.shape[0], np.nan)
+    if scorable.any():
+        edge[scorable] = model.score_batch(x_test[scorable], cache.names)[0]
+    signal = np.where(np.abs(np.nan_to_num(edge)) > config.threshold, np.sign(np.nan_to_num(edge)), 0.0)
+    positions = np.maximum(signal, 0.0) if config.long_only else signal
+    net = backtest_positions(positions, returns, config.fee_rate)
+    eval_seconds = time.perf_counter() - start
+
+    index = cache.index
+    record: dict[str, Any] = {
+        "fold": fold.number,
+        "train_start": index[fold.train.start],
+        "train_end": index[fold.train.stop - 1],
+        "test_start": index[fold.test.start],
+        "test_end": index[fold.test.stop - 1],
+        "train_rows": int(usable.sum()),
+        "test_rows": int(x_test.shape[0]),
+    }
+    record.update(fold_stats(edge, y_test, net, positions, config.periods_per_year))
+    record.update(fit_seconds=fit_seconds, eval_seconds=eval_seconds)
+    return record, edge
+
+
+def _evaluate_task(args: tuple[Fold, Trainer, EvalConfig]) -> tuple[dict[str, Any], np.ndarray]:
+    return evaluate_fold(_WORKER_CACHE, *args)
+
+
+@dataclass(frozen=True)
+class WalkForwardResult:
+    stats: pd.DataFrame
+    edge: pd.Series
+
+    def summary(self) -> pd.Series:
+        """Mean out-of-sample metrics across folds plus the fraction of profitable folds."""
+
+        columns = ["ic", "rank_ic", "hit_rate", "total_return", "sharpe", "max_drawdown", "exposure"]
+        summary = self.stats[columns].mean()
+        summary["profitable_folds"] = float((self.stats["total_return"] > 0).mean()) if len(self.stats) else np.nan
+        summary["folds"] = len(self.stats)
+        return summary
+
+
+def run_walk_forward(
+    cache: FeatureCache,
+    folds: Sequence[Fold],
+    trainer: Trainer | None = None,
+    config: EvalConfig = EvalConfig(),
+    max_workers: int | None = None,
+) -> WalkForwardResult:
+    """
+    Evaluate every fold and return per-fold stats (one row per fold) and the stitched OOS edge.
+
+    Folds are independent, so they run in a process pool; each worker gets `cache` once through the
+    pool initializer. Folds whose purge gap is shorter than `cache.horizon` are rejected (their last
+    training targets would be built from test-window prices). `trainer` must be picklable for parallel runs (module-level function or
+    object); it defaults to `ridge_trainer()`.
+    """
+
+    cache.check_purge(folds)
+    trainer = trainer or ridge_trainer()
+    tasks = [(fold, trainer, config) for fold in folds]
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [evaluate_fold(cache, *task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(cache,)) as pool:
+            results = list(pool.map(_evaluate_task, tasks))
+
+    edge = np.full(len(cache), np.nan)
+    for fold, (_, fold_edge) in zip(folds, results):
+        # Overlapping test windows (step < test_bars): the later fold's model wins.
+        edge[fold.test] = fold_edge
+    stats = pd.DataFrame([record for record, _ in results])
+    if not stats.empty:
+        stats = stats.set_index("fold")
+    return WalkForwardResult(stats, pd.Series(edge, index=cache.index, name="oos_edge"))
+
+
+__all__ = [
+    "Fold",
+    "make_folds",
+    "FeatureCache",
+    "feature_matrix",
+    "build_cache",
+    "ridge_trainer",
+    "backtest_positions",
+    "fold_stats",
+    "EvalConfig",
+    "evaluate_fold",
+    "WalkForwardResult",
+    "run_walk_forward",
+]
@@ -0,0 +1,19 @@
+"""
+Pytest setup for running the research modules outside Lean.
+
+Every module starts with `from AlgorithmImports import *`. When the Lean runtime is absent, the
+placeholder from `benchmarks.lean_placeholder` is registered so that import succeeds; it carries the
+base classes and enum constants that `main.py` and the research modules use at import time (e.g.
+`costs.TieredCryptoFeeModel` derives from `FeeModel`, `SpotMinuteAdapter` reads `Market.Kraken`).
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.lean_placeholder import install  # noqa: E402
+
+install()
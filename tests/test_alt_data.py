@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.alt_data import AltDataSource, AsOfJoinEngine
+from research.scripts.data_fetchers import utils
+
+
+@pytest.fixture
+def funding_dir(tmp_path):
+    prints = pd.date_range("2024-01-01", periods=9, freq="8h", tz="UTC")
+    buckets = pd.date_range("2024-01-01", periods=9 * 96, freq="5min", tz="UTC")
+    funding = pd.DataFrame({"funding_rate": np.arange(9.0)}, index=prints)
+    oi = pd.DataFrame({"open_interest_usd": np.arange(buckets.size, dtype=float)}, index=buckets)
+    # Same layout as `funding.run_pipeline`: sparse 8h prints outer-joined with 5m open interest.
+    utils.outer_join([funding, oi]).to_parquet(tmp_path / "btc_funding.parquet")
+    pd.DataFrame({"funding_rate": np.full(9, 7.0)}, index=prints).to_parquet(tmp_path / "btc_other.parquet")
+    return tmp_path
+
+
+def test_sparse_columns_join_over_their_own_prints(funding_dir):
+    source = AltDataSource("funding", funding_dir, "_funding.parquet", max_staleness=timedelta(hours=16))
+    bars = pd.date_range("2024-01-01 00:01", periods=2000, freq="1min", tz="UTC")
+    values, columns = AsOfJoinEngine([source]).join_array(bars, ["BTC"])
+
+    assert columns == ["funding_rate", "funding_open_interest_usd"]
+    assert not np.isnan(values).any()
+    funding = values[0, :, 0]
+    expected = (bars - pd.Timestamp("2024-01-01", tz="UTC")) // pd.Timedelta(hours=8)
+    np.testing.assert_array_equal(funding, np.asarray(expected, dtype=float))
+
+
+def test_sources_with_the_same_column_do_not_overwrite(funding_dir):
+    sources = [
+        AltDataSource("funding", funding_dir, "_funding.parquet"),
+        AltDataSource("other", funding_dir, "_other.parquet"),
+    ]
+    bars = pd.date_range("2024-01-01 09:00", periods=10, freq="1min", tz="UTC")
+    frame = AsOfJoinEngine(sources).join(bars, ["BTC"])
+
+    assert (frame["funding_rate"] == 1.0).all()
+    assert (frame["other_funding_rate"] == 7.0).all()
+
+
+def test_staleness_applies_per_column(funding_dir):
+    source = AltDataSource("funding", funding_dir, "_funding.parquet", max_staleness=timedelta(hours=1))
+    bars = pd.DatetimeIndex(["2024-01-01 00:30", "2024-01-01 02:00"], tz="UTC")
+    values, _ = AsOfJoinEngine([source]).join_array(bars, ["BTC"])
+
+    assert values[0, 0, 0] == 0.0
+    assert np.isnan(values[0, 1, 0])
+    assert not np.isnan(values[0, 1, 1])
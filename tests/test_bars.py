@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts import bars
+from research.scripts.bars import BarBuffer, BarCache
+from research.scripts.state import SnapshotError
+
+
+def test_add_symbol_grows_geometrically_and_keeps_history():
+    buffer = BarBuffer([], capacity=8)
+    buffer.add_symbol("A")
+    buffer.write(1, np.array([0]), np.array([[1.0, 2.0, 0.5, 1.5, 10.0]]))
+    reallocations = 0
+    for k in range(1, 200):
+        store = buffer._store
+        assert buffer.add_symbol(f"S{k}") == k
+        reallocations += buffer._store is not store
+
+    assert reallocations <= 8
+    assert buffer.latest().shape == (200, 5)
+    np.testing.assert_array_equal(buffer.latest()[0], [1.0, 2.0, 0.5, 1.5, 10.0])
+    assert np.isnan(buffer.latest()[1:]).all()
+
+
+def test_next_row_fills_in_place_and_window_orders_oldest_first():
+    buffer = BarBuffer(["A", "B"], capacity=3)
+    for t in range(5):
+        row = buffer.next_row(t)
+        row[t % 2] = t
+
+    ends, bars = buffer.window(3)
+
+    np.testing.assert_array_equal(ends, [2, 3, 4])
+    np.testing.assert_array_equal(bars[:, 0, 0], [2.0, np.nan, 4.0])
+    np.testing.assert_array_equal(bars[:, 1, 0], [np.nan, 3.0, np.nan])
+
+
+def test_snapshot_round_trip_and_symbol_check():
+    buffer = BarBuffer(["A"], capacity=4)
+    for k in range(5):
+        buffer.add_symbol(f"S{k}")
+    buffer.write(7, np.array([0, 5]), np.ones((2, 5)))
+    state = buffer.get_state()
+
+    restored = BarBuffer(["A", *(f"S{k}" for k in range(5))], capacity=4)
+    restored.set_state(state)
+    np.testing.assert_array_equal(restored.window(1)[1], buffer.window(1)[1])
+    assert restored.count == 1
+
+    with pytest.raises(SnapshotError):
+        BarBuffer(["A"], capacity=4).set_state(state)
+
+
+def minute_frame(n, seed=0):
+    index = pd.date_range("2024-01-01 00:01", periods=n, freq="1min", tz="UTC")
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.001, "low": close * 0.999, "close": close, "volume": rng.uniform(1, 2, n)},
+        index=index,
+    )
+
+
+def test_bar_cache_extends_from_the_last_cached_bar(tmp_path, monkeypatch):
+    minute = minute_frame(3 * 1440 + 37)
+    full = BarCache(tmp_path / "full")
+    full.build("BTC", minute)
+
+    cache = BarCache(tmp_path / "incremental")
+    cache.build("BTC", minute.iloc[:1440 + 500])
+    consolidated = []
+    original = bars.consolidate
+    monkeypatch.setattr(bars, "consolidate", lambda frame, *a, **k: consolidated.append(len(frame)) or original(frame, *a, **k))
+    cache.build("BTC", minute)
+
+    # The cached daily bar ends after the first 1440 minutes; only the minutes after it are re-read.
+    assert consolidated == [len(minute) - 1440]
+    for resolution in cache.resolutions:
+        pd.testing.assert_frame_equal(cache.get("BTC", resolution), full.get("BTC", resolution))
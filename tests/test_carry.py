@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.crypto.carry import CarryEngine, align_inputs, compute_carry
+
+
+@pytest.fixture
+def minute_market():
+    index = pd.date_range("2024-01-01 00:01", periods=3 * 24 * 60, freq="1min", tz="UTC")
+    rng = np.random.default_rng(1)
+    spot = pd.DataFrame({"BTC": 40_000 * np.exp(np.cumsum(rng.normal(0, 5e-4, index.size)))}, index=index)
+    prints = pd.date_range("2024-01-01 08:00", periods=8, freq="8h", tz="UTC")
+    at_print = spot["BTC"].reindex(prints).to_numpy()
+    funding = pd.DataFrame(
+        {"funding_rate": rng.normal(0.01, 0.005, prints.size), "mark_price": at_print * 1.002},
+        index=prints,
+    )
+    return spot, {"BTC": funding}
+
+
+def test_mark_basis_is_measured_at_the_mark_timestamp(minute_market):
+    spot, funding = minute_market
+    inputs = align_inputs(funding, spot)
+
+    held = ~np.isnan(inputs.basis[:, 0])
+    assert held.sum() > 0.9 * (spot.index >= "2024-01-01 08:00").sum()
+    # Marks were 0.2% over spot at print time; spot drift since the print must not leak in.
+    np.testing.assert_allclose(inputs.basis[held, 0], 0.002, rtol=1e-9)
+
+
+def test_engine_staleness_follows_the_bar_period():
+    assert CarryEngine(["BTC"], bar_period=timedelta(hours=1)).staleness_bars == 16
+    assert CarryEngine(["BTC"], bar_period=timedelta(minutes=1)).staleness_bars == 16 * 60
+    assert CarryEngine(["BTC"], staleness_bars=3).staleness_bars == 3
+
+
+def test_engine_matches_batch_on_minute_bars(minute_market):
+    spot, funding = minute_market
+    table = compute_carry(align_inputs(funding, spot), zscore_window=600)
+    engine = CarryEngine(["BTC"], zscore_window=600, bar_period=timedelta(minutes=1))
+    frame = funding["BTC"].reindex(spot.index)
+    rates = frame["funding_rate"].to_numpy() * 0.01
+    marks = frame["mark_price"].to_numpy()
+
+    rows = [engine.update(rates[t : t + 1], spot.to_numpy()[t], perp=marks[t : t + 1]) for t in range(len(spot))]
+    # Running sums vs cumulative sums differ by rounding, which the low-variance z-score amplifies.
+    for metric, rtol in (("annualized_funding", 1e-12), ("basis", 1e-12), ("carry_zscore", 1e-7)):
+        streamed = np.array([row[metric][0] for row in rows])
+        np.testing.assert_allclose(streamed, table[(metric, "BTC")].to_numpy(), rtol=rtol, atol=1e-12, equal_nan=True)
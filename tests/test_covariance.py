@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.covariance import LEDOIT_WOLF, CovarianceEstimator, EwmaCovariance, RollingCovariance
+
+SYMBOLS = ["BTC", "ETH", "SOL", "ADA", "XRP"]
+
+
+def returns(n, seed=0):
+    rng = np.random.default_rng(seed)
+    mixing = rng.normal(size=(len(SYMBOLS), len(SYMBOLS)))
+    return pd.DataFrame(0.01 * rng.standard_t(5, size=(n, len(SYMBOLS))) @ mixing, columns=SYMBOLS)
+
+
+def feed(estimator, frame):
+    for row in frame.to_numpy():
+        estimator.update(row)
+    return estimator
+
+
+@pytest.mark.parametrize("n", [30, 200])
+def test_ledoit_wolf_matches_sklearn(n):
+    covariance = pytest.importorskip("sklearn.covariance")
+    frame = returns(n)
+
+    snapshot = feed(RollingCovariance(SYMBOLS, window=n), frame).snapshot(LEDOIT_WOLF)
+    reference = covariance.LedoitWolf().fit(frame.to_numpy())
+
+    assert snapshot.intensity == pytest.approx(reference.shrinkage_, rel=1e-9)
+    np.testing.assert_allclose(snapshot.covariance, reference.covariance_, rtol=1e-9, atol=1e-15)
+
+
+def test_rolling_covariance_matches_pandas_rolling_cov():
+    window = 48
+    frame = returns(5 * window + 17, seed=1)
+    expected = frame.rolling(window).cov()
+    estimator = RollingCovariance(SYMBOLS, window=window)
+
+    # Check across several ring-buffer wraps and sum rebuilds.
+    for t, row in enumerate(frame.to_numpy()):
+        estimator.update(row)
+        if t >= window - 1 and t % 13 == 0:
+            unbiased = estimator.covariance() * window / (window - 1)
+            np.testing.assert_allclose(unbiased, expected.loc[t].to_numpy(), rtol=1e-9, atol=1e-15)
+
+
+def test_ewma_covariance_matches_pandas_ewm_cov():
+    halflife = 24.0
+    frame = returns(300, seed=2)
+    expected = frame.ewm(halflife=halflife, adjust=False).cov(bias=True)
+
+    estimator = feed(EwmaCovariance(SYMBOLS, halflife=halflife), frame)
+
+    np.testing.assert_allclose(estimator.covariance(), expected.loc[len(frame) - 1].to_numpy(), rtol=1e-9, atol=1e-15)
+
+
+def test_estimator_base_is_abstract():
+    with pytest.raises(TypeError):
+        CovarianceEstimator(SYMBOLS, min_periods=1)
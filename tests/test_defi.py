@@ -0,0 +1,54 @@
+import pandas as pd
+
+from research.scripts import integrity
+from research.scripts.data_fetchers import defi
+
+
+def payload():
+    return {
+        "data": [
+            {"symbol": "eth", "apyType": "borrow", "timestamp": 1_700_000_000, "project": "aave", "apy": 3.0},
+            {"symbol": "ETH", "apyType": "supply", "timestamp": 1_700_000_000, "project": "aave", "apy": 1.0},
+            {"symbol": "BTC", "apyType": "borrow", "timestamp": 1_700_000_000, "project": "aave", "apy": 2.0},
+        ]
+    }
+
+
+def test_pools_cache_lives_under_out_dir_outside_the_scanned_series(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(defi.utils, "json_request", lambda url, **kwargs: calls.append(url) or payload())
+    monkeypatch.setattr(defi, "_POOLS_MEMO", {})
+    out_dir = tmp_path / "defi"
+
+    paths = defi.run_pipeline(["ETH", "BTC", "SOL"], {}, out_dir, lookback=pd.Timedelta(days=10_000))
+
+    cache = defi.pools_cache_file(out_dir)
+    assert cache.exists() and calls == [defi.DEFILLAMA_BORROW_URL]
+    assert set(paths) == {"ETH", "BTC"}
+    assert integrity.discover([tmp_path]) == sorted(paths.values())
+
+
+def test_empty_pools_table_is_loaded_once(tmp_path, monkeypatch):
+    loads = []
+    monkeypatch.setattr(defi, "_load_pools", lambda cache_file: loads.append(cache_file) or defi.PoolsTable.from_payload([]))
+
+    assert defi.run_pipeline(["ETH", "BTC", "SOL"], {}, tmp_path) == {}
+    assert loads == [defi.pools_cache_file(tmp_path)]
+
+
+def test_memoized_pools_expire_with_the_snapshot_ttl(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(defi.utils, "json_request", lambda url, **kwargs: calls.append(url) or payload())
+    monkeypatch.setattr(defi, "_POOLS_MEMO", {})
+    cache = defi.pools_cache_file(tmp_path)
+    now = [1_000_000.0]
+    monkeypatch.setattr(defi.time, "time", lambda: now[0])
+
+    first = defi._load_pools(cache)
+    snapshot_time = cache.stat().st_mtime
+    now[0] = snapshot_time + defi.POOLS_TTL.total_seconds() - 1
+    assert defi._load_pools(cache) is first and len(calls) == 1
+
+    now[0] = snapshot_time + defi.POOLS_TTL.total_seconds() + 1
+    assert defi._load_pools(cache) is not first
+    assert len(calls) == 2
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts import qc_native_features as qnf
+from research.scripts.feature_panel import (
+    COMPACT_POLICY,
+    FLOAT64_POLICY,
+    HALF_RATIO_POLICY,
+    FeaturePanel,
+    compact_panel,
+)
+
+
+def bars(seed, n=2000):
+    index = pd.date_range("2024-01-01", periods=n, freq="1h", tz="UTC")
+    rng = np.random.default_rng(seed)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), index=index)
+    spread = close * rng.uniform(0.001, 0.01, n)
+    volume = pd.Series(rng.lognormal(10, 1, n), index=index)
+    return close + spread, close - spread, close, volume
+
+
+def features(seed, dtype=np.float64, policy=None):
+    high, low, close, volume = bars(seed)
+    target = (lambda name: policy.target(name)) if policy is not None else (lambda name: dtype)
+    roc = qnf.multi_horizon_roc(close, (1, 24), dtype=target("roc"))
+    columns = [
+        qnf.atr_percent(high, low, close, dtype=target("atr_percent")),
+        qnf.realized_vol(close.pct_change(), 24, dtype=target("realized_vol_24")),
+        qnf.normalized_momentum(close, 24, 48, dtype=target("normalized_mom_24_48")),
+        qnf.relative_volume(volume, dtype=target("relative_volume_24_168")),
+        qnf.price_volume_ratio(close, volume, dtype=target("price_volume_ratio_24")),
+    ]
+    return pd.concat([roc, *columns], axis=1)
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return {f"S{i}": features(i) for i in range(3)}
+
+
+def assert_matches(panel, reference, rtol, atol):
+    for symbol, frame in reference.items():
+        restored = panel.frame(symbol, dtype="float64")
+        assert restored.index.equals(frame.index)
+        for column in frame.columns:
+            expected, actual = frame[column].to_numpy(), restored[column].to_numpy()
+            np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+            np.testing.assert_allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True)
+
+
+def test_float64_policy_is_lossless(reference):
+    panel = compact_panel(reference, FLOAT64_POLICY)
+
+    assert_matches(panel, reference, rtol=0, atol=0)
+
+
+def test_float32_panel_round_trips(reference, tmp_path):
+    panel = compact_panel(reference, COMPACT_POLICY)
+
+    assert {a.dtype for a in panel.values.values()} == {np.dtype(np.float32)}
+    assert panel.nbytes < compact_panel(reference, FLOAT64_POLICY).nbytes * 0.6
+    assert_matches(panel, reference, rtol=1e-6, atol=1e-9)
+
+    loaded = FeaturePanel.load(panel.save(tmp_path / "panel.parquet"))
+    assert_matches(loaded, reference, rtol=1e-6, atol=1e-9)
+
+
+def test_half_ratio_panel_stays_within_tolerance(reference):
+    panel = compact_panel(reference, HALF_RATIO_POLICY)
+
+    stored = panel.accuracy["dtype"]
+    assert stored["relative_volume_24_168"] == "float16"
+    assert stored["atr_percent"] == "float16"
+    assert stored["roc_1h"] == "float32"
+    assert_matches(panel, reference, rtol=1e-3, atol=1e-4)
+
+
+def test_features_computed_at_policy_dtype_match_the_float64_panel(reference):
+    direct = {f"S{i}": features(i, policy=HALF_RATIO_POLICY) for i in range(3)}
+    assert direct["S0"]["roc_1h"].dtype == np.float32
+    assert direct["S0"]["relative_volume_24_168"].dtype == np.float16
+
+    from_float64 = compact_panel(reference, HALF_RATIO_POLICY)
+    panel = compact_panel(direct, HALF_RATIO_POLICY)
+
+    for column, values in panel.values.items():
+        np.testing.assert_array_equal(values, from_float64.values[column])
+    assert (panel.accuracy["input"] != "float64").all()
@@ -0,0 +1,74 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from research.scripts.feature_store import FeatureRegistry, FeatureSpec, check_parity
+
+WINDOW = 5
+
+
+def make_bars(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    index = pd.date_range("2024-01-01", periods=n, freq="1min", tz="UTC")
+    return pd.DataFrame(
+        {"open": close, "high": close * 1.001, "low": close * 0.999, "close": close, "volume": 1.0}, index=index
+    )
+
+
+class RollingMean:
+    """Streaming mean of the last `WINDOW` closes, `lag` bars behind the current bar."""
+
+    def __init__(self, lag=0):
+        self.closes = deque(maxlen=WINDOW + lag)
+
+    def update(self, bar):
+        self.closes.append(bar.Close)
+        if len(self.closes) < self.closes.maxlen:
+            return None
+        return sum(list(self.closes)[:WINDOW]) / WINDOW
+
+
+def registry_with(stream_factory):
+    registry = FeatureRegistry()
+    spec = FeatureSpec(name="close_mean", inputs=("close",), window=WINDOW, description="Rolling mean of close")
+    registry.register(
+        spec,
+        lambda bar: bar.Close,
+        batch=lambda bars: bars["close"].rolling(WINDOW).mean(),
+        stream_factory=stream_factory,
+    )
+    return registry
+
+
+def test_rolling_feature_parity_passes():
+    bars = make_bars()
+
+    report = check_parity(registry_with(RollingMean), bars)
+
+    row = report.loc["close_mean"]
+    assert row["status"] == "ok" and row["mismatches"] == 0
+    assert row["compared"] == len(bars) - (WINDOW - 1)
+    assert row["max_abs_diff"] < 1e-9
+
+
+def test_off_by_one_stream_is_reported():
+    bars = make_bars()
+
+    # Streams the mean of the previous window (one bar stale), a typical live/research drift.
+    report = check_parity(registry_with(lambda: RollingMean(lag=1)), bars)
+
+    row = report.loc["close_mean"]
+    assert row["status"] == "mismatch"
+    # Row WINDOW - 1 is NaN in the stream only; every later row is stale.
+    assert row["mismatches"] == len(bars) - (WINDOW - 1)
+    assert row["first_mismatch"] == bars.index[WINDOW - 1]
+    assert row["max_abs_diff"] > 0
+
+
+def test_features_without_batch_are_flagged():
+    registry = FeatureRegistry()
+    registry.register(FeatureSpec("close", ("close",), 1, "Close"), lambda bar: bar.Close)
+
+    assert check_parity(registry, make_bars(20)).loc["close", "status"] == "no_batch"
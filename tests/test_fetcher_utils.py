@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.data_fetchers import utils
+
+
+def concat_sort(frames):
+    """The previous merge: concat, stable sort, keep the last row per timestamp."""
+
+    valid = [df for df in frames if df is not None and not df.empty]
+    if not valid:
+        return pd.DataFrame()
+    combined = pd.concat(valid, axis=0).sort_index(kind="stable")
+    return combined[~combined.index.duplicated(keep="last")]
+
+
+def concat_join(frames):
+    """Column-wise join by concat+sort per column: later frames win wherever they have a row."""
+
+    valid = [df for df in frames if df is not None and not df.empty]
+    if not valid:
+        return pd.DataFrame()
+    index = concat_sort([pd.DataFrame(index=df.index, data={"_": 0}) for df in valid]).index
+    columns = list(dict.fromkeys(col for df in valid for col in df.columns))
+    return pd.DataFrame(
+        {col: concat_sort([df[[col]] for df in valid if col in df.columns])[col].reindex(index) for col in columns},
+        index=index,
+    )
+
+
+def chunks(seed, n_frames=4, size=50, tz="UTC"):
+    """Paginated-pull-like chunks: overlapping ranges, repeated timestamps and shuffled rows."""
+
+    rng = np.random.default_rng(seed)
+    base = pd.Timestamp("2024-01-01", tz=tz)
+    frames = []
+    for k in range(n_frames):
+        offsets = np.sort(rng.choice(120, size, replace=True)) + 20 * k
+        if k % 2:
+            offsets = rng.permutation(offsets)
+        index = base + pd.to_timedelta(offsets, unit="h")
+        frames.append(pd.DataFrame({"value": rng.normal(size=size), "frame": k}, index=index))
+    return frames
+
+
+def test_merge_order_matches_a_stable_sort():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        keys = [np.sort(rng.integers(0, 60, rng.integers(0, 30))) for _ in range(rng.integers(1, 5))]
+        flat = np.concatenate(keys)
+        if not flat.size:
+            continue
+        order = np.argsort(flat, kind="stable")
+        last = np.r_[flat[order][1:] != flat[order][:-1], True]
+
+        np.testing.assert_array_equal(utils.merge_order(keys), order[last])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_frames_matches_concat_sort(seed):
+    frames = chunks(seed)
+
+    pd.testing.assert_frame_equal(utils.merge_frames(frames), concat_sort(frames))
+
+
+def test_merge_frames_later_frame_wins_on_duplicate_keys():
+    index = pd.date_range("2024-01-01", periods=3, freq="D", tz="UTC")
+    first = pd.DataFrame({"value": [1.0, 2.0, 3.0]}, index=index)
+    second = pd.DataFrame({"value": [20.0, 30.0]}, index=index[1:])
+    third = pd.DataFrame({"value": [300.0]}, index=index[2:])
+
+    merged = utils.merge_frames([first, second, None, pd.DataFrame(), third])
+
+    assert merged["value"].tolist() == [1.0, 20.0, 300.0]
+    pd.testing.assert_frame_equal(merged, concat_sort([first, second, third]))
+
+
+def test_merge_frames_empty_and_fallback_paths():
+    assert utils.merge_frames([]).empty and utils.merge_frames([None, pd.DataFrame()]).empty
+
+    labelled = [pd.DataFrame({"v": [1, 2]}, index=["b", "a"]), pd.DataFrame({"v": [3]}, index=["b"])]
+    pd.testing.assert_frame_equal(utils.merge_frames(labelled), concat_sort(labelled))
+
+    mixed = [pd.DataFrame({"v": [1, 2]}, index=[3, 1]), pd.DataFrame({"v": [0.5], "w": ["x"]}, index=[1])]
+    pd.testing.assert_frame_equal(utils.merge_frames(mixed), concat_sort(mixed))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_outer_join_matches_concat_per_column(seed):
+    rng = np.random.default_rng(seed)
+    frames = chunks(seed, n_frames=3)
+    frames[1] = frames[1].rename(columns={"value": "other"})
+    frames[2].loc[frames[2].index[rng.choice(len(frames[2]), 5)], "value"] = np.nan
+
+    # outer_join widens int columns to float up front (gaps become NaN); pandas only does so on a gap.
+    pd.testing.assert_frame_equal(utils.outer_join(frames), concat_join(frames), check_dtype=False)
+
+
+def test_outer_join_later_rows_override_and_empty_frames_are_skipped():
+    index = pd.date_range("2024-01-01", periods=4, freq="h", tz="UTC")
+    cached = pd.DataFrame({"oi": [1.0, 2.0, 3.0, 4.0], "funding": 0.1}, index=index)
+    fresh = pd.DataFrame({"oi": [np.nan, 30.0]}, index=index[2:])
+    later = pd.DataFrame({"oi": [50.0]}, index=[index[-1] + pd.Timedelta(hours=1)])
+
+    joined = utils.outer_join([cached, pd.DataFrame(), fresh, None, later])
+
+    # A later row overrides the cached value even when it is NaN; columns it lacks stay as cached.
+    np.testing.assert_array_equal(joined["oi"].to_numpy(), [1.0, 2.0, np.nan, 30.0, 50.0])
+    np.testing.assert_array_equal(joined["funding"].to_numpy(), [0.1, 0.1, 0.1, 0.1, np.nan])
+    pd.testing.assert_frame_equal(joined, concat_join([cached, fresh, later]))
+    assert utils.outer_join([None, pd.DataFrame()]).empty
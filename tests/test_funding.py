@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from research.scripts.data_fetchers import funding, utils
+
+FIVE_MINUTES_MS = 5 * 60 * 1000
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(days=60)
+
+
+class CappedOpenInterest:
+    """`openInterestHist` mock: 5m buckets in `[startTime, endTime]`, at most `cap` rows per page."""
+
+    def __init__(self, cap: int) -> None:
+        self.cap = cap
+        self.calls = 0
+
+    def __call__(self, url, params):
+        self.calls += 1
+        first = -(-params["startTime"] // FIVE_MINUTES_MS) * FIVE_MINUTES_MS
+        stamps = np.arange(first, params["endTime"] + 1, FIVE_MINUTES_MS)[: min(self.cap, params["limit"])]
+        return [{"timestamp": int(t), "sumOpenInterest": "1.0"} for t in stamps]
+
+
+def expected_rows(start: datetime, end: datetime) -> int:
+    lo, hi = int(start.timestamp() * 1000), int(end.timestamp() * 1000) - 1
+    return len(range(-(-lo // FIVE_MINUTES_MS) * FIVE_MINUTES_MS, hi + 1, FIVE_MINUTES_MS))
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(utils.RateLimiter, "wait", lambda self: None)
+
+
+@pytest.mark.parametrize("cap", [500, 173])
+def test_open_interest_pages_past_a_venue_cap(cap):
+    request = CappedOpenInterest(cap)
+    frame = funding._fetch_binance(
+        funding.BINANCE_OI_URL, "BTCUSDT", START, END, extra_params={"period": "5m"}, max_workers=2, request=request
+    )
+
+    assert len(frame) == expected_rows(START, END)
+    assert frame.index.is_monotonic_increasing and frame.index.is_unique
+
+
+def test_default_oi_limit_matches_the_venue_cap():
+    request = CappedOpenInterest(500)
+    funding._fetch_binance(funding.BINANCE_OI_URL, "BTCUSDT", START, END, extra_params={"period": "5m"}, request=request)
+
+    windows = funding.split_windows(int(START.timestamp() * 1000), int(END.timestamp() * 1000), timedelta(minutes=5), 500)
+    # Windows sized to the 500-row cap need one page each.
+    assert request.calls == len(windows)
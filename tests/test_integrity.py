@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from research.scripts import integrity
+from research.scripts.integrity import IntegrityConfig, spike_count, stale_runs, timestamp_checks
+
+MINUTE = pd.Timedelta(minutes=1).value
+
+
+def test_timestamp_checks_counts_duplicates_disorder_and_gaps():
+    # Minutes 0..9 and 15..19 (5 missing rows), then 30 (10 missing);
+    # minute 3 appears twice and 16 arrives before 15.
+    minutes = [0, 1, 2, 3, 3, 4, 5, 6, 7, 8, 9, 16, 15, 17, 18, 19, 30]
+    ns = np.array(minutes, dtype=np.int64) * MINUTE
+
+    result = timestamp_checks(ns)
+
+    assert result["duplicates"] == 1
+    assert result["non_monotonic"] == 1
+    assert result["frequency"] == pd.Timedelta(minutes=1)
+    assert (result["gaps"], result["missing_rows"]) == (2, 5 + 10)
+    assert result["max_gap"] == pd.Timedelta(minutes=11)
+
+    assert timestamp_checks(ns, IntegrityConfig(frequency="5min"))["gaps"] == 1
+    assert timestamp_checks(ns, IntegrityConfig(check_gaps=False))["gaps"] == 0
+
+
+def test_stale_runs_counts_runs_per_column_and_nan_breaks_them():
+    values = np.arange(20, dtype=np.float64)[:, None].repeat(2, axis=1)
+    values[2:8, 0] = 5.0  # run of 6
+    values[10:19, 0] = 7.0  # run of 9
+    values[3:13, 1] = 1.0  # run of 10 ...
+    values[7, 1] = np.nan  # ... split into 4 and 5
+
+    assert stale_runs(values, 5) == (3, 9)
+    assert stale_runs(values, 7) == (1, 9)
+    assert stale_runs(values, 0) == (0, 0)
+
+
+def test_spike_count_uses_robust_z_scores():
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, (500, 2)), axis=0))
+    prices[100:, 0] *= 1.2  # one jump
+    prices[300, 1] *= 0.8  # one bad print: down then back up
+
+    assert spike_count(prices, 12.0) == 3
+    # A flat series has MAD 0 and still reports its single jump.
+    flat = np.r_[np.full(50, 10.0), np.full(50, 11.0)][:, None]
+    assert spike_count(flat, 12.0) == 1
+
+
+def bars_with_known_issues():
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2024-01-01", periods=300, freq="1min", tz="UTC")
+    returns = rng.normal(0, 0.0005, index.size)
+    returns[200:280] = 0.0  # closes 199..279 are identical: one stale run of 81
+    close = 100 * np.exp(np.cumsum(returns))
+    noise = np.abs(rng.normal(0, 1e-4, (index.size, 3)))
+    frame = pd.DataFrame(
+        {
+            "open": close * (1 + noise[:, 0] - noise[:, 1]),
+            "high": close * (1 + noise[:, 2] + 1e-4),
+            "low": close * (1 - noise[:, 1] - 1e-4),
+            "close": close,
+            "volume": 1.0,
+        },
+        index=index,
+    )
+    frame.iloc[30, frame.columns.get_loc("close")] *= 1.5  # spike: up at bar 30, down at bar 31
+    frame.iloc[[5, 6], frame.columns.get_loc("volume")] = np.nan  # ignored column
+    frame = frame.drop(index[50:55]).drop(index[120:122])  # gaps of 5 and 2 missing rows
+    return pd.concat([frame, frame.iloc[[10, 11]]])  # two duplicates, appended out of order
+
+
+def test_scan_report_counts_known_issues(tmp_path):
+    # BarCache layout: the directory name is the expected spacing.
+    path = tmp_path / "bars" / "1min" / "btcusd.parquet"
+    path.parent.mkdir(parents=True)
+    bars_with_known_issues().to_parquet(path)
+
+    report = integrity.scan_paths(integrity.discover([tmp_path]), max_workers=1)
+
+    row = report.iloc[0]
+    assert row["error"] == "" and row["rows"] == 300 - 7 + 2
+    assert (row["duplicates"], row["non_monotonic"]) == (2, 1)
+    assert (row["gaps"], row["missing_rows"], row["max_gap"]) == (2, 7, pd.Timedelta(minutes=6))
+    assert (row["stale_runs"], row["longest_stale"]) == (1, 81)
+    assert (row["spikes"], row["non_positive"], row["nan_cells"]) == (2, 0, 0)
+    assert integrity.flagged(report)["path"].tolist() == [str(path)]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.labels import STOP, TAKE_PROFIT, VERTICAL, trailing_vol, triple_barrier
+
+
+def brute_force(prices, events, horizon, take_profit, stop_loss_pct, vertical_sign=False):
+    """One Python loop per event, mirroring `TrailingStopGuard` bar by bar."""
+
+    n = len(prices)
+    take_profit = np.nan if take_profit is None else take_profit
+    take_profit = np.broadcast_to(np.asarray(take_profit, dtype=float), (len(events),))
+    rows = []
+    for event, tp in zip(events, take_profit):
+        entry = prices[event]
+        peak = entry
+        exit_at, kind = min(event + horizon, n - 1), VERTICAL
+        for j in range(event + 1, min(event + horizon, n - 1) + 1):
+            if np.isfinite(tp) and prices[j] >= entry * (1 + tp):
+                exit_at, kind = j, TAKE_PROFIT
+            if stop_loss_pct is not None and prices[j] <= (1 - stop_loss_pct) * max(peak, prices[j]):
+                exit_at, kind = j, STOP
+            if kind != VERTICAL:
+                break
+            peak = max(peak, prices[j])
+        if kind == VERTICAL and event + horizon > n - 1:
+            rows.append((np.nan, kind, np.nan, np.nan))
+            continue
+        ret = prices[exit_at] / entry - 1
+        label = {TAKE_PROFIT: 1.0, STOP: -1.0, VERTICAL: np.sign(ret) if vertical_sign else 0.0}[kind]
+        rows.append((label, kind, float(exit_at - event), ret))
+    return pd.DataFrame(rows, columns=["label", "barrier", "exit_offset", "exit_return"])
+
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, n))), index=pd.RangeIndex(n))
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 64, 1 << 18])
+def test_triple_barrier_matches_brute_force(chunk):
+    close = random_walk(1_500, seed=0)
+    rng = np.random.default_rng(1)
+    events = rng.choice(len(close), 400, replace=True)
+    take_profit = rng.uniform(0.005, 0.05, events.size)
+
+    for tp, stop in [(0.02, 0.03), (take_profit, 0.01), (None, 0.02), (0.015, None)]:
+        got = triple_barrier(close, 40, tp, stop, events=events, vertical_sign=True, chunk=chunk)
+        expected = brute_force(close.to_numpy(), events, 40, tp, stop, vertical_sign=True)
+
+        assert got.index.tolist() == events.tolist()
+        np.testing.assert_array_equal(got["barrier"].to_numpy(), expected["barrier"].to_numpy())
+        for column in ("label", "exit_offset", "exit_return"):
+            np.testing.assert_allclose(got[column].to_numpy(), expected[column].to_numpy(), rtol=1e-12)
+
+
+def test_same_bar_tie_resolves_to_the_stop():
+    # Bar 1 is above the (negative) take-profit and below the trailing stop from the 100 entry.
+    close = pd.Series([100.0, 96.0, 99.0])
+
+    got = triple_barrier(close, 2, take_profit=-0.05, stop_loss_pct=0.03, events=np.array([0]))
+
+    assert got["barrier"].iloc[0] == STOP and got["label"].iloc[0] == -1.0
+    assert brute_force(close.to_numpy(), [0], 2, -0.05, 0.03)["barrier"].iloc[0] == STOP
+
+
+def test_barriers_touching_on_the_vertical_bar_win_over_the_time_barrier():
+    close = pd.Series([100.0, 101.0, 102.0, 104.0, 100.0, 100.0, 100.0, 97.0, 100.0, 100.5, 101.0, 100.5])
+
+    got = triple_barrier(close, 3, take_profit=0.04, stop_loss_pct=0.03, events=np.array([0, 4, 8]))
+
+    # Event 0 touches +4% exactly on its last bar, event 4 the stop; event 8 hits neither.
+    assert got["barrier"].tolist() == [TAKE_PROFIT, STOP, VERTICAL]
+    assert got["exit_offset"].tolist() == [3.0, 3.0, 3.0]
+    assert got["label"].tolist() == [1.0, -1.0, 0.0]
+
+
+def test_time_barrier_past_the_end_is_nan_unless_a_barrier_is_hit():
+    close = pd.Series([100.0, 100.5, 101.0, 90.0, 90.5, 91.0])
+
+    got = triple_barrier(close, 4, take_profit=0.5, stop_loss_pct=0.05)
+
+    assert got["barrier"].iloc[0] == STOP and got["exit_offset"].iloc[0] == 3.0
+    assert got["label"].iloc[3:].isna().all() and got["exit_offset"].iloc[3:].isna().all()
+    assert got["barrier"].iloc[1] == STOP and got["barrier"].iloc[2] == STOP
+
+
+@pytest.mark.parametrize("window", [2, 5, 60])
+def test_trailing_vol_matches_pandas(window):
+    close = random_walk(2_000, seed=3)
+    close.iloc[[50, 51, 700]] = np.nan
+
+    expected = close.pct_change(fill_method=None).rolling(window).std().to_numpy()
+
+    np.testing.assert_allclose(trailing_vol(close.to_numpy(), window), expected, rtol=1e-9, atol=1e-11)
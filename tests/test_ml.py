@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+sklearn = pytest.importorskip("sklearn")
+from sklearn.ensemble import (  # noqa: E402
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from sklearn.linear_model import LinearRegression, LogisticRegression  # noqa: E402
+from sklearn.neural_network import MLPClassifier, MLPRegressor  # noqa: E402
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor  # noqa: E402
+
+from research.scripts.signals.ml import InferenceSignal, export_sklearn, load_model  # noqa: E402
+
+FEATURES = ["f0", "f1", "f2", "f3"]
+
+
+def make_data(seed=0, n=400):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(size=(n, len(FEATURES)))
+    y = x @ np.array([0.8, -0.5, 0.3, 0.0]) + 0.2 * np.sin(3 * x[:, 0]) + rng.normal(0, 0.1, n)
+    return x, y
+
+
+ESTIMATORS = [
+    LinearRegression(),
+    LogisticRegression(),
+    DecisionTreeRegressor(max_depth=6, random_state=0),
+    DecisionTreeClassifier(max_depth=6, random_state=0),
+    RandomForestRegressor(n_estimators=15, max_depth=6, random_state=0),
+    RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0),
+    ExtraTreesRegressor(n_estimators=15, max_depth=6, random_state=0),
+    ExtraTreesClassifier(n_estimators=15, max_depth=6, random_state=0),
+    MLPRegressor(hidden_layer_sizes=(8, 4), max_iter=300, random_state=0),
+    MLPClassifier(hidden_layer_sizes=(8, 4), max_iter=300, random_state=0),
+]
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+@pytest.mark.parametrize("estimator", ESTIMATORS, ids=lambda e: type(e).__name__)
+def test_export_round_trip_matches_sklearn(tmp_path, estimator):
+    x, y = make_data()
+    is_classifier = hasattr(estimator, "predict_proba")
+    estimator.fit(x, (y > 0).astype(int) if is_classifier else y)
+
+    model = load_model(export_sklearn(estimator, FEATURES, tmp_path / "model.npz"))
+    x_test, _ = make_data(seed=1, n=200)
+    expected = estimator.predict_proba(x_test)[:, 1] if is_classifier else estimator.predict(x_test)
+
+    np.testing.assert_allclose(model.predict(x_test), expected, rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("cls", [DecisionTreeClassifier, RandomForestClassifier, ExtraTreesClassifier])
+def test_tree_classifier_edge_is_symmetric(tmp_path, cls):
+    x, y = make_data()
+    estimator = cls(max_depth=4, random_state=0).fit(x, (y > 0).astype(int))
+    signal = InferenceSignal(export_sklearn(estimator, FEATURES, tmp_path / "model.npz"))
+
+    x_test, _ = make_data(seed=2, n=200)
+    edge, confidence = signal.score_batch(x_test, FEATURES)
+    proba = estimator.predict_proba(x_test)[:, 1]
+
+    np.testing.assert_allclose(edge, 2 * proba - 1, atol=1e-12)
+    np.testing.assert_allclose(confidence, np.abs(edge))
+    assert edge.min() < 0 < edge.max()
+
+
+def test_export_rejects_unsupported_ensembles(tmp_path):
+    x, y = make_data()
+    boosted = GradientBoostingClassifier(n_estimators=5, random_state=0).fit(x, (y > 0).astype(int))
+    with pytest.raises(TypeError, match="GradientBoostingClassifier"):
+        export_sklearn(boosted, FEATURES, tmp_path / "model.npz")
+
+    multiclass = DecisionTreeClassifier(max_depth=3).fit(x, np.digitize(y, [-0.5, 0.5]))
+    with pytest.raises(TypeError, match="binary"):
+        export_sklearn(multiclass, FEATURES, tmp_path / "model.npz")
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.monte_carlo import DEFAULT_FEE_RATE, null_distribution, simulate_random_long
+from research.scripts.walk_forward import backtest_positions
+
+SEEDS = [0, 1, 7, 42, 1234, 99_999]
+PARAMS = {"trade_probability": 0.3, "stop_loss_pct": 0.02, "min_trade_interval": 5, "position_size": 0.9}
+
+
+def closes(n=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.006, n)))
+    prices[[10, 11, 500]] = np.nan
+    return prices
+
+
+def reference_run(prices, seed, trade_probability, stop_loss_pct, min_trade_interval, position_size, fee_rate):
+    """`OnData` for one seed, bar by bar; returns (total_return, trades, wins, positions)."""
+
+    draws = np.random.Generator(np.random.PCG64(seed)).random(prices.size)
+    equity, in_pos, entry, stop, last_trade, trades, wins = 1.0, False, 0.0, 0.0, 0, 0, 0
+    positions = np.zeros(prices.size)
+    for t, price in enumerate(prices):
+        if not np.isfinite(price):
+            positions[t] = position_size if in_pos else 0.0
+            continue
+        exited = False
+        if in_pos:
+            stop = max(stop, price * (1 - stop_loss_pct))
+            if price <= stop:
+                pnl = price / entry - 1
+                equity *= (1 + position_size * pnl) * (1 - position_size * fee_rate)
+                wins += pnl > 0
+                in_pos, exited = False, True
+        if not in_pos and not exited and t - last_trade >= min_trade_interval and draws[t] < trade_probability:
+            in_pos, entry, stop, last_trade = True, price, price * (1 - stop_loss_pct), t
+            trades += 1
+            equity *= 1 - position_size * fee_rate
+        positions[t] = position_size if in_pos else 0.0
+    if in_pos:
+        last = prices[np.isfinite(prices)][-1]
+        equity *= 1 + position_size * (last / entry - 1)
+    return equity - 1, trades, wins, positions
+
+
+@pytest.mark.parametrize("chunk", [7, 4096])
+def test_each_seed_matches_a_single_seed_run(chunk):
+    prices = closes()
+
+    batch = simulate_random_long(prices, SEEDS, chunk=chunk, **PARAMS)
+
+    for row, seed in zip(batch.itertuples(), SEEDS):
+        alone = simulate_random_long(prices, [seed], **PARAMS).iloc[0]
+        total, trades, wins, _ = reference_run(prices, seed, fee_rate=DEFAULT_FEE_RATE, **PARAMS)
+        assert (row.seed, row.trades, row.total_return) == (seed, alone["trades"], alone["total_return"])
+        assert row.trades == trades and row.win_rate == pytest.approx(wins / trades)
+        assert row.total_return == pytest.approx(total, rel=1e-12)
+
+
+def test_fee_accounting_matches_backtest_positions():
+    prices = closes(seed=3)
+    fee_rate = 0.004
+
+    with_fees = simulate_random_long(prices, SEEDS, fee_rate=fee_rate, **PARAMS)
+    without = simulate_random_long(prices, SEEDS, fee_rate=0.0, **PARAMS)
+
+    for seed, paid, free in zip(SEEDS, with_fees["total_return"], without["total_return"]):
+        positions = reference_run(prices, seed, fee_rate=fee_rate, **PARAMS)[3]
+        # With flat returns, backtest_positions charges exactly the turnover fees of every entry and exit.
+        fee_drag = np.prod(1 + backtest_positions(positions, np.zeros(prices.size), fee_rate))
+        assert (1 + paid) / (1 + free) == pytest.approx(fee_drag, rel=1e-12)
+
+
+def test_null_distribution_is_independent_of_task_split():
+    prices = closes(1_000)
+    grid = {"trade_probabilities": (0.1, 0.3), "stop_loss_pcts": (0.02, 0.05)}
+
+    serial = null_distribution(prices, SEEDS, seeds_per_task=len(SEEDS), max_workers=1, **grid)
+    split = null_distribution(prices, SEEDS, seeds_per_task=2, max_workers=1, **grid)
+
+    pd.testing.assert_frame_equal(serial, split)
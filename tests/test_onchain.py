@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from research.scripts.data_fetchers import onchain
+
+METRICS = {"active_addresses": "addresses/active_count"}
+
+
+class Glassnode:
+    """Serves one point per `i` step in `[s, u]`."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, params):
+        self.calls.append(params)
+        step = int(onchain.INTERVALS[params["i"]].total_seconds())
+        first = -(-params["s"] // step) * step
+        return [{"t": t, "v": float(t)} for t in range(first, params["u"] + 1, step)]
+
+
+def run(tmp_path, request, interval):
+    return onchain.run_pipeline(
+        ["BTC"], tmp_path, METRICS, interval=interval, lookback=timedelta(days=5), max_workers=1, request=request
+    )
+
+
+def test_rerun_at_another_interval_refetches_and_replaces(tmp_path, monkeypatch):
+    monkeypatch.setenv("GLASSNODE_API_KEY", "test")
+    request = Glassnode()
+    run(tmp_path, request, "24h")
+    run(tmp_path, request, "24h")
+    daily_calls = len(request.calls)
+
+    paths = run(tmp_path, request, "1h")
+
+    assert len(request.calls) > daily_calls
+    assert request.calls[-1]["i"] == "1h"
+    frame = pd.read_parquet(paths["BTC"])
+    assert (frame.index.to_series().diff().dropna() == pd.Timedelta(hours=1)).all()
+    record = onchain.load_coverage(tmp_path)["btc"]["active_addresses"]
+    assert record["interval"] == "1h"
+
+
+def test_cached_column_at_another_interval_is_not_coverage():
+    index = pd.date_range("2024-01-01", periods=10, freq="1D", tz="UTC")
+    cached = pd.DataFrame({"active_addresses": 1.0}, index=index)
+
+    daily = onchain._covered_range({}, "BTC", "active_addresses", METRICS["active_addresses"], "24h", cached)
+    hourly = onchain._covered_range({}, "BTC", "active_addresses", METRICS["active_addresses"], "1h", cached)
+
+    assert daily == (index[0].to_pydatetime(), index[-1].to_pydatetime())
+    assert hourly is None
+
+
+def test_failed_refetch_keeps_the_cached_column(tmp_path, monkeypatch):
+    monkeypatch.setenv("GLASSNODE_API_KEY", "test")
+    metrics = {**METRICS, "tx_count": "transactions/count"}
+    serve = Glassnode()
+    paths = onchain.run_pipeline(["BTC"], tmp_path, metrics, lookback=timedelta(days=5), max_workers=1, request=serve)
+    daily = pd.read_parquet(paths["BTC"])["active_addresses"].dropna()
+
+    def flaky(url, params):
+        if url.endswith(METRICS["active_addresses"]):
+            raise ConnectionError("glassnode down")
+        return serve(url, params)
+
+    with pytest.raises(RuntimeError, match="glassnode down"):
+        onchain.run_pipeline(
+            ["BTC"], tmp_path, metrics, interval="1h", lookback=timedelta(days=5), max_workers=1, request=flaky
+        )
+
+    frame = pd.read_parquet(paths["BTC"])
+    pd.testing.assert_series_equal(frame["active_addresses"].dropna(), daily)
+    assert frame["tx_count"].notna().sum() > len(daily)
+    coverage = onchain.load_coverage(tmp_path)["btc"]
+    assert (coverage["active_addresses"]["interval"], coverage["tx_count"]["interval"]) == ("24h", "1h")
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from research.scripts.covariance import EwmaCovariance
+from research.scripts.portfolio import CovarianceAllocator, MeanVarianceAllocator, project_capped
+
+
+def bisection_projection(values, max_weight, max_gross, long_only):
+    magnitude = np.maximum(values, 0.0) if long_only else np.abs(values)
+    lo, hi = 0.0, float(magnitude.max())
+    for _ in range(200):
+        theta = (lo + hi) / 2
+        if np.clip(magnitude - theta, 0, max_weight).sum() > max_gross:
+            lo = theta
+        else:
+            hi = theta
+    return np.sign(values) * np.clip(magnitude - hi, 0, max_weight)
+
+
+@pytest.mark.parametrize("long_only", [True, False])
+def test_projection_meets_both_caps_exactly(long_only):
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        values = rng.normal(0, 0.3, 40)
+        w = project_capped(values, 0.1, 0.8, long_only)
+
+        assert np.abs(w).max() <= 0.1 + 1e-12
+        assert np.abs(w).sum() <= 0.8 + 1e-12
+        if long_only:
+            assert (w >= 0).all()
+        np.testing.assert_allclose(w, bisection_projection(values, 0.1, 0.8, long_only), atol=1e-12)
+
+
+def covariance(n, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 1e-3, (n, 3))
+    return factors @ factors.T + np.diag(rng.uniform(1e-7, 4e-6, n))
+
+
+def test_mean_variance_keeps_the_risk_aversion_solution():
+    n = 5
+    cov = covariance(n)
+    scores = np.array([0.2, 0.1, 0.05, 0.3, 0.15])
+    allocator = MeanVarianceAllocator(EwmaCovariance([f"S{i}" for i in range(n)]), risk_aversion=1e4, max_weight=10.0, max_gross=100.0)
+
+    expected = np.linalg.solve(1e4 * cov, scores * allocator.score_to_return)
+    assert (expected > 0).all()
+    np.testing.assert_allclose(allocator.compute_array(scores, cov), expected)
+
+    allocator.risk_aversion = 2e4
+    np.testing.assert_allclose(allocator.compute_array(scores, cov), expected / 2)
+
+
+@pytest.mark.parametrize("long_only", [True, False])
+def test_mean_variance_converges_at_default_settings(long_only):
+    n = 200
+    cov = covariance(n, seed=1)
+    scores = np.random.default_rng(2).normal(0, 1, n)
+    symbols = [f"S{i}" for i in range(n)]
+    allocator = MeanVarianceAllocator(EwmaCovariance(symbols), max_weight=0.2, long_only=long_only)
+    reference = MeanVarianceAllocator(EwmaCovariance(symbols), max_weight=0.2, long_only=long_only, max_iter=5_000, tol=0.0)
+
+    w = allocator.compute_array(scores, cov)
+
+    assert np.abs(w).sum() <= allocator.max_gross + 1e-12
+    assert np.abs(w).max() <= 0.2 + 1e-12
+    np.testing.assert_allclose(w, reference.compute_array(scores, cov), atol=1e-7)
+    # Projected-gradient fixed point: no feasible step improves the objective.
+    mu = scores * allocator.score_to_return
+    lam = allocator.risk_aversion
+    step = 1.0 / (lam * np.linalg.eigvalsh(cov)[-1])
+    np.testing.assert_allclose(project_capped(w + step * (mu - lam * cov @ w), 0.2, 1.0, long_only), w, atol=1e-8)
+
+
+def test_covariance_allocator_is_abstract():
+    with pytest.raises(TypeError):
+        CovarianceAllocator(EwmaCovariance(["A"]))
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.qc_native_features import multi_horizon_roc, regime_flags, rolling_mean_windows
+
+
+def pandas_regime_flags(btc_returns, macro_series, windows):
+    """The original per-series inner-join implementation."""
+
+    features = {}
+    for name, series in macro_series.items():
+        aligned = pd.concat([btc_returns, series], axis=1, join="inner").dropna()
+        ratio = aligned.iloc[:, 0] / aligned.iloc[:, 1].replace(0, np.nan)
+        for window in windows:
+            features[f"{name}_ratio_{window}h"] = ratio.rolling(window).mean()
+    return pd.DataFrame(features)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_rolling_mean_windows_matches_series_rolling(rng, dtype):
+    values = rng.normal(size=300)
+    values[rng.choice(300, size=12, replace=False)] = np.nan
+    windows = (1, 5, 24, 300, 301)
+
+    out = rolling_mean_windows(values, windows, dtype)
+
+    assert out.shape == (300, len(windows))
+    assert out.dtype == dtype
+    assert out.flags["C_CONTIGUOUS"]
+    rtol = 1e-9 if dtype is np.float64 else 1e-5
+    for j, window in enumerate(windows):
+        expected = pd.Series(values).rolling(window).mean().to_numpy()
+        np.testing.assert_allclose(out[:, j], expected, rtol=rtol, atol=1e-12, equal_nan=True)
+
+
+def test_multi_horizon_roc_matches_pct_change(rng):
+    index = pd.date_range("2024-01-01", periods=200, freq="h")
+    price = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=200))), index=index)
+    windows = (1, 4, 24, 199, 200)
+
+    out = multi_horizon_roc(price, windows)
+
+    expected = pd.DataFrame({f"roc_{w}h": price.pct_change(w) for w in windows})
+    pd.testing.assert_frame_equal(out, expected, check_exact=False, rtol=1e-12, check_freq=False)
+
+
+def test_regime_flags_matches_inner_join_per_series(rng):
+    index = pd.date_range("2024-01-01", periods=400, freq="h")
+    btc = pd.Series(rng.normal(0, 0.01, size=400), index=index)
+    btc.iloc[[3, 50, 51, 220]] = np.nan
+    # Macro series with their own gaps, shorter and offset indexes, extra rows BTC lacks, and a zero.
+    dxy = pd.Series(rng.normal(0, 0.002, size=400), index=index).iloc[::2]
+    dxy.iloc[10] = 0.0
+    extra = pd.date_range("2023-12-31", periods=24, freq="h")
+    spx = pd.concat(
+        [
+            pd.Series(rng.normal(0, 0.003, size=24), index=extra),
+            pd.Series(rng.normal(0, 0.003, size=300), index=index[100:]),
+        ]
+    )
+    spx.iloc[[40, 41, 42]] = np.nan
+    macro = {"dxy": dxy, "spx": spx}
+    windows = (1, 6, 24)
+
+    out = regime_flags(btc, macro, windows)
+
+    expected = pandas_regime_flags(btc, macro, windows)
+    assert list(out.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(out, expected, check_exact=False, rtol=1e-9, check_freq=False)
+
+
+def test_regime_flags_float32_output(rng):
+    index = pd.date_range("2024-01-01", periods=100, freq="h")
+    btc = pd.Series(rng.normal(0, 0.01, size=100), index=index)
+    macro = {"eth": pd.Series(rng.normal(0, 0.01, size=100), index=index)}
+
+    out = regime_flags(btc, macro, (3, 12), dtype=np.float32)
+
+    assert (out.dtypes == np.float32).all()
+    expected = pandas_regime_flags(btc, macro, (3, 12))
+    np.testing.assert_allclose(out.to_numpy(), expected.to_numpy(), rtol=1e-4, atol=1e-6, equal_nan=True)
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.alt_data import AltDataSource
+from research.scripts.data_loader import DataLoader, DataRequestSpec
+from research.scripts.replay import ReplayReader, export_bundle
+
+
+def spec(symbol, resolution="Minute", start="2024-01-01", market="kraken"):
+    return DataRequestSpec(symbol, market, "Crypto", resolution, start, "2024-01-02")
+
+
+def bars_for(request):
+    rng = np.random.default_rng(abs(hash((request.symbol, request.resolution))) % 2**32)
+    step = {"Minute": "1min", "Hour": "1h"}[request.resolution]
+    index = pd.date_range("2024-01-01", periods=90, freq=step, tz="UTC")
+    # Shuffled rows: the exporter must sort each stream.
+    close = 100 + rng.normal(size=index.size).cumsum()
+    frame = pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": 1.0}, index=index)
+    return frame.iloc[rng.permutation(index.size)]
+
+
+def test_bar_streams_are_keyed_by_resolution(tmp_path):
+    loader = DataLoader()
+    loader.register(spec("BTCUSD", "Minute"))
+    loader.register(spec("BTCUSD", "Hour"))
+
+    reader = ReplayReader(export_bundle(loader, bars_for, tmp_path / "bundle.npz", sources=()))
+
+    assert [s.name for s in reader.streams] == ["bars:kraken:BTCUSD:Minute", "bars:kraken:BTCUSD:Hour"]
+    assert reader.frame("bars:kraken:BTCUSD:Hour").index.to_series().diff().dropna().eq(pd.Timedelta(hours=1)).all()
+
+
+def test_specs_sharing_a_stream_are_rejected(tmp_path):
+    loader = DataLoader()
+    loader.register(spec("BTCUSD", start="2024-01-01"))
+    loader.register(spec("BTCUSD", start="2023-06-01"))
+
+    with pytest.raises(ValueError, match="bars:kraken:BTCUSD:Minute"):
+        export_bundle(loader, bars_for, tmp_path / "bundle.npz", sources=())
+
+
+def test_events_follow_global_time_order_with_alt_data_first(tmp_path):
+    directory = tmp_path / "funding"
+    directory.mkdir()
+    # Prints on the hour, published with a 30 minute lag, so they land exactly on minute bars.
+    prints = pd.DataFrame(
+        {"funding_rate": [0.01, 0.02, 0.03]}, index=pd.date_range("2023-12-31 23:30", periods=3, freq="30min", tz="UTC")
+    )
+    prints.to_parquet(directory / "btcusd_funding.parquet")
+    source = AltDataSource("funding", directory, "_funding.parquet", lag=timedelta(minutes=30))
+    loader = DataLoader()
+    for request in (spec("BTCUSD"), spec("ETHUSD"), spec("BTCUSD", "Hour")):
+        loader.register(request)
+
+    reader = ReplayReader(export_bundle(loader, bars_for, tmp_path / "bundle.npz", sources=(source,)))
+    events = list(reader)
+
+    # Brute force: every row of every stream, sorted by time, alt data first, then manifest order.
+    arrays = reader.arrays()
+    expected = sorted(
+        (int(t), info.kind != "alt", position, info.name)
+        for position, info in enumerate(reader.streams)
+        for t in arrays[info.name][0]
+    )
+    assert [(e.time_ns, e.stream) for e in events] == [(t, name) for t, _, _, name in expected]
+    assert len(events) == 3 + 3 * 90
+    on_the_hour = [e.stream for e in events if e.time_ns == pd.Timestamp("2024-01-01 00:30", tz="UTC").value]
+    assert on_the_hour == ["funding:btcusd", "bars:kraken:BTCUSD:Minute", "bars:kraken:ETHUSD:Minute"]
+
+    start, end = pd.Timestamp("2024-01-01 01:00", tz="UTC"), pd.Timestamp("2024-01-01 01:05", tz="UTC")
+    window = [(e.time_ns, e.stream) for e in reader.events(start, end)]
+    assert window == [(t, name) for t, name in [(e.time_ns, e.stream) for e in events] if start.value <= t <= end.value]
+    assert window[:4] == [(start.value, name) for name in [s.name for s in reader.streams]]
@@ -0,0 +1,67 @@
+import numpy as np
+
+from research.scripts.risk import DrawdownBreaker, ExposureCapGuard, RiskGuardChain, TrailingStopGuard
+
+
+def test_tripped_breaker_flattens_symbols_outside_the_layout():
+    breaker = DrawdownBreaker(["BTCUSD", "ETHUSD"], max_drawdown=0.10)
+    targets = {"BTCUSD": 0.5, "SOLUSD": 0.3}
+
+    assert breaker.evaluate(targets, {"equity": 100.0}) == {"BTCUSD": 0.5, "SOLUSD": 0.3}
+    assert breaker.evaluate(targets, {"equity": 85.0}) == {"BTCUSD": 0.0, "SOLUSD": 0.0}
+    # Latched until reset.
+    assert breaker.evaluate(targets, {"equity": 99.0}) == {"BTCUSD": 0.0, "SOLUSD": 0.0}
+
+    breaker.reset()
+    assert breaker.evaluate(targets, {"equity": 99.0}) == {"BTCUSD": 0.5, "SOLUSD": 0.3}
+
+
+def test_chain_with_tripped_breaker_flattens_every_target():
+    symbols = ["BTCUSD", "ETHUSD"]
+    chain = RiskGuardChain([ExposureCapGuard(symbols, max_weight=0.4), DrawdownBreaker(symbols, max_drawdown=0.05)])
+    chain.evaluate({"BTCUSD": 0.3}, {"equity": 100.0})
+
+    safe = chain.evaluate({"BTCUSD": 0.3, "DOGEUSD": 0.2}, {"equity": 90.0})
+
+    assert safe == {"BTCUSD": 0.0, "DOGEUSD": 0.0}
+    assert not chain.state.exposure
+
+
+def test_trailing_stop_trails_the_best_price_and_latches_until_the_side_changes():
+    guard = TrailingStopGuard(["BTCUSD", "ETHUSD", "SOLUSD"], stop_pct=0.05)
+    targets = {"BTCUSD": 0.5, "ETHUSD": -0.3, "SOLUSD": 0.2}
+
+    assert guard.evaluate(targets, {"BTCUSD": 100.0, "ETHUSD": 100.0, "SOLUSD": 10.0}) == targets
+    assert guard.evaluate(targets, {"BTCUSD": 120.0, "ETHUSD": 90.0}) == targets
+    np.testing.assert_allclose(guard.stop_prices[:2], [114.0, 94.5])
+
+    # Long stop crossed (120 * 0.95 = 114); the short and the symbol without a price are untouched.
+    safe = guard.evaluate(targets, {"BTCUSD": 113.0, "ETHUSD": 94.0})
+    assert safe == {"BTCUSD": 0.0, "ETHUSD": -0.3, "SOLUSD": 0.2}
+    # Latched while the signal stays long, even if the price recovers.
+    assert guard.evaluate(targets, {"BTCUSD": 130.0, "ETHUSD": 95.0})["BTCUSD"] == 0.0
+    assert guard.evaluate(targets, {"ETHUSD": 95.0})["ETHUSD"] == 0.0
+
+    # A flat signal re-arms the stop; the next entry starts trailing from its own price.
+    guard.evaluate({"BTCUSD": 0.0}, {"BTCUSD": 130.0})
+    assert guard.evaluate(targets, {"BTCUSD": 100.0})["BTCUSD"] == 0.5
+
+
+def test_trailing_stop_chains_with_the_other_guards():
+    symbols = ["BTCUSD", "ETHUSD"]
+    chain = RiskGuardChain([ExposureCapGuard(symbols, max_weight=0.4), TrailingStopGuard(symbols, stop_pct=0.1)])
+
+    chain.evaluate({"BTCUSD": 0.6, "ETHUSD": 0.2}, {"BTCUSD": 100.0, "ETHUSD": 50.0})
+    safe = chain.evaluate({"BTCUSD": 0.6, "ETHUSD": 0.2}, {"BTCUSD": 89.0, "ETHUSD": 50.0})
+
+    assert safe == {"BTCUSD": 0.0, "ETHUSD": 0.2}
+    assert chain.state.exposure == {"ETHUSD": 0.2}
+
+
+def test_trailing_stop_ignores_placeholder_prices():
+    guard = TrailingStopGuard(["BTCUSD"], stop_pct=0.05)
+
+    assert guard.evaluate({"BTCUSD": 1.0}, {"BTCUSD": 0.0}) == {"BTCUSD": 1.0}
+    assert guard.evaluate({"BTCUSD": 1.0}, {"BTCUSD": 100.0}) == {"BTCUSD": 1.0}
+    assert guard.evaluate({"BTCUSD": 1.0}, {"BTCUSD": 0.0}) == {"BTCUSD": 1.0}
+    assert guard.evaluate({"BTCUSD": 1.0}, {"BTCUSD": 94.0}) == {"BTCUSD": 0.0}
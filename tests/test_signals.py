@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from research.scripts import signals
+from research.scripts.signals import ScalarBatchAdapter, available_signals, create_signal, register_signal
+
+NAMES = ["momentum", "vol", "spread"]
+
+
+class ScalarSignal:
+    def __init__(self, weight=1.0):
+        self.weight = weight
+
+    def score(self, features):
+        edge = self.weight * (features["momentum"] - 0.5 * features["vol"]) + 0.1 * features["spread"]
+        return float(np.tanh(edge)), float(min(abs(edge), 1.0))
+
+
+class BatchSignal(ScalarSignal):
+    def score_batch(self, features, feature_names):
+        return np.full(len(features), 0.25), np.full(len(features), 0.5)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(signals, "_REGISTRY", {})
+    return signals._REGISTRY
+
+
+def test_score_batch_equals_row_by_row_score(registry):
+    register_signal("scalar", ScalarSignal)
+    model = create_signal("scalar", weight=2.0)
+    features = np.random.default_rng(0).normal(size=(25, len(NAMES)))
+
+    edge, confidence = model.score_batch(features, NAMES)
+
+    assert isinstance(model, ScalarBatchAdapter)
+    expected = [model.score(dict(zip(NAMES, row))) for row in features.tolist()]
+    np.testing.assert_array_equal(edge, [e for e, _ in expected])
+    np.testing.assert_array_equal(confidence, [c for _, c in expected])
+    # A single row is accepted as a 1-row batch.
+    assert model.score_batch(features[0], NAMES)[0].tolist() == [expected[0][0]]
+
+
+def test_models_with_their_own_batch_path_are_not_wrapped(registry):
+    register_signal("batch", BatchSignal)
+
+    model = create_signal("batch")
+
+    assert isinstance(model, BatchSignal)
+    assert ScalarBatchAdapter(model).score_batch(np.zeros((3, 3)), NAMES)[0].tolist() == [0.25] * 3
+
+
+def test_duplicate_registration_raises(registry):
+    @register_signal("scalar")
+    class First(ScalarSignal):
+        pass
+
+    register_signal("scalar", First)  # same factory again: no-op
+    with pytest.raises(ValueError, match="already registered"):
+        register_signal("scalar", BatchSignal)
+
+    assert registry == {"scalar": First} and available_signals() == ["scalar"]
+
+
+def test_unknown_signal_raises(registry):
+    register_signal("scalar", ScalarSignal)
+
+    with pytest.raises(KeyError, match="Unknown signal 'missing'. Registered: scalar"):
+        create_signal("missing")
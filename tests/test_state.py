@@ -0,0 +1,56 @@
+import pytest
+
+from research.scripts.state import SnapshotError, StateSnapshotter
+
+
+class Component:
+    def __init__(self, value, accepts=True):
+        self.value = value
+        self.accepts = accepts
+
+    def get_state(self):
+        return {"value": self.value}
+
+    def set_state(self, state):
+        if not self.accepts:
+            raise SnapshotError("spec changed")
+        self.value = state["value"]
+
+
+def snapshot():
+    return StateSnapshotter({"algorithm": Component(1), "features": Component(2), "windows": Component(3)}).capture()
+
+
+def test_windows_stay_cold_when_the_registry_rejects():
+    windows = Component(0)
+    snapshotter = StateSnapshotter(
+        {"algorithm": Component(0), "features": Component(0, accepts=False), "windows": windows},
+        required=("algorithm",),
+        depends={"windows": ("features",)},
+    )
+
+    restored, skipped = snapshotter.restore(snapshot())
+
+    assert restored == ["algorithm"]
+    assert set(skipped) == {"features", "windows"}
+    assert windows.value == 0
+
+
+def test_windows_restore_after_the_registry():
+    windows = Component(0)
+    snapshotter = StateSnapshotter(
+        {"algorithm": Component(0), "features": Component(0), "windows": windows},
+        required=("algorithm",),
+        depends={"windows": ("features",)},
+    )
+
+    restored, skipped = snapshotter.restore(snapshot())
+
+    assert restored == ["algorithm", "features", "windows"]
+    assert not skipped
+    assert windows.value == 3
+
+
+def test_dependency_must_restore_first():
+    with pytest.raises(ValueError, match="before"):
+        StateSnapshotter({"windows": Component(0), "features": Component(0)}, depends={"windows": ("features",)})
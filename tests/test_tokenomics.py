@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.data_fetchers.tokenomics import UnlockIndex
+
+START = pd.Timestamp("2024-01-01", tz="UTC")
+
+
+def random_events(rng, n):
+    # Whole-hour times so events regularly land exactly on a window edge.
+    times = START + pd.to_timedelta(rng.integers(0, 24 * 90, n), unit="h")
+    return pd.DataFrame(
+        {"event_time": times, "amount": rng.uniform(0, 1e6, n), "amount_usd": rng.uniform(0, 1e7, n)}
+    )
+
+
+def naive_window_sum(events, bar_times, horizon, column):
+    horizon = pd.Timedelta(horizon)
+    times, values = events["event_time"].tolist(), events[column].tolist()
+    out = []
+    for t in bar_times:
+        lo, hi = (t, t + horizon) if horizon >= pd.Timedelta(0) else (t + horizon, t)
+        out.append(sum(value for time, value in zip(times, values) if lo < time <= hi))
+    return np.array(out)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_window_sum_matches_a_naive_sum(seed):
+    rng = np.random.default_rng(seed)
+    events = {symbol: random_events(rng, int(rng.integers(0, 40))) for symbol in ("arb", "APT", "OP")}
+    index = UnlockIndex(events)
+    bar_times = START + pd.to_timedelta(np.sort(rng.integers(-24 * 10, 24 * 100, 200)), unit="h")
+
+    for symbol, frame in events.items():
+        for horizon in ("7D", "36h", "-3D"):
+            for column in UnlockIndex.COLUMNS:
+                np.testing.assert_allclose(
+                    index.window_sum(symbol, bar_times, horizon, column),
+                    naive_window_sum(frame, bar_times, horizon, column),
+                    rtol=1e-9,
+                    atol=1e-6,
+                )
+    np.testing.assert_array_equal(index.window_sum("DOGE", bar_times, "7D"), np.zeros(bar_times.size))
@@ -0,0 +1,39 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+from main import SpotMinuteAdapter, UniverseSubscriptionManager
+from research.scripts.data_loader import DataLoader
+
+
+class Algorithm:
+    def __init__(self):
+        self.subscribed = []
+
+    def AddCrypto(self, ticker, resolution, market):
+        self.subscribed.append((market, ticker))
+        return SimpleNamespace(Symbol=f"{ticker}.{market}")
+
+
+def bar(close):
+    return SimpleNamespace(Open=close, High=close + 1, Low=close - 1, Close=close, Volume=10.0)
+
+
+def test_traded_symbol_gets_a_column_and_route_fills_only_present_bars():
+    start, end = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    loader = DataLoader()
+    # The algorithm's traded symbol is recorded on the shared loader before the universe.
+    loader.register(SpotMinuteAdapter.build_spec("kraken", "BTCUSD", start, end))
+    manager = UniverseSubscriptionManager(Algorithm(), start, end, loader=loader)
+
+    added = manager.register(UniverseSubscriptionManager.parse("kraken:BTCUSD,kraken:ETHUSD,binance:BTCUSDT"))
+
+    assert added == ["BTCUSD.kraken", "ETHUSD.kraken", "BTCUSDT.binance"]
+    assert len(loader.list_requests()) == 3
+    assert manager.register({"kraken": ["ETHUSD"]}) == []
+
+    row = manager.route(SimpleNamespace(Bars={"BTCUSDT.binance": bar(5.0), "DOGEUSD.kraken": bar(1.0)}), 60)
+
+    assert np.isnan(row[:2]).all()
+    np.testing.assert_array_equal(row[2], [5.0, 6.0, 4.0, 5.0, 10.0])
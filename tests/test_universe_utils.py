@@ -0,0 +1,46 @@
+import pytest
+
+from research.scripts import universe_utils
+from research.scripts.universe_utils import UniverseService
+
+
+@pytest.fixture
+def pages(monkeypatch):
+    calls = []
+
+    def fetch_page(page, per_page, vs_currency, limiter=None):
+        calls.append((page, per_page, limiter))
+        start = (page - 1) * per_page
+        # Every tenth asset repeats the previous ticker, so dedup leaves fewer rows than requested.
+        return [{"symbol": f"c{i - (i % 10 == 9)}", "market_cap": 1e9 - i, "total_volume": 1.0} for i in range(start, start + per_page)]
+
+    monkeypatch.setattr(universe_utils, "_fetch_page", fetch_page)
+    return calls
+
+
+def test_deduplicated_snapshot_is_a_cache_hit(tmp_path, pages):
+    service = UniverseService(tmp_path)
+    first = service.snapshot(limit=50)
+    assert len(first.table) < 50 and first.limit == 50
+
+    again = UniverseService(tmp_path).snapshot(limit=50)
+
+    assert len(pages) == 1
+    assert again.limit == 50
+    assert again.pairs() == first.pairs()
+
+
+def test_refresh_never_shrinks_the_latest_snapshot(tmp_path, pages):
+    service = UniverseService(tmp_path)
+    wide = service.snapshot(limit=50)
+
+    narrow = service.refresh(limit=10)
+
+    assert narrow.limit == 50
+    assert len(narrow.table) == len(wide.table)
+
+
+def test_uncached_fetch_uses_the_shared_limiter(pages):
+    universe_utils.fetch_top_marketcap_pairs(limit=20)
+
+    assert pages and all(limiter is universe_utils.COINGECKO_LIMITER for *_, limiter in pages)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from research.scripts.walk_forward import build_cache, make_folds, run_walk_forward
+
+
+@pytest.fixture
+def cache():
+    index = pd.date_range("2024-01-01", periods=6000, freq="1min", tz="UTC")
+    rng = np.random.default_rng(0)
+    close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 1e-3, index.size))), index=index)
+    bars = pd.DataFrame({"open": close, "high": close, "low": close, "close": close, "volume": 1.0})
+    features = pd.DataFrame({"roc_5": close.pct_change(5), "roc_30": close.pct_change(30)})
+    return build_cache(bars, features, horizon=60)
+
+
+def test_cache_folds_purge_the_target_horizon(cache):
+    folds = cache.folds(train_bars=2000, test_bars=1000)
+
+    assert folds
+    for fold in folds:
+        assert fold.test.start - fold.train.stop == cache.horizon
+        # The last training target only uses prices before the test window opens.
+        assert fold.train.stop - 1 + cache.horizon < fold.test.start
+
+
+def test_run_rejects_folds_without_purge(cache):
+    with pytest.raises(ValueError, match="purge"):
+        run_walk_forward(cache, make_folds(len(cache), 2000, 1000), max_workers=1)
+
+
+def test_run_accepts_purged_folds(cache):
+    result = run_walk_forward(cache, cache.folds(2000, 1000), max_workers=1)
+
+    assert len(result.stats) == 4
+    assert (result.stats["train_rows"] <= 2000 - cache.horizon).all()